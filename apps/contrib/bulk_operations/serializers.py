@@ -137,7 +137,7 @@ class BulkApiOperationSerializer(serializers.ModelSerializer):
         instance = super().create(validated_data)
         if self.context.get('RUN_TASK_SYNC', False):
             print('Running background task now....')
-            run_bulk_api_operation(instance.pk)
+            run_bulk_api_operation(instance.pk, sync=True)
         else:
             transaction.on_commit(
                 lambda: run_bulk_api_operation.delay(instance.pk)
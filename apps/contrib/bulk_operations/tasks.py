@@ -3,25 +3,35 @@ import abc
 import datetime
 import typing
 import logging
+import collections
+import uuid
 
 import django_filters
+from celery import states
+from celery.result import AsyncResult
 from openpyxl import Workbook
 from rest_framework import serializers
-from django.contrib.auth import login, logout
+from django.conf import settings
 from django.utils import timezone
 from django.core.files import File
-from django.db import models
-from django.http import HttpRequest
-from django.contrib.sessions.middleware import SessionMiddleware
-from django.contrib.auth.middleware import AuthenticationMiddleware
-from django.test import override_settings
+from django.db import models, transaction
+from django.utils.translation import gettext
 
 from apps.contrib.models import BulkApiOperation
 from apps.extraction.filters import FigureExtractionBulkOperationFilterSet
-from apps.event.models import Figure
+from apps.event.models import Event, Figure
+from apps.entry.utils import (
+    BulkUpdateFigureManager,
+    get_event_notification_type,
+    get_figure_notification_type,
+    send_figures_notifications,
+)
 
 from helix.permalinks import Permalink
-from utils.common import get_temp_file
+from utils.common import get_temp_file, bump_figure_data_version
+from utils.db import JSONBAppend
+from utils.error_types import serializer_error_to_error_types
+from utils.validations import is_child_parent_dates_valid
 
 
 logger = logging.getLogger(__name__)
@@ -47,46 +57,6 @@ class FailureDataType(SuccessDataType):
     errors: typing.List[dict]
 
 
-def process_request(request: HttpRequest) -> None:
-    # Reference from https://github.com/django/django/blob/main/django/contrib/sessions/middleware.py#L13-L20
-    session_middlware = SessionMiddleware(None)  # pyright: ignore[reportGeneralTypeIssues]
-    auth_middlware = AuthenticationMiddleware(None)  # pyright: ignore[reportGeneralTypeIssues]
-    session_middlware.process_request(request)
-    auth_middlware.process_request(request)
-
-
-def generate_dummy_request(user):
-    api_request = HttpRequest()
-    process_request(api_request)
-    login(api_request, user)
-    return api_request
-
-
-def run_mutation(
-    request: HttpRequest,
-    query: str,
-    variables: dict,
-) -> typing.Tuple[typing.Optional[dict], typing.Optional[dict]]:
-    # To avoid circular dependency
-    from helix.schema import schema as gql_schema
-    from utils.graphene.context import GQLContext
-
-    result = gql_schema.execute(
-        query,
-        context=GQLContext(request),
-        variables=variables,
-    )
-    return result.data, result.errors
-
-
-def get_gql_response_count(data: typing.Optional[typing.List[typing.Optional[dict]]]) -> int:
-    return len([
-        i
-        for i in (data or [])
-        if i is not None
-    ])
-
-
 def save_workbook_file(operation: BulkApiOperation, workbook: Workbook, path: typing.Optional[str] = None):
     if path is None:
         path = f'{operation.pk}-{operation.started_at.isoformat()}.xlsx'
@@ -103,7 +73,6 @@ ModelType = typing.TypeVar("ModelType", bound=models.Model)
 
 
 class BulkApiOperationBaseTask(typing.Generic[ModelType]):
-    MUTATION: str
     filter_set: typing.Optional[typing.Type[django_filters.FilterSet]]
 
     @classmethod
@@ -123,86 +92,117 @@ class BulkApiOperationBaseTask(typing.Generic[ModelType]):
         raise NotImplementedError
 
     @classmethod
-    @abc.abstractmethod
-    def get_mutation_variables(cls, payload: dict, items: typing.List[ModelType]) -> dict:
-        raise NotImplementedError
-
-    @staticmethod
-    @abc.abstractmethod
-    def parse_mutation_response(
-        items: typing.List[ModelType],
-        response: typing.Optional[dict],
-    ) -> typing.Tuple[typing.List[SuccessDataType], typing.List[FailureDataType]]:  # Success-List, Error-List
-        raise NotImplementedError
-
-    @classmethod
-    def get_items(cls, operation: BulkApiOperation) -> typing.List[ModelType]:
+    def get_item_ids(cls, operation: BulkApiOperation) -> typing.List[int]:
         filterset = cls.get_filterset()
         filters = cls.get_filters(operation.filters)
         queryset: models.QuerySet[ModelType] = filterset(data=filters).qs.order_by('id')
-        return list(queryset)
+        return list(queryset.values_list('id', flat=True))
 
     @classmethod
-    def run_mutation(
-        cls,
-        request: HttpRequest,
-        query: str,
-        variables: dict,
-    ) -> typing.Tuple[typing.Optional[dict], typing.Optional[dict]]:
-        return run_mutation(request, query, variables)
+    def get_items(cls, item_ids: typing.List[int]) -> typing.List[ModelType]:
+        model = cls.get_filterset()._meta.model
+        return list(model.objects.filter(id__in=item_ids).order_by('id'))
 
     @classmethod
+    @abc.abstractmethod
     def mutate(
         cls,
         operation: BulkApiOperation,
         items: typing.List[ModelType],
-    ) -> typing.Tuple[typing.List[SuccessDataType], typing.List[FailureDataType]]:
+    ) -> typing.Tuple[typing.List[SuccessDataType], typing.List[FailureDataType]]:  # Success-List, Error-List
+        raise NotImplementedError
+
+    @classmethod
+    def prepare(cls, operation: BulkApiOperation):
         """
-        NOTE: Response should be (success_count, failure_count, errors)
+        Resolve the items and create the snapshot, the items are then processed in chunks using run_chunk
         """
-        # TODO: Create a context manager for login/logout
-        api_request = generate_dummy_request(operation.created_by)
-
-        variables = cls.get_mutation_variables(operation.payload, items)
-        gql_data, gql_errors = cls.run_mutation(api_request, cls.MUTATION, variables)
-
-        logout(api_request)
-
-        # This should't happen in theory - Should be validated using unit test cases
-        if gql_errors:
-            logger.error(
-                f'Error found on bulk operation: {operation.get_action_display()}',
-                extra={
-                    'context': {
-                        'bulk_operation_id': operation.pk,
-                        'variables': variables,
-                        'data': gql_data,
-                        'errors': gql_errors,
-                    },
-                },
-            )
+        operation.item_ids = cls.get_item_ids(operation)
+        # Create a snapshot
+        cls.generate_snapshot(operation, cls.get_items(operation.item_ids))
+        operation.total_count = len(operation.item_ids)
+        operation.processed_count = 0
+        operation.completed_chunks = 0
+        operation.success_count = 0
+        operation.failure_count = 0
+        operation.success_list = []
+        operation.failure_list = []
+        operation.checkpoint_at = timezone.now()
+        if not operation.item_ids:
+            operation.update_status(BulkApiOperation.BULK_OPERATION_STATUS.COMPLETED, commit=False)
+        operation.save()
+        return operation
 
-        return cls.parse_mutation_response(items, gql_data)
+    @classmethod
+    def run_chunk(cls, operation_id: int, chunk: int) -> bool:
+        """
+        Process the chunk and checkpoint the progress in the operation.
+        Returns True if there are more chunks to process.
+        """
+        with transaction.atomic():
+            # NOTE: item_ids and the accumulated results are not loaded (or saved again) for each chunk
+            operation = BulkApiOperation.objects.select_for_update().defer(
+                'item_ids', 'success_list', 'failure_list',
+            ).get(pk=operation_id)
+            if (
+                operation.status != BulkApiOperation.BULK_OPERATION_STATUS.IN_PROGRESS or
+                operation.completed_chunks != chunk
+            ):
+                # NOTE: Chunk was already processed (or the operation was stopped)
+                logger.warning(f'Skipping bulk operation chunk: {operation} {chunk=}')
+                return False
+            item_ids = operation.get_next_chunk_item_ids()
+            # Mutate -> success, errors
+            success_list, failure_list = cls.mutate(operation, cls.get_items(item_ids))
+            operation.success_list = JSONBAppend('success_list', success_list)
+            operation.failure_list = JSONBAppend('failure_list', failure_list)
+            operation.success_count += len(success_list)
+            operation.failure_count += len(failure_list)
+            operation.processed_count += len(item_ids)
+            operation.completed_chunks += 1
+            operation.checkpoint_at = timezone.now()
+            if not item_ids or operation.processed_count >= operation.total_count:
+                operation.update_status(BulkApiOperation.BULK_OPERATION_STATUS.COMPLETED, commit=False)
+            operation.save(update_fields=(
+                'success_list',
+                'failure_list',
+                'success_count',
+                'failure_count',
+                'processed_count',
+                'completed_chunks',
+                'checkpoint_at',
+                'status',
+                'completed_at',
+            ))
+        return operation.status == BulkApiOperation.BULK_OPERATION_STATUS.IN_PROGRESS
 
     @classmethod
-    def run(cls, operation: BulkApiOperation):
-        # Generate item list
-        items = cls.get_items(operation)
-        # Create a snapshot
-        cls.generate_snapshot(operation, items)
-        # Mutate -> success, errors
-        (
-            operation.success_list,
-            operation.failure_list,
-        ) = cls.mutate(operation, items)
-        operation.success_count = len(operation.success_list)
-        operation.failure_count = len(operation.failure_list)
-        operation.update_status(BulkApiOperation.BULK_OPERATION_STATUS.COMPLETED, commit=False)
-        operation.save()
+    def run(cls, operation: BulkApiOperation, sync: bool = False):
+        """
+        sync: Process all the chunks in the current process instead of queueing them
+        """
+        if operation.item_ids is None:
+            cls.prepare(operation)
+        if operation.status != BulkApiOperation.BULK_OPERATION_STATUS.IN_PROGRESS:
+            return operation
+        # Resume from the last completed chunk
+        chunk = operation.completed_chunks
+        if sync or getattr(settings, 'CELERY_TASK_ALWAYS_EAGER', False):
+            while cls.run_chunk(operation.pk, chunk):
+                chunk += 1
+            operation.refresh_from_db()
+        else:
+            dispatch_bulk_api_operation_chunk(operation.pk, chunk)
         return operation
 
 
 class BulkFigureBulkUpdateTask(BulkApiOperationBaseTask[Figure]):
+    """
+    Apply the changes using set-based UPDATEs instead of replaying BulkUpdateFigures mutation for each figure
+    """
+    # NOTE: Same as BulkUpdateFigures.permissions
+    PERMISSIONS = ['entry.add_figure', 'entry.change_figure', 'entry.delete_figure']
+
     @staticmethod
     def generate_snapshot(operation: BulkApiOperation, items: typing.List[Figure]):
         # Circular dependency
@@ -213,117 +213,142 @@ class BulkFigureBulkUpdateTask(BulkApiOperationBaseTask[Figure]):
         workbook = get_excel_sheet_content(**sheet_data)
         save_workbook_file(operation, workbook)
 
-    @staticmethod
+    @classmethod
     @abc.abstractmethod
-    def get_update_payload(payload: dict) -> dict:
+    def get_update_groups(
+        cls,
+        payload: dict,
+        items: typing.List[Figure],
+    ) -> typing.List[typing.Tuple[dict, typing.List[Figure]]]:
+        """
+        Returns list of (update fields, figures)
+        """
         raise NotImplementedError
 
     @classmethod
-    def run_mutation(
-        cls,
-        request: HttpRequest,
-        query: str,
-        variables: dict,
-    ) -> typing.Tuple[typing.Optional[dict], typing.Optional[dict]]:
-        with override_settings(GRAPHENE_BATCH_DEFAULT_MAX_LIMIT=len(variables['items'])):
-            return super().run_mutation(request, query, variables)
+    def validate_items(cls, update: dict, items: typing.List[Figure]) -> typing.Dict[int, dict]:
+        """
+        Returns errors by figure id
+        """
+        return {}
 
     @classmethod
-    def get_mutation_variables(cls, payload: dict, items: typing.List[Figure]) -> dict:
-        payload = cls.get_update_payload(payload)
+    @abc.abstractmethod
+    def send_notifications(cls, user, update: dict, items: typing.List[Figure]):
+        raise NotImplementedError
+
+    @staticmethod
+    def get_urls(figure: Figure) -> FrontendUrlDataType:
         return {
-            'items': [
-                {
-                    'id': str(figure.pk),
-                    **payload,
-                }
-                for figure in items
-            ],
+            'frontend_url': Permalink.current_figure(figure.entry_id, figure.pk, absolute=False),
+            'frontend_permalink_url': Permalink.figure(figure.entry_id, figure.pk, absolute=False),
         }
 
-    @staticmethod
-    def parse_mutation_response(
+    @classmethod
+    def update_items(cls, user, update: dict, items: typing.List[Figure]):
+        # NOTE: items are already limited to BulkApiOperation.CHUNK_SIZE by run_chunk
+        qs = Figure.objects.filter(id__in=[item.pk for item in items])
+        with transaction.atomic():
+            qs.update(
+                **update,
+                last_modified_by=user,
+                modified_at=timezone.now(),
+            )
+            Figure.update_figures_status(qs)
+        # NOTE: QuerySet.update doesn't trigger the signals to update the review counts
+        event_ids = {item.event_id for item in items}
+        if 'event_id' in update:
+            event_ids.add(update['event_id'])
+        Event.refresh_review_counts(event_ids)
+
+    @classmethod
+    def mutate(
+        cls,
+        operation: BulkApiOperation,
         items: typing.List[Figure],
-        response: typing.Optional[dict]
     ) -> typing.Tuple[typing.List[SuccessDataType], typing.List[FailureDataType]]:
-        def _get_urls(figure) -> FrontendUrlDataType:
-            return {
-                'frontend_url': Permalink.current_figure(figure.entry_id, figure.pk, absolute=False),
-                'frontend_permalink_url': Permalink.figure(figure.entry_id, figure.pk, absolute=False),
-            }
+        user = operation.created_by
+        if not user.has_perms(cls.PERMISSIONS):
+            logger.warning(f'Permission denied for bulk operation: {operation.get_action_display()}')
+            return [], [
+                {
+                    'id': item.pk,
+                    'errors': PERMISSION_DENIED_ERRORS,
+                    **cls.get_urls(item),
+                }
+                for item in items
+            ]
 
         success_list: typing.List[SuccessDataType] = []
         failure_list: typing.List[FailureDataType] = []
-        _response = ((response or {}).get('bulkUpdateFigures') or {})
-
-        raw_success = _response.get('result') or []
-        if raw_success:
-            for item, _resp in zip(
-                items,
-                raw_success,
-            ):
-                if _resp:
+        with BulkUpdateFigureManager() as bulk_manager:
+            for update, figures in cls.get_update_groups(operation.payload, items):
+                errors = cls.validate_items(update, figures)
+                for figure in figures:
+                    if figure.pk in errors:
+                        failure_list.append({
+                            'id': figure.pk,
+                            'errors': [
+                                dict(error)
+                                for error in serializer_error_to_error_types(errors[figure.pk])
+                            ],
+                            **cls.get_urls(figure),
+                        })
+                valid_figures = [figure for figure in figures if figure.pk not in errors]
+                if not valid_figures:
+                    continue
+                cls.update_items(user, update, valid_figures)
+                # NOTE: Notifications are sent before the event status is re-calculated (Same as FigureSerializer)
+                cls.send_notifications(user, update, valid_figures)
+                for figure in valid_figures:
+                    bulk_manager.add_event(figure.event_id)
+                    if 'event_id' in update:
+                        bulk_manager.add_event(update['event_id'])
                     success_list.append({
-                        'id': item.pk,
-                        **_get_urls(item),
-                    })
-
-        raw_errors = _response.get('errors') or []
-        if raw_errors:
-            for item, _errors in zip(
-                items,
-                raw_errors,
-            ):
-                if _errors:
-                    failure_list.append({
-                        'id': item.pk,
-                        'errors': _errors,
-                        **_get_urls(item),
+                        'id': figure.pk,
+                        **cls.get_urls(figure),
                     })
+        # NOTE: QuerySet.update doesn't trigger the signals
+        country_ids = {item.country_id for item in items}
+        transaction.on_commit(lambda: bump_figure_data_version(country_ids))
 
+        success_list.sort(key=lambda item: item['id'])
+        failure_list.sort(key=lambda item: item['id'])
         return success_list, failure_list
 
+    @staticmethod
+    def group_by_event(items: typing.List[Figure]) -> typing.Dict[Event, typing.List[Figure]]:
+        events = Event.objects.in_bulk({item.event_id for item in items})
+        by_event = collections.defaultdict(list)
+        for item in items:
+            by_event[events[item.event_id]].append(item)
+        return by_event
+
 
 class BulkFigureRoleUpdateTask(BulkFigureBulkUpdateTask):
-    MUTATION = '''
-        mutation BulkUpdateFigures($items: [FigureUpdateInputType!]) {
-            bulkUpdateFigures(items: $items) {
-                errors
-                result {
-                  id
-                  role
-                }
-            }
-        }
-    '''
     filter_set = FigureExtractionBulkOperationFilterSet
 
     @staticmethod
     def get_filters(filters: dict):
         return filters['figure_role']['figure']
 
-    @staticmethod
-    def get_update_payload(payload: dict) -> dict:
-        return {
-            'role': Figure.ROLE(payload['figure_role']['role']).name,
-        }
+    @classmethod
+    def get_update_groups(cls, payload: dict, items: typing.List[Figure]):
+        return [
+            (
+                {'role': Figure.ROLE(payload['figure_role']['role'])},
+                items,
+            )
+        ]
+
+    @classmethod
+    def send_notifications(cls, user, update: dict, items: typing.List[Figure]):
+        for event, figures in cls.group_by_event(items).items():
+            if notification_type := get_figure_notification_type(event):
+                send_figures_notifications(figures, user, notification_type, event)
 
 
 class BulkFigureEventUpdateTask(BulkFigureBulkUpdateTask):
-    # TODO: Use eventId instead of event{id}
-    MUTATION = '''
-        mutation BulkUpdateFigures($items: [FigureUpdateInputType!]) {
-            bulkUpdateFigures(items: $items) {
-                errors
-                result {
-                  id
-                  event {
-                    id
-                  }
-                }
-            }
-        }
-    '''
     filter_set = FigureExtractionBulkOperationFilterSet
 
     @staticmethod
@@ -331,21 +356,94 @@ class BulkFigureEventUpdateTask(BulkFigureBulkUpdateTask):
         return filters['figure_event']['figure']
 
     @classmethod
-    def get_mutation_variables(cls, payload: dict, items: typing.List[Figure]) -> dict:
+    def get_update_groups(cls, payload: dict, items: typing.List[Figure]):
         by_figures = {
             data['figure']: data['event']
             for data in payload['figure_event']['by_figures']
         }
-        return {
-            'items': [
-                {
-                    'id': str(figure.pk),
-                    'event': by_figures[figure.pk]
-                }
-                for figure in items
-                if figure.pk in by_figures
-            ],
-        }
+        by_event = collections.defaultdict(list)
+        for figure in items:
+            if figure.pk in by_figures:
+                by_event[by_figures[figure.pk]].append(figure)
+        return [
+            ({'event_id': event_id}, figures)
+            for event_id, figures in by_event.items()
+        ]
+
+    @classmethod
+    def validate_items(cls, update: dict, items: typing.List[Figure]) -> typing.Dict[int, dict]:
+        """
+        Same as CommonFigureValidationMixin._validate_dates and _validate_figure_country for the new event
+        """
+        event = Event.objects.prefetch_related('countries').get(pk=update['event_id'])
+        event_countries = list(event.countries.all())
+        event_country_ids = {country.pk for country in event_countries}
+
+        errors = {}
+        for figure in items:
+            figure_errors = is_child_parent_dates_valid(
+                figure.start_date,
+                figure.end_date,
+                event.start_date,
+                'event',
+            )
+            if figure.country_id is not None and figure.country_id not in event_country_ids:
+                figure_errors['country'] = gettext('%(field_name)s should be one of the following: %(parents)s.') % dict(
+                    field_name='Country',
+                    parents=', '.join([str(country) for country in event_countries]),
+                )
+            if figure_errors:
+                errors[figure.pk] = figure_errors
+        return errors
+
+    @classmethod
+    def send_notifications(cls, user, update: dict, items: typing.List[Figure]):
+        new_event = Event.objects.get(pk=update['event_id'])
+        moved_figures = [figure for figure in items if figure.event_id != new_event.pk]
+        # NOTE: We do not send update notification for the figures moved to the new event
+        if notification_type := get_figure_notification_type(new_event):
+            send_figures_notifications(
+                [figure for figure in items if figure.event_id == new_event.pk],
+                user,
+                notification_type,
+                new_event,
+            )
+        # -- Delete notification
+        for existing_event, figures in cls.group_by_event(moved_figures).items():
+            if notification_type := get_event_notification_type(existing_event, is_figure_deleted=True):
+                send_figures_notifications(figures, user, notification_type, existing_event)
+        # -- Create notification
+        if notification_type := get_event_notification_type(new_event, is_figure_new=True):
+            send_figures_notifications(moved_figures, user, notification_type, new_event)
+
+
+def dispatch_bulk_api_operation_chunk(operation_id: int, chunk: int):
+    """
+    Queue the chunk task and keep track of it, so that resume doesn't queue it again while it's waiting
+    """
+    # Circular dependency
+    from apps.contrib.tasks import run_bulk_api_operation_chunk
+
+    # NOTE: Task id is saved before queueing, the task can finish (and queue the next chunk) before apply_async returns
+    task_id = str(uuid.uuid4())
+    BulkApiOperation.objects.filter(pk=operation_id).update(
+        chunk_task_id=task_id,
+        chunk_dispatched_at=timezone.now(),
+    )
+    run_bulk_api_operation_chunk.apply_async((operation_id, chunk), task_id=task_id)
+
+
+def is_chunk_task_queued(operation: BulkApiOperation) -> bool:
+    """
+    Returns True if the last dispatched chunk task is still waiting to be picked by a worker
+    """
+    if operation.chunk_task_id is None or operation.chunk_dispatched_at is None:
+        return False
+    queue_threshold = timezone.now() - datetime.timedelta(minutes=BulkApiOperation.CHUNK_QUEUE_THRESHOLD_IN_MINUTES)
+    if operation.chunk_dispatched_at <= queue_threshold:
+        # NOTE: PENDING is also used for unknown tasks, so the message is considered lost after this
+        return False
+    return AsyncResult(operation.chunk_task_id).state == states.PENDING
 
 
 def get_operation_handler(operation_action):
@@ -359,7 +457,7 @@ def get_operation_handler(operation_action):
     return _handler
 
 
-def run_bulk_api_operation(operation: BulkApiOperation):
+def run_bulk_api_operation(operation: BulkApiOperation, sync: bool = False):
     try:
         now = timezone.now()
         if now - operation.created_at > datetime.timedelta(minutes=BulkApiOperation.WAIT_TIME_THRESHOLD_IN_MINUTES):
@@ -368,9 +466,38 @@ def run_bulk_api_operation(operation: BulkApiOperation):
             return operation
         logger.info(f'Processing bulk operation: {operation}')
         operation.update_status(BulkApiOperation.BULK_OPERATION_STATUS.IN_PROGRESS)
-        get_operation_handler(operation.action).run(operation)
+        get_operation_handler(operation.action).run(operation, sync=sync)
     except Exception:
         logger.error(f'Failed to process bulk operation: {operation}', exc_info=True)
         operation.update_status(BulkApiOperation.BULK_OPERATION_STATUS.FAILED)
         return False
     return True
+
+
+def run_bulk_api_operation_chunk(operation: BulkApiOperation, chunk: int) -> bool:
+    """
+    Returns True if there are more chunks to process
+    """
+    try:
+        return get_operation_handler(operation.action).run_chunk(operation.pk, chunk)
+    except Exception:
+        logger.error(f'Failed to process bulk operation chunk: {operation} {chunk=}', exc_info=True)
+        operation.update_status(BulkApiOperation.BULK_OPERATION_STATUS.FAILED)
+    return False
+
+
+def resume_bulk_api_operation(operation: BulkApiOperation):
+    """
+    Resume the operation from the last completed chunk (Used when the worker is killed)
+    """
+    if is_chunk_task_queued(operation):
+        logger.info(f'Skipping resume for bulk operation with queued chunk: {operation}')
+        return False
+    try:
+        logger.info(f'Resuming bulk operation: {operation}')
+        get_operation_handler(operation.action).run(operation)
+    except Exception:
+        logger.error(f'Failed to resume bulk operation: {operation}', exc_info=True)
+        operation.update_status(BulkApiOperation.BULK_OPERATION_STATUS.FAILED)
+        return False
+    return True
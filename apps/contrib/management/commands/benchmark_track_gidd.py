@@ -0,0 +1,44 @@
+import time
+from django.core.management.base import BaseCommand
+
+from apps.contrib.models import Client
+from apps.contrib.redis_client_track import get_client_registry
+from helix.caches import external_api_cache
+
+
+class Command(BaseCommand):
+
+    help = "Benchmark the client registry check used by track_gidd for each public API request"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=1000)
+
+    def benchmark(self, label, check, iterations):
+        start = time.time()
+        for _ in range(iterations):
+            check()
+        runtime = time.time() - start
+        self.stdout.write(f'{label}: total={runtime:.3f}s per_request={runtime / iterations * 1000:.3f}ms')
+
+    def handle(self, *args, **kwargs):
+        client_id = Client.objects.filter(is_active=True).values_list('code', flat=True).first()
+        if client_id is None:
+            self.stdout.write('No active client found')
+            return
+        clients = list(Client.objects.values_list('code', flat=True))
+        external_api_cache.set('benchmark_client_ids', clients, 60)
+
+        def _legacy_check():
+            # Previous implementation: full client list from redis and postgres lookup
+            assert client_id in external_api_cache.get('benchmark_client_ids', [])
+            assert Client.objects.filter(code=client_id).first().is_active
+
+        def _registry_check():
+            client_registry = get_client_registry()
+            assert client_id in client_registry['codes']
+            assert client_id in client_registry['active_codes']
+
+        self.stdout.write(f'Clients: {len(clients)}')
+        self.benchmark('Legacy (redis list + postgres)', _legacy_check, kwargs['iterations'])
+        self.benchmark('Client registry', _registry_check, kwargs['iterations'])
+        external_api_cache.delete('benchmark_client_ids')
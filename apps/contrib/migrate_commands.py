@@ -1,5 +1,6 @@
 from django.db.models import Count, Sum, Q
 from django.db import connection
+from django.http import HttpRequest
 
 from utils.common import RuntimeProfile
 from apps.event.models import Event
@@ -11,7 +12,6 @@ from apps.users.enums import USER_ROLE
 from apps.users.utils import HelixInternalBot
 from apps.contrib.models import BulkApiOperation
 from apps.contrib.bulk_operations.serializers import BulkApiOperationSerializer
-from apps.contrib.bulk_operations.tasks import generate_dummy_request
 
 
 @RuntimeProfile('merge_events')
@@ -80,7 +80,9 @@ def merge_events(event_ids_mapping, figure_event_map=None):
         )
 
     internal_bot = HelixInternalBot()
-    api_request = generate_dummy_request(internal_bot.user)
+    # NOTE: Only request.user is used by the serializer
+    api_request = HttpRequest()
+    api_request.user = internal_bot.user
 
     if figure_event_map is None:
         figure_event_map = {}
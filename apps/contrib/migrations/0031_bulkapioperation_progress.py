@@ -0,0 +1,39 @@
+# Generated by Django 3.2 on 2024-03-25 10:04
+
+import django.contrib.postgres.fields
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contrib', '0030_auto_20240113_1522'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='bulkapioperation',
+            name='checkpoint_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='bulkapioperation',
+            name='completed_chunks',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='bulkapioperation',
+            name='item_ids',
+            field=django.contrib.postgres.fields.ArrayField(base_field=models.IntegerField(), blank=True, null=True, size=None),
+        ),
+        migrations.AddField(
+            model_name='bulkapioperation',
+            name='processed_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='bulkapioperation',
+            name='total_count',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+    ]
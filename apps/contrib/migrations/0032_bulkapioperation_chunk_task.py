@@ -0,0 +1,23 @@
+# Generated by Django 3.2 on 2024-03-28 09:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contrib', '0031_bulkapioperation_progress'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='bulkapioperation',
+            name='chunk_dispatched_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='bulkapioperation',
+            name='chunk_task_id',
+            field=models.CharField(blank=True, max_length=255, null=True),
+        ),
+    ]
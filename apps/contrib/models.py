@@ -5,15 +5,17 @@ from uuid import uuid4
 from collections import OrderedDict
 
 from django.apps import apps
+from django.conf import settings
 from django.db.models import JSONField
 from django.db import models, transaction
+from django.contrib.postgres.fields import ArrayField
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 from django_enumfield import enum
 
 from apps.users.models import User
 from utils.fields import CachedFileField
-from apps.contrib.redis_client_track import set_client_ids_in_redis
+from apps.contrib.redis_client_track import sync_clients_in_redis
 
 logger = logging.getLogger(__name__)
 
@@ -316,14 +318,12 @@ class Client(MetaInformationAbstractModel):
 
     def save(self, *args, **kwargs):
         instance = super().save(*args, **kwargs)
-        client_ids = list(Client.objects.values_list('code', flat=True))
-        set_client_ids_in_redis(client_ids)
+        sync_clients_in_redis()
         return instance
 
     def delete(self, *args, **kwargs):
         deleted = super().delete(*args, **kwargs)
-        client_ids = list(Client.objects.values_list('code', flat=True))
-        set_client_ids_in_redis(client_ids)
+        sync_clients_in_redis()
         return deleted
 
 
@@ -435,6 +435,13 @@ class BulkApiOperation(models.Model):
 
     QUERYSET_COUNT_THRESHOLD = 100
     WAIT_TIME_THRESHOLD_IN_MINUTES = 5
+    # NOTE: Chunks are processed sequentially on purpose. They are checkpoints to resume from, not units of
+    # parallelism: each chunk locks the operation row and updates the shared events/review counts.
+    CHUNK_SIZE = settings.BULK_API_OPERATION_CHUNK_SIZE
+    # Operations without any checkpoint within this time are resumed
+    RESUME_THRESHOLD_IN_MINUTES = 10
+    # Chunk tasks still waiting in the queue are not resumed unless they were dispatched before this time
+    CHUNK_QUEUE_THRESHOLD_IN_MINUTES = 60
 
     created_at = models.DateTimeField(verbose_name=_('Created At'), auto_now_add=True)
     created_by = models.ForeignKey(
@@ -472,6 +479,16 @@ class BulkApiOperation(models.Model):
         upload_to=bulk_operation_snapshot,
         max_length=2000,
     )
+    # Progress
+    total_count = models.PositiveIntegerField(blank=True, null=True)
+    processed_count = models.PositiveIntegerField(default=0)
+    # Checkpoint: items are resolved once and processed in chunks of CHUNK_SIZE (next chunk starts at processed_count)
+    item_ids = ArrayField(models.IntegerField(), blank=True, null=True)
+    completed_chunks = models.PositiveIntegerField(default=0)
+    checkpoint_at = models.DateTimeField(blank=True, null=True)
+    # Last queued chunk task
+    chunk_task_id = models.CharField(max_length=255, blank=True, null=True)
+    chunk_dispatched_at = models.DateTimeField(blank=True, null=True)
 
     get_action_display: typing.Callable
     get_status_display: typing.Callable
@@ -492,4 +509,13 @@ class BulkApiOperation(models.Model):
                 self.completed_at = timezone.now()
         self.status = status
         if commit:
-            self.save(update_fields=('status',))
+            self.save(update_fields=('status', 'started_at', 'completed_at'))
+
+    def get_next_chunk_item_ids(self) -> typing.List[int]:
+        """
+        Fetch only the next chunk of item_ids (slice in the database)
+        """
+        start = self.processed_count
+        return BulkApiOperation.objects.filter(pk=self.pk).values_list(
+            f'item_ids__{start}_{start + self.CHUNK_SIZE}', flat=True,
+        ).get() or []
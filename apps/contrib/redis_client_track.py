@@ -1,5 +1,7 @@
 import logging
-from operator import itemgetter
+import math
+import time
+from dataclasses import dataclass
 from datetime import datetime
 
 from django.utils import timezone
@@ -11,41 +13,255 @@ from apps.common.utils import REDIS_SEPARATOR
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+CLIENT_CODES_KEY = 'client_codes'
+ACTIVE_CLIENT_CODES_KEY = 'active_client_codes'
+# NOTE: Other processes will see client changes after this timeout (seconds)
+CLIENT_REGISTRY_LOCAL_CACHE_TIMEOUT = 30
 
-def get_external_redis_data(key):
-    return external_api_cache.get(key)
+# Set of the dates with tracked data (YYYY-MM-DD)
+CLIENT_TRACK_DATES_KEY = 'trackinfo-dates'
+# Set after the counters with the old format (trackinfo:<date>:<api_type>:<client_code>) are migrated
+CLIENT_TRACK_LEGACY_MIGRATED_KEY = 'trackinfo-legacy-migrated'
 
+# Token bucket per client, returns (allowed, remaining tokens)
+CLIENT_RATE_LIMIT_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local refill_rate = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local now = tonumber(ARGV[4])
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'timestamp')
+local tokens = tonumber(bucket[1]) or capacity
+local timestamp = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - timestamp) * refill_rate)
+local allowed = 0
+if tokens >= cost then
+    tokens = tokens - cost
+    allowed = 1
+end
+redis.call('HMSET', KEYS[1], 'tokens', tostring(tokens), 'timestamp', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / refill_rate) + 1)
+return {allowed, tostring(tokens)}
+"""
 
-def create_client_track_cache_key(api_type, client_id):
+# In-process cache of the client registry
+_client_registry = {
+    'expires_at': 0,
+    'codes': frozenset(),
+    'active_codes': frozenset(),
+}
+
+
+def get_client_track_key(tracked_date):
+    """
+    Redis hash with the requests count for the day, field: <api_type>:<client_code>
+    """
+    return external_api_cache.make_key(REDIS_SEPARATOR.join(['trackinfo', tracked_date]))
+
+
+def track_client(api_type, client_id):
     date_today = timezone.now().strftime('%Y-%m-%d')
-    return REDIS_SEPARATOR.join(['trackinfo', date_today, api_type, client_id])
+    pipeline = _get_external_redis_client().pipeline(transaction=False)
+    pipeline.hincrby(get_client_track_key(date_today), REDIS_SEPARATOR.join([api_type, client_id]), 1)
+    pipeline.sadd(external_api_cache.make_key(CLIENT_TRACK_DATES_KEY), date_today)
+    pipeline.execute()
+
+
+def pop_client_tracked_data():
+    """
+    Read and delete the tracked data of the days before today atomically
+    Returns {tracked_date: {(api_type, client_code): requests_per_day}}
+    """
+    redis_client = _get_external_redis_client()
+    tracked_dates_key = external_api_cache.make_key(CLIENT_TRACK_DATES_KEY)
+    date_today = datetime.now().date()
+    # Only save records before today
+    tracked_dates = [
+        tracked_date
+        for tracked_date in (_date.decode() for _date in redis_client.smembers(tracked_dates_key))
+        if datetime.strptime(tracked_date, "%Y-%m-%d").date() < date_today
+    ]
+    if not tracked_dates:
+        return {}
+
+    pipeline = redis_client.pipeline()
+    for tracked_date in tracked_dates:
+        pipeline.hgetall(get_client_track_key(tracked_date))
+        pipeline.delete(get_client_track_key(tracked_date))
+    pipeline.srem(tracked_dates_key, *tracked_dates)
+    results = pipeline.execute()
 
+    tracked_data = {}
+    for tracked_date, counters in zip(tracked_dates, results[::2]):
+        tracked_data[tracked_date] = {}
+        for field, requests_per_day in counters.items():
+            api_type, code = field.decode().split(REDIS_SEPARATOR, 1)
+            tracked_data[tracked_date][(api_type, code)] = int(requests_per_day)
+    return tracked_data
 
-def get_client_tracked_cache_keys():
-    return external_api_cache.keys(f'trackinfo{REDIS_SEPARATOR}*')
 
+def push_client_tracked_data(tracked_data):
+    """
+    Add back the data returned by pop_client_tracked_data (e.g. when it is not saved to the database)
+    """
+    if not tracked_data:
+        return
+    pipeline = _get_external_redis_client().pipeline()
+    for tracked_date, counters in tracked_data.items():
+        for (api_type, code), requests_per_day in counters.items():
+            pipeline.hincrby(
+                get_client_track_key(tracked_date),
+                REDIS_SEPARATOR.join([api_type, code]),
+                requests_per_day,
+            )
+    pipeline.sadd(external_api_cache.make_key(CLIENT_TRACK_DATES_KEY), *tracked_data.keys())
+    pipeline.execute()
 
-def delete_external_redis_record_by_key(*keys):
-    return [
-        external_api_cache.delete(key)
-        for key in keys
+
+def migrate_legacy_client_tracked_data() -> int:
+    """
+    Move the counters saved with the old format (trackinfo:<date>:<api_type>:<client_code>) to the daily hashes
+    NOTE: The keys are scanned only once, returns the number of migrated counters
+    """
+    redis_client = _get_external_redis_client()
+    migrated_key = external_api_cache.make_key(CLIENT_TRACK_LEGACY_MIGRATED_KEY)
+    if redis_client.exists(migrated_key):
+        return 0
+    legacy_keys = [
+        key
+        for key in external_api_cache.iter_keys(REDIS_SEPARATOR.join(['trackinfo', '*']))
+        # NOTE: The daily hashes are also matched: trackinfo:<date>
+        if len(key.split(REDIS_SEPARATOR, 3)) == 4
     ]
+    legacy_data = external_api_cache.get_many(legacy_keys)
 
+    # NOTE: Counters are added and the old keys are deleted in a single transaction
+    pipeline = redis_client.pipeline()
+    for key, requests_per_day in legacy_data.items():
+        _, tracked_date, api_type, code = key.split(REDIS_SEPARATOR, 3)
+        pipeline.hincrby(
+            get_client_track_key(tracked_date),
+            REDIS_SEPARATOR.join([api_type, code]),
+            int(requests_per_day),
+        )
+        pipeline.sadd(external_api_cache.make_key(CLIENT_TRACK_DATES_KEY), tracked_date)
+    if legacy_keys:
+        pipeline.delete(*[external_api_cache.make_key(key) for key in legacy_keys])
+    pipeline.set(migrated_key, 1)
+    pipeline.execute()
+    if legacy_data:
+        logger.info(f'Migrated legacy client track counters: {len(legacy_data)}')
+    return len(legacy_data)
 
-def track_client(api_type, client_id):
-    cache_key = create_client_track_cache_key(api_type, client_id)
-    try:
-        external_api_cache.incr(cache_key)
-    except ValueError:
-        external_api_cache.set(cache_key, 1, None)
+
+def _get_external_redis_client():
+    return external_api_cache.client.get_client(write=True)
 
 
-def set_client_ids_in_redis(client_ids):
-    external_api_cache.set('client_ids', client_ids, None)
+def set_clients_in_redis(clients):
+    """
+    Replace the client registry sets in redis
+    clients: List of (code, is_active)
+    """
+    codes = [code for code, _ in clients]
+    active_codes = [code for code, is_active in clients if is_active]
+    client_codes_key = external_api_cache.make_key(CLIENT_CODES_KEY)
+    active_client_codes_key = external_api_cache.make_key(ACTIVE_CLIENT_CODES_KEY)
+    pipeline = _get_external_redis_client().pipeline()
+    pipeline.delete(client_codes_key, active_client_codes_key)
+    if codes:
+        pipeline.sadd(client_codes_key, *codes)
+    if active_codes:
+        pipeline.sadd(active_client_codes_key, *active_codes)
+    pipeline.execute()
+    clear_client_registry_local_cache()
     return True
 
 
-def pull_track_data_from_redis(tracking_keys):
+def sync_clients_in_redis():
+    from apps.contrib.models import Client
+    clients = list(Client.objects.values_list('code', 'is_active'))
+    set_clients_in_redis(clients)
+    return clients
+
+
+def clear_client_registry_local_cache():
+    _client_registry['expires_at'] = 0
+
+
+def get_client_registry():
+    """
+    Returns the registered and active client codes
+    NOTE: Cached in-process for CLIENT_REGISTRY_LOCAL_CACHE_TIMEOUT
+    """
+    now = time.monotonic()
+    if _client_registry['expires_at'] > now:
+        return _client_registry
+    pipeline = _get_external_redis_client().pipeline()
+    pipeline.smembers(external_api_cache.make_key(CLIENT_CODES_KEY))
+    pipeline.smembers(external_api_cache.make_key(ACTIVE_CLIENT_CODES_KEY))
+    codes, active_codes = pipeline.execute()
+    if codes:
+        codes = frozenset(code.decode() for code in codes)
+        active_codes = frozenset(code.decode() for code in active_codes)
+    else:
+        # NOTE: Registry is not populated yet (or flushed)
+        clients = sync_clients_in_redis()
+        codes = frozenset(code for code, _ in clients)
+        active_codes = frozenset(code for code, is_active in clients if is_active)
+    _client_registry.update(
+        expires_at=now + CLIENT_REGISTRY_LOCAL_CACHE_TIMEOUT,
+        codes=codes,
+        active_codes=active_codes,
+    )
+    return _client_registry
+
+
+@dataclass
+class ClientRateLimit:
+    allowed: bool
+    limit: int
+    remaining: int
+    # Seconds until the bucket is full
+    reset: int
+    # Seconds until the request can be retried
+    retry_after: int
+
+    @property
+    def headers(self):
+        headers = {
+            'X-RateLimit-Limit': str(self.limit),
+            'X-RateLimit-Remaining': str(self.remaining),
+            'X-RateLimit-Reset': str(self.reset),
+        }
+        if not self.allowed:
+            headers['Retry-After'] = str(self.retry_after)
+        return headers
+
+
+def consume_client_rate_limit(client_id, cost, capacity, refill_rate):
+    """
+    Consume the tokens for the request from the client token bucket (single round trip)
+    """
+    allowed, tokens = _get_external_redis_client().eval(
+        CLIENT_RATE_LIMIT_SCRIPT,
+        1,
+        external_api_cache.make_key(REDIS_SEPARATOR.join(['ratelimit', client_id])),
+        capacity,
+        refill_rate,
+        cost,
+        time.time(),
+    )
+    tokens = float(tokens)
+    return ClientRateLimit(
+        allowed=bool(allowed),
+        limit=capacity,
+        remaining=int(tokens),
+        reset=math.ceil((capacity - tokens) / refill_rate),
+        retry_after=0 if allowed else math.ceil((cost - tokens) / refill_rate),
+    )
+
+
+def pull_track_data_from_redis(tracked_data):
     from apps.contrib.models import Client
 
     client_mapping = {
@@ -54,24 +270,18 @@ def pull_track_data_from_redis(tracking_keys):
     }
     tracked_data_from_redis = {}
 
-    for key in tracking_keys:
-        tracked_date, api_type, code = itemgetter(1, 2, 3)(key.split(REDIS_SEPARATOR))
+    for tracked_date, counters in tracked_data.items():
         tracked_date = datetime.strptime(tracked_date, "%Y-%m-%d").date()
-        requests_per_day = get_external_redis_data(key)
-
-        # Only save records before today
-        if tracked_date >= datetime.now().date():
-            continue
-
-        client_id = client_mapping.get(code)
-        if client_id is None:
-            logger.error(f'Client with is code {code} does not exist.')
-            continue
-
-        tracked_data_from_redis[key] = dict(
-            api_type=api_type,
-            client_id=client_id,
-            tracked_date=tracked_date,
-            requests_per_day=requests_per_day,
-        )
+        for (api_type, code), requests_per_day in counters.items():
+            client_id = client_mapping.get(code)
+            if client_id is None:
+                logger.error(f'Client with is code {code} does not exist.')
+                continue
+
+            tracked_data_from_redis[(tracked_date, api_type, client_id)] = dict(
+                api_type=api_type,
+                client_id=client_id,
+                tracked_date=tracked_date,
+                requests_per_day=requests_per_day,
+            )
     return tracked_data_from_redis
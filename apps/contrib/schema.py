@@ -178,6 +178,8 @@ class BulkApiOperationObjectType(DjangoObjectType):
             'completed_at',
             'success_count',
             'failure_count',
+            'total_count',
+            'processed_count',
         )
 
     action = graphene.Field(BulkApiOperationActionEnum)
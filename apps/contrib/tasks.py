@@ -3,14 +3,14 @@ from __future__ import annotations
 import logging
 import re
 import time
-import json
+from contextlib import ExitStack
 from datetime import timedelta
 
 from django.core.files import File
 from django.conf import settings
 from django.utils import timezone
-from django.db.models import F, Value, CharField
-from django.db.models.functions import Concat
+from django.db import transaction
+from django.db.models import Q
 from openpyxl import Workbook
 from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
 
@@ -21,12 +21,17 @@ from helix.celery import app as celery_app
 from apps.entry.tasks import PDF_TASK_TIMEOUT
 from apps.report.tasks import REPORT_TIMEOUT
 from apps.contrib.redis_client_track import (
-    get_client_tracked_cache_keys,
+    migrate_legacy_client_tracked_data,
+    pop_client_tracked_data,
+    push_client_tracked_data,
     pull_track_data_from_redis,
-    delete_external_redis_record_by_key,
 )
-from apps.contrib.bulk_operations.tasks import run_bulk_api_operation as _run_bulk_api_operation
-from apps.common.utils import REDIS_SEPARATOR
+from apps.contrib.bulk_operations.tasks import (
+    run_bulk_api_operation as _run_bulk_api_operation,
+    run_bulk_api_operation_chunk as _run_bulk_api_operation_chunk,
+    resume_bulk_api_operation as _resume_bulk_api_operation,
+    dispatch_bulk_api_operation_chunk as _dispatch_bulk_api_operation_chunk,
+)
 
 
 logging.basicConfig(level=logging.INFO)
@@ -186,14 +191,16 @@ def generate_external_endpoint_dump_file(
     serializer,
     get_data,
     filename,
+    dump_format=None,
 ):
     from apps.entry.models import ExternalApiDump
+    from apps.entry.dumps import DumpFormat, write_dump
+
     external_api_dump, _ = ExternalApiDump.objects.get_or_create(api_type=endpoint_type)
     try:
-        data = get_data()
-        serializer = serializer(data, many=True)
         with get_temp_file(mode="w+") as tmp:
-            json.dump(serializer.data, tmp)
+            # NOTE: Rows are streamed to the file
+            write_dump(dump_format or DumpFormat.JSON, get_data(), serializer, tmp)
             external_api_dump.dump_file.save(
                 filename,
                 File(tmp),
@@ -237,6 +244,73 @@ def _generate_idus_dump_file(api_type):
     )
 
 
+def _generate_idus_dump_files():
+    """
+    Generate IDUS, IDUS_ALL and IDUS_ALL_DISASTER dumps using a single scan of the IDU data
+    NOTE: IDUS and IDUS_ALL_DISASTER are subsets of IDUS_ALL, rows are routed to each dump
+    """
+    from apps.entry.serializers import FigureReadOnlySerializer
+    from apps.entry.views import get_idu_data
+    from apps.entry.models import ExternalApiDump
+    from apps.entry.dumps import DumpFormat, write_dumps
+    from apps.crisis.models import Crisis
+
+    idu_date_from = timezone.localdate(timezone.now() - timedelta(days=180))
+    dumps = [
+        # (api_type, filename, condition)
+        (ExternalApiDump.ExternalApiType.IDUS_ALL, 'idus_all.json', None),
+        (
+            ExternalApiDump.ExternalApiType.IDUS_ALL_DISASTER,
+            'idus_all_disaster.json',
+            lambda item: item['figure_cause'] == Crisis.CRISIS_TYPE.DISASTER,
+        ),
+        (
+            ExternalApiDump.ExternalApiType.IDUS,
+            'idus.json',
+            lambda item: item['displacement_date'] is not None and item['displacement_date'] >= idu_date_from,
+        ),
+    ]
+    external_api_dumps = [
+        ExternalApiDump.objects.get_or_create(api_type=api_type)[0]
+        for api_type, _, _ in dumps
+    ]
+    saved_api_types = set()
+    try:
+        with ExitStack() as stack:
+            tmp_files = [stack.enter_context(get_temp_file(mode="w+")) for _ in dumps]
+            # NOTE: Rows are streamed to all the files
+            write_dumps(
+                get_idu_data(),
+                FigureReadOnlySerializer,
+                [
+                    (DumpFormat.JSON, tmp, condition)
+                    for tmp, (_, _, condition) in zip(tmp_files, dumps)
+                ],
+            )
+            for external_api_dump, tmp, (api_type, filename, _) in zip(external_api_dumps, tmp_files, dumps):
+                external_api_dump.dump_file.save(
+                    filename,
+                    File(tmp),
+                )
+                external_api_dump.status = ExternalApiDump.Status.COMPLETED
+                external_api_dump.save()
+                saved_api_types.add(api_type)
+                logger.info(f'{api_type}: file dump created')
+    except Exception:
+        for external_api_dump in external_api_dumps:
+            if external_api_dump.api_type not in saved_api_types:
+                external_api_dump.status = ExternalApiDump.Status.FAILED
+                external_api_dump.save(update_fields=['status', 'modified_at'])
+        logger.error('IDUS: file dumps generation failed', exc_info=True)
+        return False
+    return True
+
+
+@celery_app.task
+def generate_idus_dump_files():
+    return _generate_idus_dump_files()
+
+
 @celery_app.task
 def generate_idus_dump_file():
     from apps.entry.models import ExternalApiDump
@@ -258,29 +332,26 @@ def generate_idus_all_disaster_dump_file():
 @celery_app.task
 @redis_lock('remaining_lead_extract', 60 * 5)
 def save_and_delete_tracked_data_from_redis_to_db():
+    migrate_legacy_client_tracked_data()
+    # NOTE: Tracked data is deleted from redis when read
+    tracked_data = pop_client_tracked_data()
+    try:
+        _save_tracked_data_to_db(pull_track_data_from_redis(tracked_data))
+    except Exception:
+        push_client_tracked_data(tracked_data)
+        raise
+
+
+def _save_tracked_data_to_db(tracked_data_from_redis):
     from apps.contrib.models import ClientTrackInfo
 
-    tracking_keys = get_client_tracked_cache_keys()
-    tracked_data_from_redis = pull_track_data_from_redis(tracking_keys)
-
-    # Update track records count with max value if they already exist in database
-    existing_track_info_qs = ClientTrackInfo.objects.annotate(
-        redis_tracking_key=Concat(
-            Value('trackinfo'),
-            Value(REDIS_SEPARATOR),
-            F('tracked_date'),
-            Value(REDIS_SEPARATOR),
-            F('api_type'),
-            Value(REDIS_SEPARATOR),
-            F('client__code'),
-            output_field=CharField()
-        )
-    ).filter(
-        redis_tracking_key__in=tracked_data_from_redis.keys()
+    # Add the requests count to the existing track records
+    existing_track_info_qs = ClientTrackInfo.objects.filter(
+        tracked_date__in={item['tracked_date'] for item in tracked_data_from_redis.values()},
+        client_id__in={item['client_id'] for item in tracked_data_from_redis.values()},
     )
-
     existing_track_info_map = {
-        track_info.redis_tracking_key: track_info
+        (track_info.tracked_date, track_info.api_type, track_info.client_id): track_info
         for track_info in existing_track_info_qs
     }
 
@@ -289,12 +360,8 @@ def save_and_delete_tracked_data_from_redis_to_db():
     for key, tracked_item in tracked_data_from_redis.items():
         existing_track_info = existing_track_info_map.get(key)
         if existing_track_info:
-            # If there are more than one tracking info objects per
-            # day take maximum value and update.
-            existing_track_info.requests_per_day = max(
-                tracked_item['requests_per_day'],
-                existing_track_info.requests_per_day
-            )
+            # NOTE: Redis counters are reset after each sync
+            existing_track_info.requests_per_day += tracked_item['requests_per_day']
             update_objects.append(existing_track_info)
         else:
             new_objects.append(
@@ -307,18 +374,42 @@ def save_and_delete_tracked_data_from_redis_to_db():
             )
 
     # Save to database from redis
-    ClientTrackInfo.objects.bulk_create(new_objects)
-    ClientTrackInfo.objects.bulk_update(
-        update_objects,
-        fields=['requests_per_day'],
-    )
-
-    # Finally delete redis keys after save
-    delete_external_redis_record_by_key(tracking_keys)
+    with transaction.atomic():
+        ClientTrackInfo.objects.bulk_create(new_objects)
+        ClientTrackInfo.objects.bulk_update(
+            update_objects,
+            fields=['requests_per_day'],
+        )
 
 
 @celery_app.task
-def run_bulk_api_operation(operation_id: int):
+def run_bulk_api_operation(operation_id: int, sync: bool = False):
+    from apps.contrib.models import BulkApiOperation
+    operation = BulkApiOperation.objects.get(pk=operation_id)
+    return _run_bulk_api_operation(operation, sync=sync)
+
+
+# NOTE: STARTED state is used to differentiate queued chunks from the killed ones while resuming
+@celery_app.task(track_started=True)
+def run_bulk_api_operation_chunk(operation_id: int, chunk: int):
     from apps.contrib.models import BulkApiOperation
     operation = BulkApiOperation.objects.get(pk=operation_id)
-    return _run_bulk_api_operation(operation)
+    if _run_bulk_api_operation_chunk(operation, chunk):
+        # NOTE: Next chunk can be picked by any worker
+        _dispatch_bulk_api_operation_chunk(operation_id, chunk + 1)
+
+
+@celery_app.task
+def resume_bulk_api_operations():
+    from apps.contrib.models import BulkApiOperation
+
+    # NOTE: Operations without recent checkpoint are considered as stopped (e.g. worker killed)
+    threshold = timezone.now() - timedelta(minutes=BulkApiOperation.RESUME_THRESHOLD_IN_MINUTES)
+    operations = BulkApiOperation.objects.filter(
+        status=BulkApiOperation.BULK_OPERATION_STATUS.IN_PROGRESS,
+    ).filter(
+        Q(checkpoint_at__lte=threshold) |
+        Q(checkpoint_at__isnull=True, started_at__lte=threshold)
+    )
+    for operation in operations:
+        _resume_bulk_api_operation(operation)
@@ -5,6 +5,9 @@ import magic
 from unittest.mock import patch
 
 from django.core.files.temp import NamedTemporaryFile
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
 # from rest_framework import serializers
 
 from utils.tests import HelixGraphQLTestCase, create_user_with_role
@@ -13,7 +16,12 @@ from apps.contrib.models import Attachment
 from apps.event.models import Figure
 from apps.users.enums import USER_ROLE
 from apps.contrib.models import BulkApiOperation
-from apps.contrib.bulk_operations.tasks import run_bulk_api_operation
+from apps.contrib.bulk_operations.tasks import (
+    PERMISSION_DENIED_ERRORS,
+    run_bulk_api_operation,
+    get_operation_handler,
+)
+from apps.contrib.tasks import resume_bulk_api_operations
 
 
 # def _raise(expection: Exception):
@@ -110,6 +118,8 @@ class TestBulkOperation(HelixGraphQLTestCase):
             completedAt
             successCount
             failureCount
+            totalCount
+            processedCount
             successList {
               id
               frontendUrl
@@ -406,3 +416,169 @@ class TestBulkOperation(HelixGraphQLTestCase):
         # This shouldn't change at all
         assert figure_qs.filter(role=Figure.ROLE.TRIANGULATION).count() == 2
         assert figure_qs.filter(role=Figure.ROLE.RECOMMENDED).count() == 2
+
+    def test_bulk_figure_event(self):
+        event2 = EventFactory.create(created_by=self.editor, start_date=datetime.date(2010, 1, 1))
+        event2.countries.set([self.country])
+        fig1, fig2 = FigureFactory.create_batch(2, **self.figure_kwargs)
+        # Country not included in the new event
+        fig3 = FigureFactory.create(**{**self.figure_kwargs, 'country': CountryFactory.create()})
+        # Not included in the payload
+        fig4 = FigureFactory.create(**self.figure_kwargs)
+
+        variables = {
+            'data': {
+                'action': BulkApiOperation.BULK_OPERATION_ACTION.FIGURE_EVENT.name,
+                'filters': {
+                    'figureEvent': {
+                        'figure': {
+                            'filterFigureIds': [str(fig.pk) for fig in [fig1, fig2, fig3, fig4]],
+                        },
+                    },
+                },
+                'payload': {
+                    'figureEvent': {
+                        'byFigures': [
+                            {'figure': str(fig.pk), 'event': str(event2.pk)}
+                            for fig in [fig1, fig2, fig3]
+                        ],
+                    },
+                },
+            },
+        }
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.query(self.Mutation, variables=variables)
+        self.assertResponseNoErrors(response)
+        content = response.json()['data']['triggerBulkOperation']
+        self.assertTrue(content['ok'], content)
+
+        operation = BulkApiOperation.objects.get(pk=content['result']['id'])
+        self.assertEqual(BulkApiOperation.BULK_OPERATION_STATUS.COMPLETED, operation.status)
+        self.assertEqual([fig1.pk, fig2.pk], [item['id'] for item in operation.success_list])
+        self.assertEqual([fig3.pk], [item['id'] for item in operation.failure_list])
+        self.assertEqual('country', operation.failure_list[0]['errors'][0]['field'])
+
+        for fig, event in [
+            (fig1, event2),
+            (fig2, event2),
+            (fig3, self.event),
+            (fig4, self.event),
+        ]:
+            fig.refresh_from_db()
+            self.assertEqual(event.pk, fig.event_id)
+        self.assertEqual(self.editor.pk, fig1.last_modified_by_id)
+
+    @patch('apps.contrib.models.BulkApiOperation.CHUNK_SIZE', 1)
+    def test_bulk_figure_role_resume(self):
+        fig1, fig2, fig3 = FigureFactory.create_batch(3, **self.figure_kwargs, role=Figure.ROLE.TRIANGULATION)
+        variables = {
+            'data': {
+                'action': BulkApiOperation.BULK_OPERATION_ACTION.FIGURE_ROLE.name,
+                'filters': {
+                    'figureRole': {
+                        'figure': {
+                            'filterFigureIds': [str(fig.pk) for fig in [fig1, fig2, fig3]],
+                        },
+                    },
+                },
+                'payload': {
+                    'figureRole': {
+                        'role': Figure.ROLE.RECOMMENDED.name,
+                    },
+                },
+            },
+        }
+        # NOTE: on_commit is not triggered here, so the operation is processed manually
+        response = self.query(self.Mutation, variables=variables)
+        self.assertResponseNoErrors(response)
+        operation = BulkApiOperation.objects.get(pk=response.json()['data']['triggerBulkOperation']['result']['id'])
+
+        # Process only the first chunk (e.g. worker is killed after that)
+        handler = get_operation_handler(operation.action)
+        operation.update_status(BulkApiOperation.BULK_OPERATION_STATUS.IN_PROGRESS)
+        handler.prepare(operation)
+        with CaptureQueriesContext(connection) as queries:
+            assert handler.run_chunk(operation.pk, 0) is True
+        # Checkpoint only writes the counters and appends the chunk results
+        checkpoint_sql = [
+            query['sql'] for query in queries.captured_queries
+            if query['sql'].startswith(f'UPDATE "{BulkApiOperation._meta.db_table}"')
+        ]
+        assert len(checkpoint_sql) == 1
+        assert '"item_ids"' not in checkpoint_sql[0]
+        assert '"success_list" ||' in checkpoint_sql[0]
+        # Same chunk is not processed twice
+        assert handler.run_chunk(operation.pk, 0) is False
+
+        content = self.query(self.Query, variables={'id': operation.pk}).json()['data']['bulkApiOperation']
+        self.assertEqual(
+            {'status': 'IN_PROGRESS', 'totalCount': 3, 'processedCount': 1, 'successCount': 1},
+            {key: content[key] for key in ['status', 'totalCount', 'processedCount', 'successCount']},
+        )
+        assert Figure.objects.filter(role=Figure.ROLE.RECOMMENDED).count() == 1
+
+        # Resume the remaining chunks
+        BulkApiOperation.objects.filter(pk=operation.pk).update(
+            checkpoint_at=timezone.now() - datetime.timedelta(minutes=BulkApiOperation.RESUME_THRESHOLD_IN_MINUTES + 1),
+            chunk_task_id='dummy-task-id',
+            chunk_dispatched_at=timezone.now(),
+        )
+        # Chunk task still waiting in the queue is not queued again
+        with patch('apps.contrib.bulk_operations.tasks.AsyncResult') as async_result_mock:
+            async_result_mock.return_value.state = 'PENDING'
+            resume_bulk_api_operations()
+        operation.refresh_from_db()
+        self.assertEqual(
+            (BulkApiOperation.BULK_OPERATION_STATUS.IN_PROGRESS, 1),
+            (operation.status, operation.processed_count),
+        )
+
+        # Chunk task picked by a killed worker
+        with patch('apps.contrib.bulk_operations.tasks.AsyncResult') as async_result_mock:
+            async_result_mock.return_value.state = 'STARTED'
+            resume_bulk_api_operations()
+        operation.refresh_from_db()
+        self.assertEqual(BulkApiOperation.BULK_OPERATION_STATUS.COMPLETED, operation.status)
+        self.assertEqual([fig1.pk, fig2.pk, fig3.pk], [item['id'] for item in operation.success_list])
+        self.assertEqual((3, 3), (operation.processed_count, operation.completed_chunks))
+        assert Figure.objects.filter(role=Figure.ROLE.RECOMMENDED).count() == 3
+
+    @patch('apps.contrib.models.BulkApiOperation.CHUNK_SIZE', 1)
+    def test_bulk_figure_role_sync(self):
+        figures = FigureFactory.create_batch(3, **self.figure_kwargs, role=Figure.ROLE.TRIANGULATION)
+        operation_kwargs = dict(
+            action=BulkApiOperation.BULK_OPERATION_ACTION.FIGURE_ROLE,
+            filters={
+                'figure_role': {
+                    'figure': {
+                        'filter_figure_ids': [str(fig.pk) for fig in figures],
+                    },
+                },
+            },
+            payload={
+                'figure_role': {
+                    'role': Figure.ROLE.RECOMMENDED.value,
+                },
+            },
+        )
+
+        # Each item is reported as failure without the permissions
+        operation = BulkApiOperation.objects.create(created_by=self.guest, **operation_kwargs)
+        run_bulk_api_operation(operation, sync=True)
+        operation.refresh_from_db()
+        self.assertEqual((0, 3), (operation.success_count, operation.failure_count))
+        self.assertEqual(
+            [PERMISSION_DENIED_ERRORS] * 3,
+            [item['errors'] for item in operation.failure_list],
+        )
+        assert Figure.objects.filter(role=Figure.ROLE.RECOMMENDED).count() == 0
+
+        operation = BulkApiOperation.objects.create(created_by=self.editor, **operation_kwargs)
+        # All the chunks are processed inline without queueing any task
+        with patch('apps.contrib.tasks.run_bulk_api_operation_chunk.apply_async') as chunk_apply_async_mock:
+            run_bulk_api_operation(operation, sync=True)
+        chunk_apply_async_mock.assert_not_called()
+        operation.refresh_from_db()
+        self.assertEqual(BulkApiOperation.BULK_OPERATION_STATUS.COMPLETED, operation.status)
+        self.assertEqual((3, 3), (operation.processed_count, operation.completed_chunks))
+        assert Figure.objects.filter(role=Figure.ROLE.RECOMMENDED).count() == 3
@@ -1,5 +1,6 @@
 from rest_framework import status
 from datetime import timedelta
+from django.test import override_settings
 from utils.tests import HelixAPITestCase
 from utils.factories import ClientFactory
 
@@ -9,8 +10,15 @@ from apps.contrib.tasks import (
     generate_idus_dump_file,
     generate_idus_all_dump_file,
     generate_idus_all_disaster_dump_file,
+    generate_idus_dump_files,
     save_and_delete_tracked_data_from_redis_to_db,
 )
+from apps.contrib.redis_client_track import (
+    get_client_registry,
+    clear_client_registry_local_cache,
+    pop_client_tracked_data,
+    push_client_tracked_data,
+)
 from helix.caches import external_api_cache
 
 
@@ -48,6 +56,78 @@ class TestExternalClientTrack(HelixAPITestCase):
             response = self.client.get(self.idus_url)
             assert response.status_code == status.HTTP_403_FORBIDDEN
 
+    def test_client_registry(self):
+        assert {self.client1.code, self.client2.code} == get_client_registry()['codes']
+
+        self.client2.is_active = False
+        self.client2.save()
+        # Registry is loaded from redis
+        with self.assertNumQueries(0):
+            client_registry = get_client_registry()
+        assert {self.client1.code} == client_registry['active_codes']
+        response = self.client.get(f'{self.idus_url}?client_id={self.client2.code}')
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+        # Registry is rebuilt from the database if redis is flushed
+        external_api_cache.clear()
+        clear_client_registry_local_cache()
+        assert {self.client1.code, self.client2.code} == get_client_registry()['codes']
+
+    @override_settings(CLIENT_RATE_LIMIT_CAPACITY=2, CLIENT_RATE_LIMIT_REFILL_RATE=0.01)
+    def test_client_rate_limit(self):
+        url = f'{self.countries_url}?client_id={self.client1.code}'
+        response = self.client.get(url)
+        assert response.status_code == status.HTTP_200_OK
+        assert response['X-RateLimit-Limit'] == '2'
+        assert response['X-RateLimit-Remaining'] == '1'
+
+        response = self.client.get(url)
+        assert response.status_code == status.HTTP_200_OK
+        response = self.client.get(url)
+        assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+        assert response['X-RateLimit-Remaining'] == '0'
+        assert 'Retry-After' in response
+
+        # Exports cost more than the list calls
+        response = self.client.get(f'{self.disasters_url}disaster-export/?client_id={self.client2.code}')
+        assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+        # Bucket is per client
+        response = self.client.get(f'{self.countries_url}?client_id={self.client2.code}')
+        assert response.status_code == status.HTTP_200_OK
+
+    def test_conditional_get(self):
+        for url in [self.countries_url, self.disasters_url]:
+            response = self.client.get(f'{url}?client_id={self.client1.code}')
+            assert response.status_code == status.HTTP_200_OK
+            etag = response['ETag']
+            # Same ETag for other clients
+            response = self.client.get(
+                f'{url}?client_id={self.client2.code}',
+                HTTP_IF_NONE_MATCH=etag,
+            )
+            assert response.status_code == status.HTTP_304_NOT_MODIFIED
+            # Different ETag for other filters
+            response = self.client.get(
+                f'{url}?client_id={self.client1.code}&limit=1',
+                HTTP_IF_NONE_MATCH=etag,
+            )
+            assert response.status_code == status.HTTP_200_OK
+            assert response['ETag'] != etag
+
+        generate_idus_dump_files()
+        url = f'{self.idus_url}?client_id={self.client1.code}'
+        response = self.client.get(url)
+        assert response.status_code == status.HTTP_302_FOUND
+        assert 'Last-Modified' in response
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+        # New dump changes the ETag
+        etag = response['ETag']
+        generate_idus_dump_files()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_302_FOUND
+
     def test_should_return_api_data_for_registered_clients(self):
 
         # Test with invalid client ids
@@ -118,36 +198,50 @@ class TestExternalClientTrack(HelixAPITestCase):
             self.assertEqual(obj.requests_per_day, 3)
 
     def test_should_update_duplicated_tracking_record(self):
-        # Create duplicated redis client tracking keys
-        keys = [
-            'trackinfo:2022-07-09:idus',
-            'trackinfo:2022-07-12:idus',
-            'trackinfo:2022-07-28:idus',
-            'trackinfo:2022-07-05:idus',
-            'trackinfo:2022-07-04:idus',
-            'trackinfo:2022-07-01:idus',
-            'trackinfo:2022-07-06:idus',
-            'trackinfo:2022-08-01:idus',
-            'trackinfo:2022-08-02:idus',
-            'trackinfo:2022-07-14:idus',
-            'trackinfo:2022-07-03:idus',
-            'trackinfo:2022-07-13:idus',
-            'trackinfo:2022-07-02:idus',
-            'trackinfo:2022-07-07:idus',
+        # Create duplicated redis client tracking data
+        tracked_dates = [
+            '2022-07-09', '2022-07-12', '2022-07-28', '2022-07-05', '2022-07-04',
+            '2022-07-01', '2022-07-06', '2022-08-01', '2022-08-02', '2022-07-14',
+            '2022-07-03', '2022-07-13', '2022-07-02', '2022-07-07',
         ]
-        for key in keys:
-            external_api_cache.set(f'{key}:{self.client1.code}', 100, None)
+        tracked_data = {
+            tracked_date: {('idus', self.client1.code): 100}
+            for tracked_date in tracked_dates
+        }
+        push_client_tracked_data(tracked_data)
 
         # Trigger task
         save_and_delete_tracked_data_from_redis_to_db()
         self.assertEqual(ClientTrackInfo.objects.count(), 14)
+        # Tracked data is deleted from redis
+        self.assertEqual({}, pop_client_tracked_data())
 
-        for key in keys:
-            external_api_cache.set(f'{key}:{self.client1.code}', 100, None)
+        push_client_tracked_data(tracked_data)
 
         # Trigger task
         save_and_delete_tracked_data_from_redis_to_db()
         self.assertEqual(ClientTrackInfo.objects.count(), 14)
+        for obj in ClientTrackInfo.objects.all():
+            self.assertEqual(obj.requests_per_day, 200)
+
+    def test_legacy_tracked_data(self):
+        # Counters saved with the old format
+        for tracked_date, requests_per_day in [('2022-07-01', 10), ('2022-07-02', 20)]:
+            external_api_cache.set(f'trackinfo:{tracked_date}:idus:{self.client1.code}', requests_per_day, None)
+        push_client_tracked_data({'2022-07-01': {('idus', self.client1.code): 5}})
+
+        save_and_delete_tracked_data_from_redis_to_db()
+        self.assertEqual(
+            [('2022-07-01', 15), ('2022-07-02', 20)],
+            [
+                (str(tracked_date), requests_per_day)
+                for tracked_date, requests_per_day in ClientTrackInfo.objects.order_by('tracked_date').values_list(
+                    'tracked_date', 'requests_per_day',
+                )
+            ],
+        )
+        # Old keys are deleted
+        self.assertEqual([], list(external_api_cache.iter_keys('trackinfo:*:idus:*')))
 
     def test_gidd_tracked_data(self):
         # Test with invalid client ids
@@ -1,51 +1,60 @@
 from collections import defaultdict
+from datetime import datetime
 from django.db import models
+from django.utils import timezone
 from promise import Promise
 from promise.dataloader import DataLoader
 from apps.crisis.models import Crisis
 from apps.country.models import Country, MonitoringSubRegion
-from apps.entry.models import Figure
+from apps.entry.models import Figure, get_nd_reference_date_expression
 
 
-class TotalFigureThisYearByCountryCategoryEventTypeLoader(DataLoader):
-    def __init__(
-        self,
-        *args,
-        **kwargs
-    ):
-        self.category = kwargs.pop('category')
-        self.event_type = kwargs.pop('event_type')
-        return super().__init__(*args, **kwargs)
-
+class TotalFiguresThisYearByCountryLoader(DataLoader):
     def batch_load_fn(self, keys):
         '''
         keys: [countryId]
+        returns: [{Country.ND_CONFLICT_ANNOTATE: ..., ...}]
+        NOTE: Same totals as Country._total_figure_disaggregation_subquery, but in a single grouped query
         '''
+        now = timezone.now()
+        start_date = datetime(year=now.year, month=1, day=1)
+        end_date = datetime(year=now.year, month=12, day=31)
 
-        qs = Country.objects.filter(
-            id__in=keys
-        ).annotate(
-            **Country._total_figure_disaggregation_subquery()
+        nd_filter = models.Q(
+            category=Figure.FIGURE_CATEGORY_TYPES.NEW_DISPLACEMENT,
+            nd_reference_date__gte=start_date,
+            nd_reference_date__lte=end_date,
         )
+        idp_filter = models.Q(
+            category=Figure.FIGURE_CATEGORY_TYPES.IDPS,
+            end_date__gte=start_date,
+            end_date=end_date,
+        )
+        conflict_filter = models.Q(event__event_type=Crisis.CRISIS_TYPE.CONFLICT)
+        disaster_filter = models.Q(event__event_type=Crisis.CRISIS_TYPE.DISASTER)
 
-        if self.category == Figure.FIGURE_CATEGORY_TYPES.NEW_DISPLACEMENT:
-            if self.event_type == Crisis.CRISIS_TYPE.CONFLICT:
-                qs = qs.annotate(_total=models.F(Country.ND_CONFLICT_ANNOTATE))
-            else:
-                qs = qs.annotate(_total=models.F(Country.ND_DISASTER_ANNOTATE))
-        else:
-            if self.event_type == Crisis.CRISIS_TYPE.CONFLICT:
-                qs = qs.annotate(_total=models.F(Country.IDP_CONFLICT_ANNOTATE))
-            else:
-                qs = qs.annotate(_total=models.F(Country.IDP_DISASTER_ANNOTATE))
+        qs = Figure.objects.filter(
+            country__in=keys,
+            role=Figure.ROLE.RECOMMENDED,
+            event__event_type__in=[Crisis.CRISIS_TYPE.CONFLICT, Crisis.CRISIS_TYPE.DISASTER],
+        ).alias(
+            nd_reference_date=get_nd_reference_date_expression(),
+        ).filter(
+            nd_filter | idp_filter
+        ).order_by().values('country').annotate(**{
+            Country.ND_CONFLICT_ANNOTATE: models.Sum('total_figures', filter=nd_filter & conflict_filter),
+            Country.ND_DISASTER_ANNOTATE: models.Sum('total_figures', filter=nd_filter & disaster_filter),
+            Country.IDP_CONFLICT_ANNOTATE: models.Sum('total_figures', filter=idp_filter & conflict_filter),
+            Country.IDP_DISASTER_ANNOTATE: models.Sum('total_figures', filter=idp_filter & disaster_filter),
+        })
 
         list_to_dict = {
-            item['id']: item['_total']
-            for item in qs.values('id', '_total')
+            item.pop('country'): item
+            for item in qs
         }
 
         return Promise.resolve([
-            list_to_dict.get(country)
+            list_to_dict.get(country, {})
             for country in keys
         ])
 
@@ -201,7 +201,9 @@ class CountryType(DjangoObjectType):
         )
         if value != NULL:
             return value
-        return info.context.country_country_this_year_idps_disaster_loader.load(root.id)
+        return info.context.country_country_this_year_totals_loader.load(root.id).then(
+            lambda totals: totals.get(Country.IDP_DISASTER_ANNOTATE)
+        )
 
     def resolve_total_stock_conflict(root, info, **kwargs):
         NULL = 'null'
@@ -212,7 +214,9 @@ class CountryType(DjangoObjectType):
         )
         if value != NULL:
             return value
-        return info.context.country_country_this_year_idps_conflict_loader.load(root.id)
+        return info.context.country_country_this_year_totals_loader.load(root.id).then(
+            lambda totals: totals.get(Country.IDP_CONFLICT_ANNOTATE)
+        )
 
     def resolve_total_flow_conflict(root, info, **kwargs):
         NULL = 'null'
@@ -223,7 +227,9 @@ class CountryType(DjangoObjectType):
         )
         if value != NULL:
             return value
-        return info.context.country_country_this_year_nd_conflict_loader.load(root.id)
+        return info.context.country_country_this_year_totals_loader.load(root.id).then(
+            lambda totals: totals.get(Country.ND_CONFLICT_ANNOTATE)
+        )
 
     def resolve_total_flow_disaster(root, info, **kwargs):
         NULL = 'null'
@@ -234,7 +240,9 @@ class CountryType(DjangoObjectType):
         )
         if value != NULL:
             return value
-        return info.context.country_country_this_year_nd_disaster_loader.load(root.id)
+        return info.context.country_country_this_year_totals_loader.load(root.id).then(
+            lambda totals: totals.get(Country.ND_DISASTER_ANNOTATE)
+        )
 
     def resolve_geojson_url(root, info, **kwargs):
         return info.context.request.build_absolute_uri(Country.geojson_url(root.iso3))
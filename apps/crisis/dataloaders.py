@@ -2,63 +2,20 @@ from django.db import models
 from promise import Promise
 from promise.dataloader import DataLoader
 
-from apps.entry.models import Figure
+from apps.entry.dataloaders import batch_load_figure_totals_by_reference_date
 from apps.crisis.models import Crisis
 from apps.event.models import Event
 
 
-def batch_load_fn_by_category(keys, category):
-    qs = Crisis.objects.filter(
-        id__in=keys
-    ).annotate(
-        **Crisis._total_figure_disaggregation_subquery()
-    )
-
-    if category == Figure.FIGURE_CATEGORY_TYPES.NEW_DISPLACEMENT:
-        qs = qs.annotate(_total=models.F(Crisis.ND_FIGURES_ANNOTATE))
-    else:
-        qs = qs.annotate(_total=models.F(Crisis.IDP_FIGURES_ANNOTATE))
-
-    batch_load = {
-        item['id']: item['_total']
-        for item in qs.values('id', '_total')
-    }
-
-    return Promise.resolve([
-        batch_load.get(key) for key in keys
-    ])
-
-
-class TotalIDPFigureByCrisisLoader(DataLoader):
+class FigureTotalsByCrisisLoader(DataLoader):
     def batch_load_fn(self, keys):
-        return batch_load_fn_by_category(
+        return batch_load_figure_totals_by_reference_date(
             keys,
-            Figure.FIGURE_CATEGORY_TYPES.IDPS.value,
-        )
-
-
-class TotalNDFigureByCrisisLoader(DataLoader):
-    def batch_load_fn(self, keys):
-        return batch_load_fn_by_category(
-            keys,
-            Figure.FIGURE_CATEGORY_TYPES.NEW_DISPLACEMENT.value,
-        )
-
-
-class MaxStockIDPFigureEndDateByCrisisLoader(DataLoader):
-    def batch_load_fn(self, keys):
-        qs = Crisis.objects.filter(
-            id__in=keys
-        ).annotate(
-            **Crisis._total_figure_disaggregation_subquery()
+            'event__crisis',
+            Crisis.ND_FIGURES_ANNOTATE,
+            Crisis.IDP_FIGURES_ANNOTATE,
+            Crisis.IDP_FIGURES_REFERENCE_DATE_ANNOTATE,
         )
-        batch_load = {
-            item['id']: item[Event.IDP_FIGURES_REFERENCE_DATE_ANNOTATE]
-            for item in qs.values('id', Event.IDP_FIGURES_REFERENCE_DATE_ANNOTATE)
-        }
-        return Promise.resolve([
-            batch_load.get(key) for key in keys
-        ])
 
 
 class EventCountLoader(DataLoader):
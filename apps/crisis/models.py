@@ -2,6 +2,7 @@ from collections import OrderedDict
 
 from django.contrib.postgres.aggregates.general import StringAgg
 from django.db import models
+from django.db.models.functions import Coalesce
 from django.utils.translation import gettext_lazy as _
 from django_enumfield import enum
 
@@ -164,51 +165,12 @@ class Crisis(MetaInformationAbstractModel, models.Model):
 
     @classmethod
     def annotate_review_figures_count(cls):
-        from apps.entry.models import Figure
-
+        # NOTE: Using the review counts of the events
         return {
-            'review_not_started_count': models.Count(
-                'events__figures',
-                filter=models.Q(
-                    events__figures__review_status=Figure.FIGURE_REVIEW_STATUS.REVIEW_NOT_STARTED,
-                    events__figures__role=Figure.ROLE.RECOMMENDED,
-                ) | models.Q(
-                    events__figures__review_status=Figure.FIGURE_REVIEW_STATUS.REVIEW_NOT_STARTED,
-                    events__include_triangulation_in_qa=True,
-                )
-            ),
-            'review_in_progress_count': models.Count(
-                'events__figures',
-                filter=models.Q(
-                    events__figures__review_status=Figure.FIGURE_REVIEW_STATUS.REVIEW_IN_PROGRESS,
-                    events__figures__role=Figure.ROLE.RECOMMENDED,
-                ) | models.Q(
-                    events__figures__review_status=Figure.FIGURE_REVIEW_STATUS.REVIEW_IN_PROGRESS,
-                    events__include_triangulation_in_qa=True,
-                )
-
-            ),
-            'review_re_request_count': models.Count(
-                'events__figures',
-                filter=models.Q(
-                    events__figures__review_status=Figure.FIGURE_REVIEW_STATUS.REVIEW_RE_REQUESTED,
-                    events__figures__role=Figure.ROLE.RECOMMENDED,
-                ) | models.Q(
-                    events__figures__review_status=Figure.FIGURE_REVIEW_STATUS.REVIEW_RE_REQUESTED,
-                    events__include_triangulation_in_qa=True,
-                )
-
-            ),
-            'review_approved_count': models.Count(
-                'events__figures',
-                filter=models.Q(
-                    events__figures__review_status=Figure.FIGURE_REVIEW_STATUS.APPROVED,
-                    events__figures__role=Figure.ROLE.RECOMMENDED,
-                ) | models.Q(
-                    events__figures__review_status=Figure.FIGURE_REVIEW_STATUS.APPROVED,
-                    events__include_triangulation_in_qa=True,
-                )
-            ),
+            'review_not_started_count': Coalesce(models.Sum('events__figure_review_not_started_count'), 0),
+            'review_in_progress_count': Coalesce(models.Sum('events__figure_review_in_progress_count'), 0),
+            'review_re_request_count': Coalesce(models.Sum('events__figure_review_re_request_count'), 0),
+            'review_approved_count': Coalesce(models.Sum('events__figure_review_approved_count'), 0),
             'total_count': (
                 models.F('review_not_started_count') +
                 models.F('review_in_progress_count') +
@@ -55,7 +55,9 @@ class CrisisType(DjangoObjectType):
         )
         if value != NULL:
             return value
-        return info.context.crisis_crisis_total_stock_idp_figures.load(root.id)
+        return info.context.crisis_figure_totals_loader.load(root.id).then(
+            lambda totals: totals.get(Crisis.IDP_FIGURES_ANNOTATE)
+        )
 
     def resolve_stock_idp_figures_max_end_date(root, info, **kwargs):
         NULL = 'null'
@@ -66,7 +68,9 @@ class CrisisType(DjangoObjectType):
         )
         if value != NULL:
             return value
-        return info.context.crisis_stock_idp_figures_max_end_date.load(root.id)
+        return info.context.crisis_figure_totals_loader.load(root.id).then(
+            lambda totals: totals.get(Crisis.IDP_FIGURES_REFERENCE_DATE_ANNOTATE)
+        )
 
     def resolve_total_flow_nd_figures(root, info, **kwargs):
         NULL = 'null'
@@ -77,7 +81,9 @@ class CrisisType(DjangoObjectType):
         )
         if value != NULL:
             return value
-        return info.context.crisis_crisis_total_flow_nd_figures.load(root.id)
+        return info.context.crisis_figure_totals_loader.load(root.id).then(
+            lambda totals: totals.get(Crisis.ND_FIGURES_ANNOTATE)
+        )
 
     def resolve_event_count(root, info, **kwargs):
         return info.context.event_count_dataloader.load(root.id)
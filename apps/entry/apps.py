@@ -5,5 +5,4 @@ class EntryConfig(AppConfig):
     name = 'apps.entry'
 
     def ready(self):
-        # from apps.entry import receivers # noqa :f401
-        pass
+        from apps.entry import receivers # noqa :f401
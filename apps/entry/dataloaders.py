@@ -2,48 +2,84 @@ from django.db import models
 from django.contrib.postgres.aggregates.general import StringAgg
 from promise import Promise
 from promise.dataloader import DataLoader
-from django.db.models import Case, F, When, CharField, Q
+from django.db.models import Case, F, When, CharField, DateField, Q
+from django.utils import timezone
 from collections import defaultdict
 
 from apps.common.utils import EXTERNAL_ARRAY_SEPARATOR
-from apps.entry.models import Entry, Figure
+from apps.entry.models import Entry, Figure, get_nd_reference_date_expression
 from apps.review.models import UnifiedReviewComment
 
 
-def batch_load_fn_by_category(keys, category):
-    qs = Entry.objects.filter(
-        id__in=keys
+def batch_load_figure_totals(keys, key_field):
+    '''
+    Returns the recommended ND total and the recommended IDPs totals by end date for each key
+    using a single grouped query over Figure
+    '''
+    qs = Figure.objects.filter(
+        **{f'{key_field}__in': keys},
+        role=Figure.ROLE.RECOMMENDED,
+        category__in=[
+            Figure.FIGURE_CATEGORY_TYPES.NEW_DISPLACEMENT,
+            Figure.FIGURE_CATEGORY_TYPES.IDPS,
+        ],
+    ).alias(
+        nd_reference_date=get_nd_reference_date_expression(),
+    ).filter(
+        # NOTE: Same as Figure.filtered_nd_figures without dates
+        Q(category=Figure.FIGURE_CATEGORY_TYPES.IDPS) | Q(nd_reference_date__isnull=False)
     ).annotate(
-        **Entry._total_figure_disaggregation_subquery()
+        idp_end_date=Case(
+            When(category=Figure.FIGURE_CATEGORY_TYPES.IDPS, then=F('end_date')),
+            output_field=DateField(),
+        ),
+    ).order_by().values(key_field, 'idp_end_date').annotate(
+        nd_total=models.Sum('total_figures', filter=Q(category=Figure.FIGURE_CATEGORY_TYPES.NEW_DISPLACEMENT)),
+        idp_total=models.Sum('total_figures', filter=Q(category=Figure.FIGURE_CATEGORY_TYPES.IDPS)),
     )
 
-    if category == Figure.FIGURE_CATEGORY_TYPES.NEW_DISPLACEMENT:
-        qs = qs.annotate(_total=models.F(Entry.ND_FIGURES_ANNOTATE))
-    else:
-        qs = qs.annotate(_total=models.F(Entry.IDP_FIGURES_ANNOTATE))
-
-    batch_load = {
-        item['id']: item['_total']
-        for item in qs.values('id', '_total')
-    }
-
+    totals = defaultdict(lambda: dict(nd_total=None, idp_totals={}))
+    for item in qs:
+        key_totals = totals[item[key_field]]
+        if item['nd_total'] is not None:
+            key_totals['nd_total'] = (key_totals['nd_total'] or 0) + item['nd_total']
+        if item['idp_end_date'] is not None:
+            key_totals['idp_totals'][item['idp_end_date']] = item['idp_total']
+    return totals
+
+
+def batch_load_figure_totals_by_reference_date(keys, key_field, nd_annotate, idp_annotate, reference_date_annotate):
+    '''
+    Same as the Event/Crisis _total_figure_disaggregation_subquery, using the latest IDPs end date as reference
+    '''
+    totals = batch_load_figure_totals(keys, key_field)
+    batch_load = {}
+    for key, key_totals in totals.items():
+        reference_date = max(key_totals['idp_totals'], default=None)
+        batch_load[key] = {
+            nd_annotate: key_totals['nd_total'],
+            idp_annotate: key_totals['idp_totals'].get(reference_date),
+            reference_date_annotate: reference_date,
+        }
     return Promise.resolve([
-        batch_load.get(key) for key in keys
+        batch_load.get(key, {}) for key in keys
     ])
 
 
-class TotalIDPFigureByEntryLoader(DataLoader):
-    def batch_load_fn(self, keys):
-        return batch_load_fn_by_category(
-            keys, Figure.FIGURE_CATEGORY_TYPES.IDPS
-        )
-
-
-class TotalNDFigureByEntryLoader(DataLoader):
+class FigureTotalsByEntryLoader(DataLoader):
     def batch_load_fn(self, keys):
-        return batch_load_fn_by_category(
-            keys, Figure.FIGURE_CATEGORY_TYPES.NEW_DISPLACEMENT
-        )
+        today = timezone.now().date()
+        totals = batch_load_figure_totals(keys, 'entry')
+        batch_load = {
+            key: {
+                Entry.ND_FIGURES_ANNOTATE: key_totals['nd_total'],
+                Entry.IDP_FIGURES_ANNOTATE: key_totals['idp_totals'].get(today),
+            }
+            for key, key_totals in totals.items()
+        }
+        return Promise.resolve([
+            batch_load.get(key, {}) for key in keys
+        ])
 
 
 class FigureTypologyLoader(DataLoader):
@@ -0,0 +1,117 @@
+import csv
+import json
+import typing
+
+from rest_framework import serializers
+
+IDU_DUMP_CHUNK_SIZE = 2000
+
+
+class DumpFormat:
+    JSON = 'json'
+    NDJSON = 'ndjson'
+    CSV = 'csv'
+
+    CHOICES = (JSON, NDJSON, CSV)
+
+
+def get_serializer_fields(serializer_class: typing.Type[serializers.Serializer]) -> typing.List[serializers.Field]:
+    return [
+        field
+        for field in serializer_class().fields.values()
+        if not field.write_only
+    ]
+
+
+def iter_serialized_values(qs, serializer_class: typing.Type[serializers.Serializer], chunk_size=IDU_DUMP_CHUNK_SIZE):
+    """
+    Same output as serializer_class(qs, many=True).data without loading the queryset in memory.
+    Only the fields used by the serializer are selected using .values() and rows are fetched
+    using a server-side cursor.
+    Yields (item, row) where item is the raw .values() data and row is the serialized data
+    NOTE: Only works with the serializer fields with direct source (no nested/method fields)
+    """
+    fields = get_serializer_fields(serializer_class)
+    for item in qs.values(
+        *[field.source for field in fields]
+    ).iterator(chunk_size=chunk_size):
+        yield item, {
+            field.field_name: (
+                None if item[field.source] is None
+                else field.to_representation(item[field.source])
+            )
+            for field in fields
+        }
+
+
+class JsonDumpWriter:
+    def __init__(self, file, headers):
+        self.file = file
+        self.count = 0
+        self.file.write('[')
+
+    def write(self, row):
+        if self.count:
+            self.file.write(', ')
+        self.file.write(json.dumps(row))
+        self.count += 1
+
+    def close(self):
+        self.file.write(']')
+
+
+class NdjsonDumpWriter:
+    def __init__(self, file, headers):
+        self.file = file
+
+    def write(self, row):
+        self.file.write(json.dumps(row))
+        self.file.write('\n')
+
+    def close(self):
+        pass
+
+
+class CsvDumpWriter:
+    def __init__(self, file, headers):
+        self.writer = csv.DictWriter(file, fieldnames=headers)
+        self.writer.writeheader()
+
+    def write(self, row):
+        self.writer.writerow(row)
+
+    def close(self):
+        pass
+
+
+DUMP_WRITERS = {
+    DumpFormat.JSON: JsonDumpWriter,
+    DumpFormat.NDJSON: NdjsonDumpWriter,
+    DumpFormat.CSV: CsvDumpWriter,
+}
+
+
+def write_dumps(qs, serializer_class, outputs):
+    """
+    Scan the queryset once and write the serialized rows to all the outputs incrementally
+    outputs: List of (dump_format, file, condition), condition is called with the raw .values() data
+    and the row is written only if it returns True (None to include all rows)
+    """
+    headers = [field.field_name for field in get_serializer_fields(serializer_class)]
+    writers = [
+        (DUMP_WRITERS[dump_format](file, headers), condition)
+        for dump_format, file, condition in outputs
+    ]
+    for item, row in iter_serialized_values(qs, serializer_class):
+        for writer, condition in writers:
+            if condition is None or condition(item):
+                writer.write(row)
+    for writer, _ in writers:
+        writer.close()
+
+
+def write_dump(dump_format, qs, serializer_class, file):
+    """
+    Write the serialized queryset to the file incrementally
+    """
+    write_dumps(qs, serializer_class, [(dump_format, file, None)])
@@ -0,0 +1,44 @@
+import time
+from datetime import date
+from django.core.management.base import BaseCommand
+
+from apps.entry.models import Figure
+
+
+class Command(BaseCommand):
+
+    help = "Benchmark the new displacement/IDPs figure date filters used by GIDD and reports"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start-year', type=int, default=2016)
+        parser.add_argument('--end-year', type=int, default=date.today().year - 1)
+        parser.add_argument('--explain', action='store_true', help='Print the query plan')
+
+    def benchmark(self, label, qs, explain):
+        start = time.time()
+        count = qs.count()
+        runtime = time.time() - start
+        self.stdout.write(f'{label}: figures={count} runtime={runtime:.3f}s')
+        if explain:
+            self.stdout.write(qs.explain(analyze=True))
+
+    def handle(self, *args, **kwargs):
+        self.stdout.write(f'Total figures: {Figure.objects.count()}')
+        for year in range(kwargs['start_year'], kwargs['end_year'] + 1):
+            start_date = date(year=year, month=1, day=1)
+            end_date = date(year=year, month=12, day=31)
+            self.benchmark(
+                f'{year} filtered_nd_figures',
+                Figure.filtered_nd_figures(Figure.objects.all(), start_date, end_date),
+                kwargs['explain'],
+            )
+            self.benchmark(
+                f'{year} filtered_nd_figures_for_listing',
+                Figure.filtered_nd_figures_for_listing(Figure.objects.all(), start_date, end_date),
+                kwargs['explain'],
+            )
+            self.benchmark(
+                f'{year} filtered_idp_figures',
+                Figure.filtered_idp_figures(Figure.objects.all(), start_date, end_date),
+                kwargs['explain'],
+            )
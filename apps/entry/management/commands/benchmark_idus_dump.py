@@ -0,0 +1,50 @@
+import json
+import os
+import time
+import tracemalloc
+from django.core.management.base import BaseCommand
+
+from apps.entry.dumps import DumpFormat, write_dump
+from apps.entry.serializers import FigureReadOnlySerializer
+from apps.entry.views import get_idu_data
+from utils.common import get_temp_file
+
+
+class Command(BaseCommand):
+
+    help = "Benchmark the IDU dump generation (time, peak memory and file size)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', choices=DumpFormat.CHOICES, default=DumpFormat.JSON)
+        parser.add_argument('--limit', type=int, help='Limit the number of figures (e.g. 1000000)')
+        parser.add_argument('--compare', action='store_true', help='Also benchmark the serializer(many=True) dump')
+
+    def benchmark(self, label, write):
+        tracemalloc.start()
+        start = time.time()
+        with get_temp_file(mode='w+') as tmp:
+            write(tmp)
+            tmp.flush()
+            size = os.path.getsize(tmp.name)
+        runtime = time.time() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        self.stdout.write(
+            f'{label}: runtime={runtime:.3f}s peak_memory={peak / 1024 / 1024:.2f}MB size={size / 1024 / 1024:.2f}MB'
+        )
+
+    def handle(self, *args, **kwargs):
+        qs = get_idu_data()
+        if kwargs['limit']:
+            qs = qs[:kwargs['limit']]
+        self.stdout.write(f'Figures: {qs.count()}')
+
+        self.benchmark(
+            f'Streaming ({kwargs["format"]})',
+            lambda file: write_dump(kwargs['format'], qs, FigureReadOnlySerializer, file),
+        )
+        if kwargs['compare']:
+            self.benchmark(
+                'Serializer (json)',
+                lambda file: json.dump(FigureReadOnlySerializer(qs, many=True).data, file),
+            )
@@ -0,0 +1,36 @@
+# Generated by Django 3.2 on 2024-03-20 09:15
+
+from django.db import migrations, models
+import django.db.models.expressions
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('entry', '0097_fix_figure_created_by'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='figure',
+            index=models.Index(fields=['category', 'end_date'], name='entry_fig_category_end_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='figure',
+            index=models.Index(
+                django.db.models.expressions.F('category'),
+                django.db.models.expressions.Case(
+                    django.db.models.expressions.When(
+                        end_date__year__lte=django.db.models.expressions.F('start_date__year'),
+                        then=django.db.models.expressions.F('start_date'),
+                    ),
+                    django.db.models.expressions.When(
+                        end_date__year__gt=django.db.models.expressions.F('start_date__year'),
+                        then=django.db.models.expressions.F('end_date'),
+                    ),
+                    output_field=models.DateField(),
+                ),
+                name='entry_fig_category_nd_date_idx',
+            ),
+        ),
+    ]
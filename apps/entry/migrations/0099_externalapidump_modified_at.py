@@ -0,0 +1,24 @@
+# Generated by Django 3.2 on 2026-10-18 09:00
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('entry', '0098_auto_20240320_0915'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='externalapidump',
+            name='modified_at',
+            field=models.DateTimeField(
+                auto_now=True,
+                default=django.utils.timezone.now,
+                verbose_name='Modified At',
+            ),
+            preserve_default=False,
+        ),
+    ]
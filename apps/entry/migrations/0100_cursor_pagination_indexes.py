@@ -0,0 +1,21 @@
+# Generated by Django 3.2 on 2026-10-18 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('entry', '0099_externalapidump_modified_at'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='entry',
+            index=models.Index(fields=['created_at', 'id'], name='entry_entry_created_at_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='figure',
+            index=models.Index(fields=['created_at', 'id'], name='entry_figure_created_at_id_idx'),
+        ),
+    ]
@@ -10,11 +10,11 @@ from django.contrib.auth import get_user_model
 from django.contrib.postgres.aggregates.general import StringAgg, ArrayAgg
 from django.db.models import JSONField
 from django.contrib.postgres.fields import ArrayField
-from django.db import models
+from django.db import models, transaction
 from django.db.models.query import QuerySet
 from django.db.models import (
-    F, Value, Min, Max, Q, ExpressionWrapper,
-    fields, Case, When,
+    F, Value, Min, Max, Q,
+    Case, When,
 )
 from django.db.models.functions import Concat, ExtractYear, Cast
 from django.utils.translation import gettext_lazy as _, gettext
@@ -29,7 +29,7 @@ from apps.contrib.models import (
     UUIDAbstractModel,
     MetaInformationArchiveAbstractModel,
 )
-from utils.common import get_string_from_list
+from utils.common import get_string_from_list, bump_figure_data_version
 from utils.db import Array
 from utils.fields import CachedFileField, generate_full_media_url
 from apps.contrib.commons import DATE_ACCURACY
@@ -235,6 +235,20 @@ class DisaggregatedAge(models.Model):
         return str(self.pk)
 
 
+def get_nd_reference_date_expression():
+    """
+    Date used to check if a new displacement figure lies within a date range
+    - Figures within a single year use the start date
+    - Figures spanning multiple years use the end date
+    NOTE: This expression is indexed, see Figure.Meta.indexes
+    """
+    return Case(
+        When(end_date__year__lte=F('start_date__year'), then=F('start_date')),
+        When(end_date__year__gt=F('start_date__year'), then=F('end_date')),
+        output_field=models.DateField(),
+    )
+
+
 class Figure(MetaInformationArchiveAbstractModel,
              UUIDAbstractModel,
              FigureDisaggregationAbstractModel,
@@ -547,6 +561,12 @@ class Figure(MetaInformationArchiveAbstractModel,
             models.Index(fields=['category']),
             models.Index(fields=['role']),
             models.Index(fields=['event']),
+            # For filtered_idp_figures
+            models.Index(fields=['category', 'end_date'], name='entry_fig_category_end_idx'),
+            # For filtered_nd_figures
+            models.Index(F('category'), get_nd_reference_date_expression(), name='entry_fig_category_nd_date_idx'),
+            # For CursorPageGraphqlPagination (default cursor_ordering)
+            models.Index(fields=['created_at', 'id'], name='entry_figure_created_at_id_idx'),
         ]
         permissions = (
             ('approve_figure', 'Can approve/unapprove figure'),
@@ -584,55 +604,23 @@ class Figure(MetaInformationArchiveAbstractModel,
         start_date: Optional[date],
         end_date: Optional[date],
     ):
-        # NOTE: We should write this query without using union
-        year_difference = ExpressionWrapper(
-            ExtractYear('end_date') - ExtractYear('start_date'),
-            output_field=fields.IntegerField(),
-        )
-        qs = qs.annotate(year_difference=year_difference)
-
-        same_year_figures_filter = dict(
-            year_difference__lt=1,
-        )
-        multiple_year_figures = dict(
-            year_difference__gte=1,
-        )
-
         if len(categories) > 1:
-            same_year_figures_filter.update(category__in=categories)
-            multiple_year_figures.update(category__in=categories)
+            qs = qs.filter(category__in=categories)
         else:
-            same_year_figures_filter.update(
-                category=Figure.FIGURE_CATEGORY_TYPES.NEW_DISPLACEMENT.value,
-            )
-            multiple_year_figures.update(
-                category=Figure.FIGURE_CATEGORY_TYPES.NEW_DISPLACEMENT.value,
-            )
+            qs = qs.filter(category=Figure.FIGURE_CATEGORY_TYPES.NEW_DISPLACEMENT.value)
 
+        # NOTE: nd_reference_date is indexed, see Figure.Meta.indexes
+        qs = qs.alias(
+            nd_reference_date=get_nd_reference_date_expression(),
+        )
         if start_date:
-            same_year_figures_filter = dict(
-                **same_year_figures_filter,
-                start_date__gte=start_date,
-            )
-            multiple_year_figures = dict(
-                **multiple_year_figures,
-                end_date__gte=start_date
-            )
-
+            qs = qs.filter(nd_reference_date__gte=start_date)
         if end_date:
-            same_year_figures_filter = dict(
-                **same_year_figures_filter,
-                start_date__lte=end_date
-            )
-            multiple_year_figures = dict(
-                **multiple_year_figures,
-                end_date__lte=end_date,
-            )
-
-        return qs.filter(
-            models.Q(**same_year_figures_filter) |
-            models.Q(**multiple_year_figures)
-        )
+            qs = qs.filter(nd_reference_date__lte=end_date)
+        if not start_date and not end_date:
+            # NOTE: Figures without start/end date are not included
+            qs = qs.filter(nd_reference_date__isnull=False)
+        return qs
 
     @classmethod
     def filtered_nd_figures(
@@ -1135,17 +1123,35 @@ class Figure(MetaInformationArchiveAbstractModel,
             figure.review_status = Figure.FIGURE_REVIEW_STATUS.REVIEW_NOT_STARTED
             figure.save()
 
+    @classmethod
+    def update_figures_status(cls, qs):
+        """
+        Set based version of update_figure_status
+        NOTE: Event.refresh_review_counts should be called for the figure events after this
+        """
+        qs.filter(
+            figure_review_comments__isnull=False,
+            review_status__in=[
+                Figure.FIGURE_REVIEW_STATUS.REVIEW_NOT_STARTED,
+                Figure.FIGURE_REVIEW_STATUS.APPROVED,
+            ],
+        ).update(review_status=Figure.FIGURE_REVIEW_STATUS.REVIEW_IN_PROGRESS)
+        qs.filter(
+            figure_review_comments__isnull=True,
+            review_status__in=[
+                Figure.FIGURE_REVIEW_STATUS.REVIEW_IN_PROGRESS,
+                Figure.FIGURE_REVIEW_STATUS.APPROVED,
+            ],
+        ).update(review_status=Figure.FIGURE_REVIEW_STATUS.REVIEW_NOT_STARTED)
+
     # TODO: move this to event model
     @classmethod
     def update_event_status_and_send_notifications(cls, event_id):
-        from apps.event.models import Event
+        cls.update_events_status_and_send_notifications([event_id])
 
-        # FIXME: should we directly get event_id from the args instead?
-        event_with_stats = Event.objects.filter(
-            id=event_id
-        ).annotate(
-            **Event.annotate_review_figures_count()
-        ).first()
+    @staticmethod
+    def get_event_review_status(event_with_stats):
+        from apps.event.models import Event
 
         review_approved_count = event_with_stats.review_approved_count
         review_re_request_count = event_with_stats.review_re_request_count
@@ -1156,43 +1162,76 @@ class Figure(MetaInformationArchiveAbstractModel,
 
         if prev_status == Event.EVENT_REVIEW_STATUS.REVIEW_NOT_STARTED:
             if review_approved_count == total_count and review_approved_count > 0:
-                event_with_stats.review_status = Event.EVENT_REVIEW_STATUS.APPROVED.value
+                return Event.EVENT_REVIEW_STATUS.APPROVED
             elif review_in_progress_count > 0 or review_approved_count > 0 or review_re_request_count > 0:
-                event_with_stats.review_status = Event.EVENT_REVIEW_STATUS.REVIEW_IN_PROGRESS.value
+                return Event.EVENT_REVIEW_STATUS.REVIEW_IN_PROGRESS
         elif prev_status == Event.EVENT_REVIEW_STATUS.REVIEW_IN_PROGRESS:
             if review_approved_count == total_count and review_approved_count > 0:
-                event_with_stats.review_status = Event.EVENT_REVIEW_STATUS.APPROVED.value
+                return Event.EVENT_REVIEW_STATUS.APPROVED
         elif prev_status == Event.EVENT_REVIEW_STATUS.APPROVED_BUT_CHANGED:
             if review_approved_count == total_count and review_approved_count > 0:
-                event_with_stats.review_status = Event.EVENT_REVIEW_STATUS.APPROVED.value
+                return Event.EVENT_REVIEW_STATUS.APPROVED
         elif prev_status == Event.EVENT_REVIEW_STATUS.SIGNED_OFF_BUT_CHANGED:
             if review_approved_count == total_count and review_approved_count > 0:
-                event_with_stats.review_status = Event.EVENT_REVIEW_STATUS.APPROVED.value
+                return Event.EVENT_REVIEW_STATUS.APPROVED
         elif prev_status == Event.EVENT_REVIEW_STATUS.APPROVED:
             if review_approved_count != total_count:
-                event_with_stats.review_status = Event.EVENT_REVIEW_STATUS.APPROVED_BUT_CHANGED
+                return Event.EVENT_REVIEW_STATUS.APPROVED_BUT_CHANGED
         elif prev_status == Event.EVENT_REVIEW_STATUS.SIGNED_OFF:
             if review_approved_count != total_count:
-                event_with_stats.review_status = Event.EVENT_REVIEW_STATUS.SIGNED_OFF_BUT_CHANGED
-        event_with_stats.save()
+                return Event.EVENT_REVIEW_STATUS.SIGNED_OFF_BUT_CHANGED
+        return prev_status
 
-        # TODO: add notification for transition to APPROVED_BUT_CHANGED, SIGNED_OFF_BUT_CHANGED, REVIEW_IN_PROGRESS?
-        if (
-            prev_status != event_with_stats.review_status and
-            event_with_stats.review_status == Event.EVENT_REVIEW_STATUS.APPROVED
+    @classmethod
+    def update_events_status_and_send_notifications(cls, event_ids):
+        """
+        Re-calculate the review status of the events using a single grouped query,
+        save the changed events using bulk_update and send the notifications in a batch.
+        """
+        from apps.event.models import Event
+
+        now = timezone.now()
+        changed_events = []
+        notifications = []
+        for event_with_stats in Event.objects.filter(
+            id__in=event_ids
+        ).annotate(
+            **Event.annotate_review_figures_count()
         ):
-            recipients = [user['id'] for user in Event.regional_coordinators(event_with_stats)]
-            if (event_with_stats.created_by_id):
-                recipients.append(event_with_stats.created_by_id)
-            if (event_with_stats.assignee_id):
-                recipients.append(event_with_stats.assignee_id)
-
-            Notification.send_safe_multiple_notifications(
-                recipients=recipients,
-                type=Notification.Type.EVENT_APPROVED,
-                event=event_with_stats,
-                actor=None,
+            prev_status = event_with_stats.review_status
+            review_status = cls.get_event_review_status(event_with_stats)
+            if review_status == prev_status:
+                continue
+            event_with_stats.review_status = review_status
+            event_with_stats.modified_at = now
+            changed_events.append(event_with_stats)
+
+            # TODO: add notification for transition to APPROVED_BUT_CHANGED, SIGNED_OFF_BUT_CHANGED, REVIEW_IN_PROGRESS?
+            if review_status == Event.EVENT_REVIEW_STATUS.APPROVED:
+                recipients = {user['id'] for user in Event.regional_coordinators(event_with_stats)}
+                if (event_with_stats.created_by_id):
+                    recipients.add(event_with_stats.created_by_id)
+                if (event_with_stats.assignee_id):
+                    recipients.add(event_with_stats.assignee_id)
+                notifications.extend([
+                    Notification(
+                        recipient_id=recipient_id,
+                        type=Notification.Type.EVENT_APPROVED,
+                        event=event_with_stats,
+                        actor=None,
+                    )
+                    for recipient_id in recipients
+                ])
+
+        if changed_events:
+            Event.objects.bulk_update(changed_events, ['review_status', 'modified_at'])
+            # NOTE: bulk_update doesn't trigger the signals
+            country_ids = set(
+                Figure.objects.filter(event__in=changed_events).order_by().values_list('country', flat=True).distinct()
             )
+            transaction.on_commit(lambda: bump_figure_data_version(country_ids))
+        if notifications:
+            Notification.objects.bulk_create(notifications)
 
     def can_be_updated_by(self, user: User) -> bool:
         """
@@ -1317,6 +1356,12 @@ class Entry(MetaInformationArchiveAbstractModel, models.Model):
     review_status = enum.EnumField(enum=EntryReviewer.REVIEW_STATUS, verbose_name=_('Review Status'),
                                    null=True, blank=True)
 
+    class Meta:
+        indexes = [
+            # For CursorPageGraphqlPagination (default cursor_ordering)
+            models.Index(fields=['created_at', 'id'], name='entry_entry_created_at_id_idx'),
+        ]
+
     @classmethod
     def _total_figure_disaggregation_subquery(cls, figures=None):
         figures1 = figures or Figure.objects.all()
@@ -1791,6 +1836,7 @@ class ExternalApiDump(models.Model):
     status = models.IntegerField(
         choices=Status.choices, default=Status.PENDING
     )
+    modified_at = models.DateTimeField(verbose_name=_('Modified At'), auto_now=True)
 
     def __str__(self):
         return self.api_type
@@ -0,0 +1,31 @@
+from django.db.models.signals import pre_save
+from django.dispatch import receiver
+
+from .models import Figure
+
+# NOTE: Saved values of the figure fields used by the Figure post_save receivers of the other apps
+FIGURE_PREVIOUS_STATE_FIELDS = (
+    'country_id',
+    'event_id',
+    'review_status',
+    'role',
+    'start_date',
+    'end_date',
+)
+
+
+@receiver(pre_save, sender=Figure)
+def store_figure_previous_state(sender, instance, **kwargs):
+    # NOTE: Fetched once here instead of a query for each of the receivers
+    instance._previous_state = None
+    if instance.pk:
+        instance._previous_state = Figure.objects.filter(
+            pk=instance.pk
+        ).values(*FIGURE_PREVIOUS_STATE_FIELDS).first()
+
+
+def get_figure_previous_state(instance):
+    """
+    Returns the saved values of FIGURE_PREVIOUS_STATE_FIELDS before the current save, None for new figures
+    """
+    return getattr(instance, '_previous_state', None)
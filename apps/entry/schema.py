@@ -41,7 +41,7 @@ from apps.contrib.commons import DateAccuracyGrapheneEnum
 from apps.organization.schema import OrganizationListType
 from utils.graphene.types import CustomDjangoListObjectType
 from utils.graphene.fields import DjangoPaginatedListObjectField
-from utils.graphene.pagination import PageGraphqlPaginationWithoutCount
+from utils.graphene.pagination import PageGraphqlPaginationWithoutCount, CursorPageGraphqlPagination
 from apps.extraction.filters import (
     FigureExtractionFilterSet,
     ReportFigureExtractionFilterSet,
@@ -196,6 +196,7 @@ class FigureListType(CustomDjangoListObjectType):
     class Meta:
         model = Figure
         filterset_class = FigureFilter
+        cursor_pagination = True
 
 
 class TotalFigureFilterInputType(graphene.InputObjectType):
@@ -262,6 +263,7 @@ class EntryListType(CustomDjangoListObjectType):
     class Meta:
         model = Entry
         filterset_class = EntryExtractionFilterSet
+        cursor_pagination = True
 
 
 class SourcePreviewType(DjangoObjectType):
@@ -305,13 +307,13 @@ class Query:
 
     figure = DjangoObjectField(FigureType)
     figure_list = DjangoPaginatedListObjectField(FigureListType,
-                                                 pagination=PageGraphqlPaginationWithoutCount(
+                                                 pagination=CursorPageGraphqlPagination(
                                                      page_size_query_param='pageSize',
                                                  ), filterset_class=FigureExtractionFilterSet)
     source_preview = DjangoObjectField(SourcePreviewType)
     entry = DjangoObjectField(EntryType)
     entry_list = DjangoPaginatedListObjectField(EntryListType,
-                                                pagination=PageGraphqlPaginationWithoutCount(
+                                                pagination=CursorPageGraphqlPagination(
                                                     page_size_query_param='pageSize'
                                                 ))
     disaggregated_age = DjangoObjectField(DisaggregatedAgeType)
@@ -1,12 +1,19 @@
-from datetime import datetime, timedelta
+import csv
+import json
+from io import StringIO
+from datetime import date, datetime, timedelta
 
 from django.utils import timezone
 
 from apps.crisis.models import Crisis
+from apps.event.models import Event
 from apps.users.enums import USER_ROLE
 from apps.entry.models import (
     Figure,
 )
+from apps.entry.dumps import DumpFormat, write_dump, write_dumps
+from apps.entry.serializers import FigureReadOnlySerializer
+from apps.entry.views import get_idu_data
 from utils.factories import (
     EntryFactory,
     FigureFactory,
@@ -248,6 +255,84 @@ class TestFigureModel(HelixTestCase):
         self.assertIn(f4, idp)
         self.assertNotIn(f5, idp)
 
+    def test_figure_nd_reference_date_filtering(self):
+        nd_cat = Figure.FIGURE_CATEGORY_TYPES.NEW_DISPLACEMENT.value
+        idp_cat = Figure.FIGURE_CATEGORY_TYPES.IDPS.value
+        start_date = date(2022, 1, 1)
+        end_date = date(2022, 12, 31)
+
+        def _create_figure(category, figure_start_date, figure_end_date):
+            return FigureFactory.create(
+                start_date=figure_start_date,
+                end_date=figure_end_date,
+                category=category,
+                role=Figure.ROLE.RECOMMENDED,
+                event=self.event,
+            )
+
+        # Single year figures use the start date
+        nd1 = _create_figure(nd_cat, date(2022, 1, 1), date(2022, 1, 5))
+        nd2 = _create_figure(nd_cat, date(2022, 12, 31), date(2022, 12, 31))
+        nd3 = _create_figure(nd_cat, date(2021, 12, 31), date(2021, 12, 31))
+        # Multiple year figures use the end date
+        nd4 = _create_figure(nd_cat, date(2021, 12, 1), date(2022, 1, 1))
+        nd5 = _create_figure(nd_cat, date(2021, 6, 1), date(2022, 12, 31))
+        nd6 = _create_figure(nd_cat, date(2022, 12, 31), date(2023, 1, 1))
+        nd7 = _create_figure(nd_cat, date(2020, 1, 1), date(2021, 12, 31))
+        # Figures without end date are not included
+        nd8 = _create_figure(nd_cat, date(2022, 6, 1), None)
+        idp1 = _create_figure(idp_cat, date(2021, 6, 1), date(2022, 12, 31))
+        idp2 = _create_figure(idp_cat, date(2022, 6, 1), date(2022, 12, 30))
+        idp3 = _create_figure(idp_cat, date(2021, 6, 1), date(2021, 12, 31))
+
+        qs = Figure.objects.filter(
+            id__in=[figure.id for figure in [nd1, nd2, nd3, nd4, nd5, nd6, nd7, nd8, idp1, idp2, idp3]],
+        )
+        for figure_start_date, figure_end_date, expected_figures in [
+            (start_date, end_date, [nd1, nd2, nd4, nd5]),
+            (start_date, None, [nd1, nd2, nd4, nd5, nd6]),
+            (None, date(2021, 12, 31), [nd3, nd7]),
+            (None, None, [nd1, nd2, nd3, nd4, nd5, nd6, nd7]),
+            (date(2022, 1, 2), date(2022, 12, 30), []),
+        ]:
+            self.assertQuerySetEqual(
+                expected_figures,
+                Figure.filtered_nd_figures(qs, figure_start_date, figure_end_date),
+                (figure_start_date, figure_end_date),
+            )
+            # Listing uses the same date filter
+            self.assertQuerySetEqual(
+                expected_figures,
+                Figure.filtered_nd_figures_for_listing(qs, figure_start_date, figure_end_date),
+                (figure_start_date, figure_end_date),
+            )
+
+        # IDPs use the end date
+        self.assertQuerySetEqual([idp1], Figure.filtered_idp_figures(qs, start_date, end_date))
+        self.assertQuerySetEqual([idp1, idp2], Figure.filtered_idp_figures(qs, start_date, None))
+        self.assertQuerySetEqual([idp1, idp2], Figure.filtered_idp_figures_for_listing(qs, start_date, end_date))
+        self.assertQuerySetEqual(
+            [idp1, idp2, idp3],
+            Figure.filtered_idp_figures_for_listing(qs, None, end_date),
+        )
+
+    def test_update_events_status_and_send_notifications(self):
+        event2 = EventFactory.create(created_by=self.editor, review_status=Event.EVENT_REVIEW_STATUS.APPROVED)
+        event3 = EventFactory.create(created_by=self.editor)
+        self.figure.review_status = Figure.FIGURE_REVIEW_STATUS.APPROVED
+        self.figure.save()
+        FigureFactory.create(entry=self.entry, event=event2, review_status=Figure.FIGURE_REVIEW_STATUS.REVIEW_NOT_STARTED)
+        FigureFactory.create(entry=self.entry, event=event3, review_status=Figure.FIGURE_REVIEW_STATUS.REVIEW_NOT_STARTED)
+
+        Figure.update_events_status_and_send_notifications([self.event.pk, event2.pk, event3.pk])
+        for event, review_status in [
+            (self.event, Event.EVENT_REVIEW_STATUS.APPROVED),
+            (event2, Event.EVENT_REVIEW_STATUS.APPROVED_BUT_CHANGED),
+            (event3, Event.EVENT_REVIEW_STATUS.REVIEW_NOT_STARTED),
+        ]:
+            event.refresh_from_db()
+            self.assertEqual(review_status, event.review_status)
+
 
 class TestEntryModel(HelixTestCase):
     def setUp(self) -> None:
@@ -311,3 +396,70 @@ class TestEntryModel(HelixTestCase):
         e.save()
         e.refresh_from_db()
         self.assertEqual(e.calculation_logic, markup_and_html_mixed_data_cleaned)
+
+
+class TestIduDump(HelixTestCase):
+    def setUp(self) -> None:
+        event = EventFactory.create(event_type=Crisis.CRISIS_TYPE.DISASTER.value)
+        FigureFactory.create_batch(
+            3,
+            event=event,
+            category=Figure.FIGURE_CATEGORY_TYPES.NEW_DISPLACEMENT,
+            include_idu=True,
+            excerpt_idu='excerpt',
+        )
+        # Not included in IDU
+        FigureFactory.create(event=event, category=Figure.FIGURE_CATEGORY_TYPES.NEW_DISPLACEMENT, include_idu=False)
+
+    def test_dump_formats(self):
+        expected_data = json.loads(json.dumps(FigureReadOnlySerializer(get_idu_data(), many=True).data))
+        self.assertEqual(3, len(expected_data))
+
+        def _dump(dump_format):
+            file = StringIO()
+            write_dump(dump_format, get_idu_data(), FigureReadOnlySerializer, file)
+            return file.getvalue()
+
+        self.assertEqual(expected_data, json.loads(_dump(DumpFormat.JSON)))
+        self.assertEqual(
+            expected_data,
+            [json.loads(line) for line in _dump(DumpFormat.NDJSON).splitlines()],
+        )
+        csv_rows = list(csv.DictReader(StringIO(_dump(DumpFormat.CSV))))
+        self.assertEqual(
+            [str(item['id']) for item in expected_data],
+            [row['id'] for row in csv_rows],
+        )
+
+    def test_write_dumps_single_scan(self):
+        conflict_event = EventFactory.create(event_type=Crisis.CRISIS_TYPE.CONFLICT.value)
+        FigureFactory.create(
+            event=conflict_event,
+            figure_cause=Crisis.CRISIS_TYPE.CONFLICT,
+            category=Figure.FIGURE_CATEGORY_TYPES.NEW_DISPLACEMENT,
+            include_idu=True,
+            excerpt_idu='excerpt',
+        )
+        all_file, disaster_file = StringIO(), StringIO()
+        with self.assertNumQueries(1):
+            write_dumps(
+                get_idu_data(),
+                FigureReadOnlySerializer,
+                [
+                    (DumpFormat.JSON, all_file, None),
+                    (
+                        DumpFormat.JSON,
+                        disaster_file,
+                        lambda item: item['figure_cause'] == Crisis.CRISIS_TYPE.DISASTER,
+                    ),
+                ],
+            )
+        self.assertEqual(4, len(json.loads(all_file.getvalue())))
+        self.assertEqual(
+            list(
+                get_idu_data().filter(
+                    figure_cause=Crisis.CRISIS_TYPE.DISASTER,
+                ).order_by('id').values_list('id', flat=True)
+            ),
+            sorted(item['id'] for item in json.loads(disaster_file.getvalue())),
+        )
@@ -34,6 +34,21 @@ def get_event_notification_type(event, is_figure_deleted=False, is_figure_new=Fa
     return get_figure_notification_type(event, is_deleted=is_figure_deleted, is_new=is_figure_new)
 
 
+def get_figure_notification_recipients(event: Event, actor: User) -> typing.List[int]:
+    recipients = [
+        user['id']
+        for user in Event.regional_coordinators(
+            event,
+            actor=actor,
+        )
+    ]
+    if event.created_by_id:
+        recipients.append(event.created_by_id)
+    if event.assignee_id:
+        recipients.append(event.assignee_id)
+    return recipients
+
+
 def send_figure_notifications(
     figure: Figure,
     actor: User,
@@ -43,20 +58,8 @@ def send_figure_notifications(
 ):
     _event = event or figure.event
 
-    recipients = [
-        user['id']
-        for user in Event.regional_coordinators(
-            _event,
-            actor=actor,
-        )
-    ]
-    if _event.created_by_id:
-        recipients.append(_event.created_by_id)
-    if _event.assignee_id:
-        recipients.append(_event.assignee_id)
-
     Notification.send_safe_multiple_notifications(
-        recipients=recipients,
+        recipients=get_figure_notification_recipients(_event, actor),
         actor=actor,
         event=_event,
         entry=figure.entry,
@@ -68,6 +71,33 @@ def send_figure_notifications(
     )
 
 
+def send_figures_notifications(
+    figures: typing.List[Figure],
+    actor: User,
+    notification_type: Notification.Type,
+    event: Event,
+):
+    """
+    Same as send_figure_notifications for multiple figures of the same event,
+    the recipients are resolved once and the notifications are created in a single query.
+    """
+    recipient_set = set(get_figure_notification_recipients(event, actor))
+    if actor:
+        recipient_set.discard(actor.id)
+    Notification.objects.bulk_create([
+        Notification(
+            recipient_id=recipient_id,
+            type=notification_type,
+            actor=actor,
+            figure=figure,
+            event=event,
+            entry_id=figure.entry_id,
+        )
+        for figure in figures
+        for recipient_id in recipient_set
+    ])
+
+
 class BulkUpdateFigureManager():
     event_ids: typing.Set[int]
     figure_moved_from_event: typing.Set[Event]
@@ -85,5 +115,5 @@ class BulkUpdateFigureManager():
     # Note: Using *_ will make typing make this as non context manager
     def __exit__(self, exc_type, exc_value, exc_traceback):
         # Update status
-        for event_id in self.event_ids:
-            Figure.update_event_status_and_send_notifications(event_id)
+        if self.event_ids:
+            Figure.update_events_status_and_send_notifications(self.event_ids)
@@ -11,7 +11,7 @@ from rest_framework.response import Response
 from django.shortcuts import redirect
 
 from apps.gidd.views import client_id
-from utils.common import track_gidd
+from utils.common import track_gidd, get_not_modified_response
 from apps.common.utils import EXTERNAL_TUPLE_SEPARATOR
 
 
@@ -289,12 +289,20 @@ class ExternalEndpointBaseCachedViewMixin():
         track_gidd(
             client_id,
             self.ENDPOINT_TYPE,
+            viewset=self,
         )
         api_dump = ExternalApiDump.objects.filter(api_type=self.ENDPOINT_TYPE).first()
         # NOTE: Sending empty array so client don't break.
         _empty_response = []
         if not api_dump:
             return Response(_empty_response, status=status.HTTP_404_NOT_FOUND)
+        if response := get_not_modified_response(
+            self,
+            request,
+            [api_dump.status, api_dump.dump_file.name],
+            api_dump.modified_at.timestamp(),
+        ):
+            return response
         if api_dump.status == ExternalApiDump.Status.COMPLETED:
             return redirect(
                 request.build_absolute_uri(
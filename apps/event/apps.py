@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class EventConfig(AppConfig):
     name = 'apps.event'
+
+    def ready(self):
+        from apps.event import receivers # noqa :f401
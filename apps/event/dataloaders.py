@@ -6,62 +6,20 @@ from django.contrib.postgres.aggregates import ArrayAgg
 from promise import Promise
 from promise.dataloader import DataLoader
 
+from apps.entry.dataloaders import batch_load_figure_totals_by_reference_date
 from apps.entry.models import Figure
 from apps.event.models import Event, EventCode
 
 
-def batch_load_fn_by_category(keys, category):
-    qs = Event.objects.filter(
-        id__in=keys
-    ).annotate(
-        **Event._total_figure_disaggregation_subquery()
-    )
-
-    if category == Figure.FIGURE_CATEGORY_TYPES.NEW_DISPLACEMENT.value:
-        qs = qs.annotate(_total=models.F(Event.ND_FIGURES_ANNOTATE))
-    else:
-        qs = qs.annotate(_total=models.F(Event.IDP_FIGURES_ANNOTATE))
-
-    batch_load = {
-        item['id']: item['_total']
-        for item in qs.values('id', '_total')
-    }
-
-    return Promise.resolve([
-        batch_load.get(key) for key in keys
-    ])
-
-
-class TotalIDPFigureByEventLoader(DataLoader):
+class FigureTotalsByEventLoader(DataLoader):
     def batch_load_fn(self, keys):
-        return batch_load_fn_by_category(
+        return batch_load_figure_totals_by_reference_date(
             keys,
-            Figure.FIGURE_CATEGORY_TYPES.IDPS.value,
-        )
-
-
-class TotalNDFigureByEventLoader(DataLoader):
-    def batch_load_fn(self, keys):
-        return batch_load_fn_by_category(
-            keys,
-            Figure.FIGURE_CATEGORY_TYPES.NEW_DISPLACEMENT.value,
-        )
-
-
-class MaxStockIDPFigureEndDateByEventLoader(DataLoader):
-    def batch_load_fn(self, keys):
-        qs = Event.objects.filter(
-            id__in=keys
-        ).annotate(
-            **Event._total_figure_disaggregation_subquery()
+            'event',
+            Event.ND_FIGURES_ANNOTATE,
+            Event.IDP_FIGURES_ANNOTATE,
+            Event.IDP_FIGURES_REFERENCE_DATE_ANNOTATE,
         )
-        batch_load = {
-            item['id']: item[Event.IDP_FIGURES_REFERENCE_DATE_ANNOTATE]
-            for item in qs.values('id', Event.IDP_FIGURES_REFERENCE_DATE_ANNOTATE)
-        }
-        return Promise.resolve([
-            batch_load.get(key) for key in keys
-        ])
 
 
 class EventEntryCountLoader(DataLoader):
@@ -0,0 +1,32 @@
+from django.db import models
+from django.core.management.base import BaseCommand
+
+from apps.event.models import Event
+
+
+class Command(BaseCommand):
+
+    help = "Reconcile the figure review counts stored on the events with the figures"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Only show the events with wrong counts')
+
+    def handle(self, *args, **kwargs):
+        actual_count_subqueries = Event.get_review_count_subqueries()
+        mismatch_filter = models.Q()
+        for count_field in Event.REVIEW_COUNT_FIELDS.values():
+            mismatch_filter |= ~models.Q(**{count_field: models.F(f'actual_{count_field}')})
+
+        event_ids = list(
+            Event.objects.annotate(**{
+                f'actual_{count_field}': subquery
+                for count_field, subquery in actual_count_subqueries.items()
+            }).filter(mismatch_filter).values_list('id', flat=True)
+        )
+        self.stdout.write(f'Events with wrong review counts: {len(event_ids)}')
+        if event_ids:
+            self.stdout.write(f'Event ids: {event_ids}')
+        if kwargs['dry_run'] or not event_ids:
+            return
+        Event.refresh_review_counts(event_ids)
+        self.stdout.write(self.style.SUCCESS(f'Updated review counts of {len(event_ids)} events'))
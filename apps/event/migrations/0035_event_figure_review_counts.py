@@ -0,0 +1,65 @@
+# Generated by Django 3.2 on 2024-03-27 08:21
+
+from django.db import migrations, models
+from django.db.models.functions import Coalesce
+
+
+class Migration(migrations.Migration):
+
+    def update_figure_review_counts(apps, schema_editor):
+        Event = apps.get_model('event', 'Event')
+        Figure = apps.get_model('entry', 'Figure')
+        # NOTE: Same as Event.refresh_review_counts
+        # Figure.ROLE.RECOMMENDED = 0
+        # Figure.FIGURE_REVIEW_STATUS: REVIEW_NOT_STARTED = 0, REVIEW_IN_PROGRESS = 1, APPROVED = 2, REVIEW_RE_REQUESTED = 3
+        review_count_fields = {
+            0: 'figure_review_not_started_count',
+            1: 'figure_review_in_progress_count',
+            3: 'figure_review_re_request_count',
+            2: 'figure_review_approved_count',
+        }
+        Event.objects.update(**{
+            count_field: Coalesce(
+                models.Subquery(
+                    Figure.objects.filter(
+                        models.Q(role=0) | models.Q(event__include_triangulation_in_qa=True),
+                        event=models.OuterRef('pk'),
+                        review_status=review_status,
+                    ).order_by().values('event').annotate(
+                        count=models.Count('id')
+                    ).values('count')[:1],
+                    output_field=models.IntegerField(),
+                ),
+                0,
+            )
+            for review_status, count_field in review_count_fields.items()
+        })
+
+    dependencies = [
+        ('entry', '0098_auto_20240320_0915'),
+        ('event', '0034_alter_eventcode_uuid'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='figure_review_approved_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='figure_review_in_progress_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='figure_review_not_started_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='figure_review_re_request_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.RunPython(update_figure_review_counts, reverse_code=migrations.RunPython.noop),
+    ]
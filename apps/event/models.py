@@ -2,7 +2,7 @@ import typing
 from collections import OrderedDict
 
 from django.db import models
-from django.db.models.functions import Cast
+from django.db.models.functions import Cast, Coalesce
 from django.contrib.postgres.aggregates.general import StringAgg, ArrayAgg
 from django.utils.translation import gettext_lazy as _
 from django_enumfield import enum
@@ -273,6 +273,19 @@ class Event(MetaInformationArchiveAbstractModel, models.Model):
     include_triangulation_in_qa = models.BooleanField(
         verbose_name='Include triangulation in qa?', default=False,
     )
+    # NOTE: Figure counts by review status, maintained by apps.event.receivers
+    # Use annotate_review_figures_count to access these counts
+    figure_review_not_started_count = models.IntegerField(default=0)
+    figure_review_in_progress_count = models.IntegerField(default=0)
+    figure_review_re_request_count = models.IntegerField(default=0)
+    figure_review_approved_count = models.IntegerField(default=0)
+
+    REVIEW_COUNT_FIELDS = {
+        Figure.FIGURE_REVIEW_STATUS.REVIEW_NOT_STARTED: 'figure_review_not_started_count',
+        Figure.FIGURE_REVIEW_STATUS.REVIEW_IN_PROGRESS: 'figure_review_in_progress_count',
+        Figure.FIGURE_REVIEW_STATUS.REVIEW_RE_REQUESTED: 'figure_review_re_request_count',
+        Figure.FIGURE_REVIEW_STATUS.APPROVED: 'figure_review_approved_count',
+    }
 
     assignee_id: typing.Optional[int]
 
@@ -324,51 +337,60 @@ class Event(MetaInformationArchiveAbstractModel, models.Model):
         }
 
     @classmethod
-    def annotate_review_figures_count(cls):
-        return {
-            'review_not_started_count': models.Count(
-                'figures',
-                filter=models.Q(
-                    figures__review_status=Figure.FIGURE_REVIEW_STATUS.REVIEW_NOT_STARTED,
-                    figures__role=Figure.ROLE.RECOMMENDED,
-                ) | models.Q(
-                    figures__review_status=Figure.FIGURE_REVIEW_STATUS.REVIEW_NOT_STARTED,
-                    include_triangulation_in_qa=True,
-                )
-            ),
-            'review_in_progress_count': models.Count(
-                'figures',
-                filter=models.Q(
-                    figures__review_status=Figure.FIGURE_REVIEW_STATUS.REVIEW_IN_PROGRESS,
-                    figures__role=Figure.ROLE.RECOMMENDED,
-                ) | models.Q(
-                    figures__review_status=Figure.FIGURE_REVIEW_STATUS.REVIEW_IN_PROGRESS,
-                    include_triangulation_in_qa=True,
-                )
+    def update_review_counts(cls, event_id, review_status, role, delta):
+        """
+        Increment/Decrement the review count of the event for a figure
+        """
+        count_field = cls.REVIEW_COUNT_FIELDS[review_status]
+        if role == Figure.ROLE.RECOMMENDED:
+            value = models.Value(delta)
+        else:
+            # NOTE: Triangulation figures are only counted if included in QA
+            value = models.Case(
+                models.When(include_triangulation_in_qa=True, then=models.Value(delta)),
+                default=models.Value(0),
+            )
+        cls.objects.filter(id=event_id).update(**{count_field: models.F(count_field) + value})
 
-            ),
-            'review_re_request_count': models.Count(
-                'figures',
-                filter=models.Q(
-                    figures__review_status=Figure.FIGURE_REVIEW_STATUS.REVIEW_RE_REQUESTED,
-                    figures__role=Figure.ROLE.RECOMMENDED,
-                ) | models.Q(
-                    figures__review_status=Figure.FIGURE_REVIEW_STATUS.REVIEW_RE_REQUESTED,
-                    include_triangulation_in_qa=True,
-                )
+    @classmethod
+    def get_review_count_subqueries(cls):
+        """
+        Returns the figure counts by review status calculated from the figures
+        """
+        return {
+            count_field: Coalesce(
+                models.Subquery(
+                    Figure.objects.filter(
+                        models.Q(role=Figure.ROLE.RECOMMENDED) | models.Q(event__include_triangulation_in_qa=True),
+                        event=models.OuterRef('pk'),
+                        review_status=review_status,
+                    ).order_by().values('event').annotate(
+                        count=models.Count('id')
+                    ).values('count')[:1],
+                    output_field=models.IntegerField(),
+                ),
+                0,
+            )
+            for review_status, count_field in cls.REVIEW_COUNT_FIELDS.items()
+        }
 
-            ),
-            'review_approved_count': models.Count(
-                'figures',
-                filter=models.Q(
-                    figures__review_status=Figure.FIGURE_REVIEW_STATUS.APPROVED,
-                    figures__role=Figure.ROLE.RECOMMENDED,
-                ) | models.Q(
-                    figures__review_status=Figure.FIGURE_REVIEW_STATUS.APPROVED,
-                    include_triangulation_in_qa=True,
-                )
+    @classmethod
+    def refresh_review_counts(cls, event_ids=None):
+        """
+        Re-count the figures of the events by review status
+        """
+        qs = cls.objects.all()
+        if event_ids is not None:
+            qs = qs.filter(id__in=event_ids)
+        return qs.update(**cls.get_review_count_subqueries())
 
-            ),
+    @classmethod
+    def annotate_review_figures_count(cls):
+        return {
+            'review_not_started_count': models.F('figure_review_not_started_count'),
+            'review_in_progress_count': models.F('figure_review_in_progress_count'),
+            'review_re_request_count': models.F('figure_review_re_request_count'),
+            'review_approved_count': models.F('figure_review_approved_count'),
             'total_count': (
                 models.F('review_not_started_count') +
                 models.F('review_in_progress_count') +
@@ -497,10 +519,24 @@ class Event(MetaInformationArchiveAbstractModel, models.Model):
             'transformer': transformer,
         }
 
+    def save(self, *args, **kwargs):
+        # NOTE: Review counts are updated using F expressions, don't overwrite them with the stale values
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.REVIEW_COUNT_FIELDS.values()
+            ]
+        return super().save(*args, **kwargs)
+
     def __str__(self):
         return self.name or str(self.id)
 
     class Meta:
+        indexes = [
+            # For CursorPageGraphqlPagination (default cursor_ordering)
+            models.Index(fields=['created_at', 'id'], name='event_event_created_at_id_idx'),
+        ]
         permissions = (
             ('assign_event', 'Can assign on event level'),
             ('self_assign_event', 'Can assign self on event level'),
@@ -514,6 +550,7 @@ class Event(MetaInformationArchiveAbstractModel, models.Model):
             self,
             exclude=[
                 'id', 'created_at', 'created_by', 'last_modified_by',
+                *self.REVIEW_COUNT_FIELDS.values(),
             ]
         )
         # Clone m2m keys fields
@@ -0,0 +1,43 @@
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+
+from apps.entry.models import Figure
+from apps.entry.receivers import get_figure_previous_state
+from .models import Event
+
+
+# NOTE: Figure review counts on the event
+# QuerySet.update/bulk_update doesn't trigger these, use Event.refresh_review_counts for those
+
+@receiver(post_save, sender=Figure)
+def update_event_review_counts(sender, instance, created, **kwargs):
+    previous_state = get_figure_previous_state(instance)
+    if previous_state is not None:
+        previous_state = (previous_state['event_id'], previous_state['review_status'], previous_state['role'])
+    current_state = (instance.event_id, instance.review_status, instance.role)
+    if previous_state == current_state:
+        return
+    if previous_state is not None:
+        Event.update_review_counts(*previous_state, -1)
+    Event.update_review_counts(*current_state, 1)
+
+
+@receiver(post_delete, sender=Figure)
+def update_event_review_counts_on_delete(sender, instance, **kwargs):
+    Event.update_review_counts(instance.event_id, instance.review_status, instance.role, -1)
+
+
+@receiver(pre_save, sender=Event)
+def store_event_include_triangulation_in_qa(sender, instance, **kwargs):
+    instance._previous_include_triangulation_in_qa = None
+    if instance.pk:
+        instance._previous_include_triangulation_in_qa = Event.objects.filter(
+            pk=instance.pk
+        ).values_list('include_triangulation_in_qa', flat=True).first()
+
+
+@receiver(post_save, sender=Event)
+def refresh_event_review_counts(sender, instance, created, update_fields=None, **kwargs):
+    previous_value = getattr(instance, '_previous_include_triangulation_in_qa', None)
+    if previous_value is not None and previous_value != instance.include_triangulation_in_qa:
+        Event.refresh_review_counts([instance.pk])
@@ -38,7 +38,7 @@ from apps.event.filters import (
 )
 from utils.graphene.types import CustomDjangoListObjectType
 from utils.graphene.fields import DjangoPaginatedListObjectField
-from utils.graphene.pagination import PageGraphqlPaginationWithoutCount
+from utils.graphene.pagination import PageGraphqlPaginationWithoutCount, CursorPageGraphqlPagination
 
 
 class ViolenceSubObjectType(DjangoObjectType):
@@ -195,7 +195,7 @@ class EventType(DjangoObjectType):
 
     class Meta:
         model = Event
-        exclude_fields = ('figures', 'gidd_events', 'glide_numbers')
+        exclude_fields = ('figures', 'gidd_events', 'glide_numbers', *Event.REVIEW_COUNT_FIELDS.values())
 
     event_type = graphene.Field(CrisisTypeGrapheneEnum)
     event_type_display = EnumDescription(source='get_event_type_display')
@@ -242,7 +242,9 @@ class EventType(DjangoObjectType):
         )
         if value != NULL:
             return value
-        return info.context.event_event_total_stock_idp_figures.load(root.id)
+        return info.context.event_figure_totals_loader.load(root.id).then(
+            lambda totals: totals.get(Event.IDP_FIGURES_ANNOTATE)
+        )
 
     def resolve_stock_idp_figures_max_end_date(root, info, **kwargs):
         NULL = 'null'
@@ -253,7 +255,9 @@ class EventType(DjangoObjectType):
         )
         if value != NULL:
             return value
-        return info.context.event_stock_idp_figures_max_end_date.load(root.id)
+        return info.context.event_figure_totals_loader.load(root.id).then(
+            lambda totals: totals.get(Event.IDP_FIGURES_REFERENCE_DATE_ANNOTATE)
+        )
 
     def resolve_total_flow_nd_figures(root, info, **kwargs):
         NULL = 'null'
@@ -264,7 +268,9 @@ class EventType(DjangoObjectType):
         )
         if value != NULL:
             return value
-        return info.context.event_event_total_flow_nd_figures.load(root.id)
+        return info.context.event_figure_totals_loader.load(root.id).then(
+            lambda totals: totals.get(Event.ND_FIGURES_ANNOTATE)
+        )
 
     def resolve_review_count(root, info, **kwargs):
         return info.context.event_review_count_dataloader.load(root.id)
@@ -274,6 +280,7 @@ class EventListType(CustomDjangoListObjectType):
     class Meta:
         model = Event
         filterset_class = EventFilter
+        cursor_pagination = True
 
 
 class ContextOfViolenceType(DjangoObjectType):
@@ -302,7 +309,7 @@ class Query:
 
     event = DjangoObjectField(EventType)
     event_list = DjangoPaginatedListObjectField(EventListType,
-                                                pagination=PageGraphqlPaginationWithoutCount(
+                                                pagination=CursorPageGraphqlPagination(
                                                     page_size_query_param='pageSize'
                                                 ))
     osv_sub_type_list = DjangoPaginatedListObjectField(OsvSubTypeList)
@@ -66,7 +66,10 @@ class EventSerializer(MetaInformationSerializerMixin,
 
     class Meta:
         model = Event
-        exclude = ('assigner', 'assigned_at', 'review_status', 'glide_numbers')
+        exclude = (
+            'assigner', 'assigned_at', 'review_status', 'glide_numbers',
+            *Event.REVIEW_COUNT_FIELDS.values(),
+        )
 
     def validate_violence_sub_type_and_type(self, attrs):
         errors = OrderedDict()
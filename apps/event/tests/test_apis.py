@@ -2,10 +2,13 @@ from datetime import datetime, timedelta
 import json
 from uuid import uuid4
 
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
 from apps.crisis.models import Crisis
 from apps.users.enums import USER_ROLE
 from apps.entry.models import Figure
-from apps.event.models import EventCode
+from apps.event.models import EventCode, ViolenceSubType
 from apps.report.models import Report
 from apps.review.models import UnifiedReviewComment
 
@@ -13,6 +16,7 @@ from utils.factories import (
     CountryFactory,
     DisasterSubTypeFactory,
     CrisisFactory,
+    ViolenceFactory,
     ViolenceSubTypeFactory,
     EventFactory,
     EntryFactory,
@@ -627,6 +631,77 @@ class TestEventListQuery(HelixGraphQLTestCase):
         content = response.json()
         self.assertEqual(content['data']['eventList']['totalCount'], 1)
 
+    def test_event_list_cursor_pagination(self):
+        q = '''
+            query EventList($cursor: String, $pageSize: Int){
+              eventList(cursor: $cursor, pageSize: $pageSize) {
+                results {
+                  id
+                }
+                totalCount
+                nextCursor
+              }
+            }
+        '''
+        events = EventFactory.create_batch(5, event_type=Crisis.CRISIS_TYPE.OTHER.value)
+        expected = sorted([event.id for event in events])
+
+        ids = []
+        cursor = ''
+        while cursor is not None:
+            response = self.query(q, variables={'cursor': cursor, 'pageSize': 2})
+            self.assertResponseNoErrors(response)
+            content = response.json()['data']['eventList']
+            # Count is skipped for cursor pagination
+            self.assertIsNone(content['totalCount'])
+            ids.extend(int(each['id']) for each in content['results'])
+            cursor = content['nextCursor']
+        self.assertEqual(expected, ids)
+
+        response = self.query(q, variables={'cursor': 'invalid', 'pageSize': 2})
+        self.assertResponseHasErrors(response)
+
+
+class TestViolenceListQuery(HelixGraphQLTestCase):
+    def setUp(self) -> None:
+        self.q = '''
+            query ViolenceList {
+              violenceList(ordering: "id") {
+                results {
+                  id
+                  subTypes(ordering: "-id") {
+                    results {
+                      id
+                    }
+                    totalCount
+                  }
+                }
+              }
+            }
+        '''
+        self.violences = ViolenceFactory.create_batch(5)
+        self.sub_types = {
+            violence.id: ViolenceSubTypeFactory.create_batch(3, violence=violence)
+            for violence in self.violences
+        }
+        self.force_login(create_user_with_role(USER_ROLE.GUEST.name))
+
+    def test_nested_sub_types_are_loaded_in_a_single_query(self):
+        sub_type_table = ViolenceSubType._meta.db_table
+        with CaptureQueriesContext(connection) as queries:
+            response = self.query(self.q)
+        self.assertResponseNoErrors(response)
+        assert len([query for query in queries.captured_queries if sub_type_table in query['sql']]) == 1
+
+        content = response.json()
+        for violence in content['data']['violenceList']['results']:
+            sub_types = self.sub_types[int(violence['id'])]
+            assert violence['subTypes']['totalCount'] == len(sub_types)
+            assert [int(each['id']) for each in violence['subTypes']['results']] == sorted(
+                [sub_type.id for sub_type in sub_types],
+                reverse=True,
+            )
+
 
 class CloneEventTest(HelixGraphQLTestCase):
     def setUp(self) -> None:
@@ -1,6 +1,9 @@
+from io import StringIO
 from datetime import timedelta
+from django.core.management import call_command
 from django.utils import timezone
 from apps.crisis.models import Crisis
+from apps.entry.models import Figure
 from apps.event.models import Event
 from apps.users.enums import USER_ROLE
 from utils.factories import (
@@ -8,6 +11,7 @@ from utils.factories import (
     DisasterSubTypeFactory,
     CountryFactory,
     EventFactory,
+    FigureFactory,
     MonitoringSubRegionFactory,
     CountryRegionFactory,
     CountrySubRegionFactory,
@@ -30,6 +34,49 @@ class TestEventModel(HelixTestCase):
         event = Event(**self.data)
         self.assertIsNone(event.clean())
 
+    def test_review_counts(self):
+        event1 = EventFactory.create()
+        event2 = EventFactory.create()
+
+        def _get_counts(event):
+            event.refresh_from_db()
+            return [getattr(event, count_field) for count_field in Event.REVIEW_COUNT_FIELDS.values()]
+
+        figure = FigureFactory.create(event=event1, review_status=Figure.FIGURE_REVIEW_STATUS.REVIEW_NOT_STARTED)
+        FigureFactory.create(event=event1, review_status=Figure.FIGURE_REVIEW_STATUS.APPROVED)
+        FigureFactory.create(
+            event=event1,
+            role=Figure.ROLE.TRIANGULATION,
+            review_status=Figure.FIGURE_REVIEW_STATUS.APPROVED,
+        )
+        # not_started, in_progress, re_request, approved
+        self.assertEqual([1, 0, 0, 1], _get_counts(event1))
+
+        # Stale event instance shouldn't overwrite the counts
+        event1.name = 'Updated event'
+        figure.review_status = Figure.FIGURE_REVIEW_STATUS.REVIEW_IN_PROGRESS
+        figure.save()
+        event1.save()
+        self.assertEqual([0, 1, 0, 1], _get_counts(event1))
+
+        # Move to another event
+        figure.event = event2
+        figure.save()
+        self.assertEqual([0, 0, 0, 1], _get_counts(event1))
+        self.assertEqual([0, 1, 0, 0], _get_counts(event2))
+
+        figure.delete()
+        self.assertEqual([0, 0, 0, 0], _get_counts(event2))
+
+        event1.include_triangulation_in_qa = True
+        event1.save()
+        self.assertEqual([0, 0, 0, 2], _get_counts(event1))
+
+        # Reconcile
+        Event.objects.filter(pk=event1.pk).update(figure_review_approved_count=10)
+        call_command('reconcile_event_review_counts', stdout=StringIO())
+        self.assertEqual([0, 0, 0, 2], _get_counts(event1))
+
 
 class TestGenericValidator(HelixTestCase):
     def test_is_child_parent_dates_valid(self):
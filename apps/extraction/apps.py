@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class ExtractionConfig(AppConfig):
     name = 'apps.extraction'
+
+    def ready(self):
+        from apps.extraction import receivers # noqa :f401
@@ -383,10 +383,7 @@ class BaseFigureExtractionFilterSet(df.FilterSet):
             return qs
 
         report = Report.objects.get(id=value)
-        return ReportFigureExtractionFilterSet(
-            queryset=qs,
-            data=report.get_filter_kwargs,
-        ).qs
+        return qs.filter(id__in=report.report_figures.values('id'))
 
     def filter_geographical_groups(self, qs, name, value):
         if value:
@@ -0,0 +1,24 @@
+# Generated by Django 3.2 on 2024-03-22 08:31
+
+import django.contrib.postgres.fields
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('extraction', '0040_auto_20231208_1142'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FigureIdSnapshot',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=255, unique=True, verbose_name='Key')),
+                ('version', models.CharField(max_length=255, verbose_name='Version')),
+                ('figure_ids', django.contrib.postgres.fields.ArrayField(base_field=models.IntegerField(), default=list, size=None)),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Updated at')),
+            ],
+        ),
+    ]
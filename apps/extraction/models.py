@@ -1,5 +1,9 @@
+import typing
+
 from django.contrib.postgres.fields import ArrayField
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F, Func, Q, Subquery
+from django.utils.functional import cached_property
 from django.utils.translation import gettext_lazy as _
 from django_enumfield import enum
 
@@ -9,6 +13,29 @@ from apps.entry.models import (
 )
 from apps.crisis.models import Crisis
 from apps.entry.constants import STOCK, FLOW
+from utils.common import get_figure_data_version
+from utils.db import upsert
+
+
+class FigureIdSnapshot(models.Model):
+    """
+    Resolved figure ids of a saved query (Report or ExtractionQuery)
+    """
+    key = models.CharField(verbose_name=_('Key'), max_length=255, unique=True)
+    version = models.CharField(verbose_name=_('Version'), max_length=255)
+    # NOTE: sorted figure ids
+    figure_ids = ArrayField(base_field=models.IntegerField(), default=list)
+    updated_at = models.DateTimeField(verbose_name=_('Updated at'), auto_now=True)
+
+    def get_figure_ids_subquery(self):
+        return Subquery(
+            FigureIdSnapshot.objects.filter(pk=self.pk).annotate(
+                figure_id=Func(F('figure_ids'), function='unnest', output_field=models.IntegerField()),
+            ).values('figure_id')
+        )
+
+    def __str__(self):
+        return self.key
 
 
 class QueryAbstractModel(models.Model):
@@ -219,14 +246,73 @@ class QueryAbstractModel(models.Model):
             filter_figure_has_housing_destruction=self.filter_figure_has_housing_destruction,
         )
 
-    # FIXME: we may not need this anymore
+    @property
+    def figure_id_snapshot_key(self) -> str:
+        return f'{self._meta.label_lower}:{self.pk}'
+
+    @cached_property
+    def figure_data_country_ids(self) -> typing.Optional[typing.Set[int]]:
+        """
+        Countries of the figures included by the query, None if the query is not limited to countries
+        NOTE: Union of the country filters, the figures of other countries are never included
+        """
+        from apps.country.models import Country
+        country_ids = set(
+            Country.objects.filter(
+                Q(id__in=self.filter_figure_countries.values('id')) |
+                Q(region__in=self.filter_figure_regions.values('id')) |
+                Q(geographical_group__in=self.filter_figure_geographical_groups.values('id'))
+            ).values_list('id', flat=True)
+        )
+        return country_ids or None
+
+    def get_figure_id_snapshot_version(self) -> str:
+        """
+        The snapshot is stale if the query definition or the figures within its countries change
+        """
+        return f'{self.modified_at.isoformat()}:{get_figure_data_version(self.figure_data_country_ids)}'
+
+    def get_figure_id_snapshot(self) -> typing.Optional[FigureIdSnapshot]:
+        """
+        Returns the snapshot if it's up to date
+        """
+        return FigureIdSnapshot.objects.filter(
+            key=self.figure_id_snapshot_key,
+            version=self.get_figure_id_snapshot_version(),
+        ).only('id').first()
+
+    def refresh_figure_id_snapshot(self) -> FigureIdSnapshot:
+        from apps.extraction.filters import ReportFigureExtractionFilterSet
+        version = self.get_figure_id_snapshot_version()
+        figure_ids = ReportFigureExtractionFilterSet(
+            data=self.get_filter_kwargs,
+        ).qs.order_by('id').values_list('id', flat=True)
+        return upsert(
+            FigureIdSnapshot,
+            ['key'],
+            key=self.figure_id_snapshot_key,
+            version=version,
+            figure_ids=list(figure_ids),
+        )
+
     @property
     def extract_report_figures(self) -> ['Figure']:  # noqa
         """
         Use this method in report only
         """
         from apps.extraction.filters import ReportFigureExtractionFilterSet
-        return ReportFigureExtractionFilterSet(data=self.get_filter_kwargs).qs
+        from apps.extraction.tasks import refresh_figure_id_snapshot
+
+        snapshot = self.get_figure_id_snapshot()
+        if snapshot is None:
+            # NOTE: Not writing on the read path, the snapshot is refreshed in the background
+            transaction.on_commit(
+                lambda: refresh_figure_id_snapshot.delay(self._meta.label_lower, self.pk)
+            )
+            return ReportFigureExtractionFilterSet(data=self.get_filter_kwargs).qs
+        return Figure.objects.filter(
+            id__in=snapshot.get_figure_ids_subquery(),
+        )
 
     @classmethod
     def get_entries(cls, data=None) -> ['Entry']:  # noqa
@@ -0,0 +1,11 @@
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+
+from apps.report.models import Report
+from .models import ExtractionQuery, FigureIdSnapshot
+
+
+@receiver(post_delete, sender=Report)
+@receiver(post_delete, sender=ExtractionQuery)
+def delete_figure_id_snapshot(sender, instance, **kwargs):
+    FigureIdSnapshot.objects.filter(key=instance.figure_id_snapshot_key).delete()
@@ -0,0 +1,19 @@
+import logging
+
+from django.apps import apps
+
+from helix.celery import app as celery_app
+
+logger = logging.getLogger(__name__)
+
+
+@celery_app.task
+def refresh_figure_id_snapshot(model_label, pk):
+    """
+    Refresh the figure id snapshot of a Report or ExtractionQuery if it's stale
+    """
+    instance = apps.get_model(model_label).objects.filter(pk=pk).first()
+    if instance is None or instance.get_figure_id_snapshot() is not None:
+        return
+    instance.refresh_figure_id_snapshot()
+    logger.info(f'Figure id snapshot refreshed: {instance.figure_id_snapshot_key}')
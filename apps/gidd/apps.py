@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class GiddConfig(AppConfig):
     name = 'apps.gidd'
+
+    def ready(self):
+        from apps.gidd import receivers # noqa :f401
@@ -0,0 +1,114 @@
+import hashlib
+import json
+
+from helix.caches import external_api_cache
+from helix.redis import get_connection
+
+from .models import StatusLog, ReleaseMetadata
+
+STATISTICS_CACHE_TIMEOUT = 60 * 60 * 24 * 7
+GIDD_DATA_VERSION_KEY = 'gidd-data:version'
+GIDD_DATA_VERSION_FALLBACK_TIMEOUT = 60 * 5
+STATISTICS_CACHE_KEY = 'gidd-statistics:{name}:{version}:{args_hash}'
+STATISTICS_CACHE_HIT_KEY = 'gidd-statistics-cache:hit:{name}'
+STATISTICS_CACHE_MISS_KEY = 'gidd-statistics-cache:miss:{name}'
+
+
+def _get_gidd_data_version():
+    """
+    Returns the version and the last modified timestamp of the GIDD data
+    using the latest successful update and the release metadata
+    """
+    status_log = StatusLog.objects.filter(
+        status=StatusLog.Status.SUCCESS,
+    ).order_by('-triggered_at').values('id', 'completed_at').first()
+    release_metadata = ReleaseMetadata.objects.values('id', 'modified_at').last()
+    last_modified = max(
+        [
+            dt for dt in [
+                status_log and status_log['completed_at'],
+                release_metadata and release_metadata['modified_at'],
+            ]
+            if dt is not None
+        ],
+        default=None,
+    )
+    return dict(
+        version=hashlib.md5(
+            json.dumps([status_log, release_metadata], default=str).encode()
+        ).hexdigest(),
+        last_modified=last_modified and last_modified.timestamp(),
+    )
+
+
+def get_gidd_data_version():
+    data_version = external_api_cache.get(GIDD_DATA_VERSION_KEY)
+    if data_version:
+        return data_version
+    # NOTE: The computed version can already be stale if an update is being committed,
+    # so it doesn't override the version set by set_gidd_data_version and expires early.
+    data_version = _get_gidd_data_version()
+    if not external_api_cache.add(GIDD_DATA_VERSION_KEY, data_version, GIDD_DATA_VERSION_FALLBACK_TIMEOUT):
+        return external_api_cache.get(GIDD_DATA_VERSION_KEY) or data_version
+    return data_version
+
+
+def get_statistics_cache_version():
+    return get_gidd_data_version()['version']
+
+
+def set_gidd_data_version():
+    """
+    Set the version after the GIDD data or the release metadata change is committed,
+    the cached statistics for the old version will expire with the timeout
+    """
+    external_api_cache.set(GIDD_DATA_VERSION_KEY, _get_gidd_data_version(), STATISTICS_CACHE_TIMEOUT)
+
+
+def _normalize_args(value):
+    if isinstance(value, dict):
+        return {key: _normalize_args(_value) for key, _value in value.items() if _value is not None}
+    if isinstance(value, (list, tuple, set)):
+        return sorted(_normalize_args(item) for item in value)
+    return value
+
+
+def get_statistics_cache_key(name, kwargs):
+    args_hash = hashlib.md5(
+        json.dumps(_normalize_args(kwargs), sort_keys=True, default=str).encode()
+    ).hexdigest()
+    return STATISTICS_CACHE_KEY.format(
+        name=name,
+        version=get_statistics_cache_version(),
+        args_hash=args_hash,
+    )
+
+
+def get_or_set_statistics(name, kwargs, get_statistics):
+    """
+    Returns the cached statistics for the resolver name and arguments, else generate and cache it.
+    """
+    key = get_statistics_cache_key(name, kwargs)
+    statistics = external_api_cache.get(key)
+    if statistics is not None:
+        get_connection().incr(STATISTICS_CACHE_HIT_KEY.format(name=name))
+        return statistics
+    get_connection().incr(STATISTICS_CACHE_MISS_KEY.format(name=name))
+    statistics = get_statistics()
+    external_api_cache.set(key, statistics, STATISTICS_CACHE_TIMEOUT)
+    return statistics
+
+
+def get_statistics_cache_stats(names):
+    """
+    Returns the hit/miss counters for the provided resolver names
+    """
+    redis_client = get_connection()
+    stats = {}
+    for name in names:
+        hit, miss = redis_client.mget(
+            STATISTICS_CACHE_HIT_KEY.format(name=name),
+            STATISTICS_CACHE_MISS_KEY.format(name=name),
+        )
+        stats[name] = dict(hit=int(hit or 0), miss=int(miss or 0))
+    return stats
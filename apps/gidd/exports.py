@@ -0,0 +1,690 @@
+import csv
+from datetime import datetime
+
+from django.core.files import File
+from django.http import FileResponse, StreamingHttpResponse
+from openpyxl import Workbook
+
+from apps.common.utils import EXTERNAL_ARRAY_SEPARATOR, EXTERNAL_FIELD_SEPARATOR
+from apps.crisis.models import Crisis
+from utils.common import get_temp_file
+
+from .models import (
+    Disaster,
+    DisplacementData,
+    ExportFile,
+    IdpsSaddEstimate,
+    ReleaseMetadata,
+    StatusLog,
+)
+from .rest_filters import (
+    RestDisasterFilterSet,
+    RestDisplacementDataFilterSet,
+    IdpsSaddEstimateFilter,
+)
+
+EXPORT_CHUNK_SIZE = 2000
+
+
+class ExportFormat:
+    XLSX = 'xlsx'
+    CSV = 'csv'
+
+    CHOICES = (XLSX, CSV)
+
+
+DISASTER_EXPORT_FILENAME = 'IDMC_GIDD_Disasters_Internal_Displacement_Data'
+DISPLACEMENT_EXPORT_FILENAME = 'IDMC_Internal_Displacement_Conflict-Violence_Disasters'
+
+DISASTER_EXPORT_HEADERS = [
+    'ISO3',
+    'Country / Territory',
+    'Year',
+    'Event Name',
+    'Date of Event (start)',
+    'Disaster Internal Displacements',
+    'Disaster Internal Displacements (Raw)',
+    'Hazard Category',
+    'Hazard Type',
+    'Hazard Sub Type',
+    'Event Codes (Code:Type)',
+]
+
+CONFLICT_DISPLACEMENT_EXPORT_HEADERS = [
+    'ISO3',
+    'Name',
+    'Year',
+    'Conflict Stock Displacement',
+    'Conflict Stock Displacement (Raw)',
+    'Conflict Internal Displacements',
+    'Conflict Internal Displacements (Raw)',
+]
+
+DISASTER_DISPLACEMENT_EXPORT_HEADERS = [
+    'ISO3',
+    'Name',
+    'Year',
+    'Disaster Internal Displacements',
+    'Disaster Internal Displacements (Raw)',
+    'Disaster Stock Displacement',
+    'Disaster Stock Displacement (Raw)'
+]
+
+DISPLACEMENT_EXPORT_HEADERS = [
+    'ISO3',
+    'Name',
+    'Year',
+    'Conflict Stock Displacement',
+    'Conflict Stock Displacement (Raw)',
+    'Conflict Internal Displacements',
+    'Conflict Internal Displacements (Raw)',
+    'Disaster Internal Displacements',
+    'Disaster Internal Displacements (Raw)',
+    'Disaster Stock Displacement',
+    'Disaster Stock Displacement (Raw)'
+]
+
+IDPS_SADD_ESTIMATE_EXPORT_HEADERS = [
+    'ISO3',
+    'Country',
+    'Year',
+    'Sex',
+    'Cause',
+    '0-1',
+    '0-4',
+    '0-14',
+    '0-17',
+    '0-24',
+    '5-11',
+    '5-14',
+    '12-14',
+    '12-16',
+    '15-17',
+    '15-24',
+    '25-64',
+    '65+',
+]
+
+# NOTE: The order of the fields should match the headers defined above
+CONFLICT_DISPLACEMENT_EXPORT_FIELDS = [
+    'iso3',
+    'country_name',
+    'year',
+    'conflict_total_displacement_rounded',
+    'conflict_total_displacement',
+    'conflict_new_displacement_rounded',
+    'conflict_new_displacement',
+]
+
+DISASTER_DISPLACEMENT_EXPORT_FIELDS = [
+    'iso3',
+    'country_name',
+    'year',
+    'disaster_new_displacement_rounded',
+    'disaster_new_displacement',
+    'disaster_total_displacement_rounded',
+    'disaster_total_displacement',
+]
+
+DISPLACEMENT_EXPORT_FIELDS = [
+    'iso3',
+    'country_name',
+    'year',
+    'conflict_total_displacement_rounded',
+    'conflict_total_displacement',
+    'conflict_new_displacement_rounded',
+    'conflict_new_displacement',
+    'disaster_new_displacement_rounded',
+    'disaster_new_displacement',
+    'disaster_total_displacement_rounded',
+    'disaster_total_displacement',
+]
+
+IDPS_SADD_ESTIMATE_EXPORT_FIELDS = [
+    'iso3',
+    'country_name',
+    'year',
+    'sex',
+    'cause',
+    'zero_to_one',
+    'zero_to_four',
+    'zero_to_forteen',
+    'zero_to_sventeen',
+    'zero_to_twenty_four',
+    'five_to_elaven',
+    'five_to_fourteen',
+    'twelve_to_fourteen',
+    'twelve_to_sixteen',
+    'fifteen_to_seventeen',
+    'fifteen_to_twentyfour',
+    'twenty_five_to_sixty_four',
+    'sixty_five_plus',
+]
+
+
+def get_displacement_export_headers_and_fields(cause):
+    if cause == 'conflict':
+        return CONFLICT_DISPLACEMENT_EXPORT_HEADERS, CONFLICT_DISPLACEMENT_EXPORT_FIELDS
+    elif cause == 'disaster':
+        return DISASTER_DISPLACEMENT_EXPORT_HEADERS, DISASTER_DISPLACEMENT_EXPORT_FIELDS
+    return DISPLACEMENT_EXPORT_HEADERS, DISPLACEMENT_EXPORT_FIELDS
+
+
+def iter_disaster_export_rows(qs):
+    for item in qs.values(
+        'country__iso3',
+        'country__name',
+        'year',
+        'event_name',
+        'start_date',
+        'new_displacement_rounded',
+        'new_displacement',
+        'hazard_category_name',
+        'hazard_type_name',
+        'hazard_sub_type_name',
+        'event_codes',
+        'event_codes_type',
+        'glide_numbers',
+    ).iterator(chunk_size=EXPORT_CHUNK_SIZE):
+        yield [
+            item['country__iso3'],
+            item['country__name'],
+            item['year'],
+            item['event_name'],
+            item['start_date'],
+            item['new_displacement_rounded'],
+            item['new_displacement'],
+            item['hazard_category_name'],
+            item['hazard_type_name'],
+            item['hazard_sub_type_name'],
+            # FIXME: Remove the fallback using glide_numbers
+            # after GIDD is generated around 2024 May
+            EXTERNAL_ARRAY_SEPARATOR.join(
+                [f"{key}{EXTERNAL_FIELD_SEPARATOR}{value}" for key, value in zip(
+                    item['event_codes'],
+                    item['event_codes_type']
+                )]
+            ) or EXTERNAL_ARRAY_SEPARATOR.join(
+                [f"{key}{EXTERNAL_FIELD_SEPARATOR}Glide Number" for key in item['glide_numbers']]
+            ),
+        ]
+
+
+def iter_values_export_rows(qs, fields):
+    for item in qs.values_list(*fields).iterator(chunk_size=EXPORT_CHUNK_SIZE):
+        yield list(item)
+
+
+def iter_idps_sadd_estimate_export_rows(qs):
+    cause_index = IDPS_SADD_ESTIMATE_EXPORT_FIELDS.index('cause')
+    for row in iter_values_export_rows(qs, IDPS_SADD_ESTIMATE_EXPORT_FIELDS):
+        row[cause_index] = str(Crisis.CRISIS_TYPE(row[cause_index]).label)
+        yield row
+
+
+def append_disaster_readme(ws):
+    readme_text = [
+        ['Title', 'Global Internal Displacement Database (GIDD)'],
+        ['File name', 'IDMC_GIDD_disasters_internal_displacement_data'],
+        ['Creator', 'Internal Displacement monitoring Centre (IDMC)'],
+        ['Date extracted', datetime.now().strftime("%d/%m/%Y")],
+        ['Last update', StatusLog.last_release_date()],
+        [],
+        [
+            'Description',
+            'The data includes figures on internal displacement in different countries and regions from '
+            '2009 to 2022 for conflict induced displacement and from 2008 to 2022 for disaster induced displacement.'
+        ],
+        [
+            'The main definitions used are described below, for further information and more robust descriptions '
+            'of definitions please refer to https	//www.internal-displacement.org/monitoring-tools'
+        ],
+        [
+            '− Internal displacements correspond to the estimated number of internal displacements over a given '
+            'period of time (reporting year). Figures may include individuals who have been displaced more than once.'
+        ],
+        [
+            '− Total number of IDPs: Represents the total number of Internal displaced Person “IDPs”, in a given '
+            'location at a specific point in time. It could be understood as the total number of people living in a '
+            'situation of displacement as of the end of the reporting year.'
+        ],
+        [
+            '− Event name', 'Disaster events can be triggered by natural hazards such as weather or geophysical '
+            'phenomena. When a disaster event has an internationally recognized name, IDMC adopts that name. '
+            'Otherwise, the event is coded based on the country, type of hazard, location, and start date of the event.'
+        ],
+        [
+            'Use license: Content is licensed under CC BY-NC (See: '
+            'https://creativecommons.org/licenses/by-nc/4.0/)'
+        ],
+        ['Coverage:', 'Worldwide'],
+        ['Contact:', 'ch-idmcdataandanalysishub@idmc.ch'],
+    ]
+
+    for item in readme_text:
+        ws.append(item)
+    ws.append([])
+    ws.append(['Table description:'])
+    ws.append([])
+
+    table = [
+        ['ISO3: ISO 3166-1 alpha-3. The ISO3 "AB9" was assigned to the Abyei Area'],
+        ['Country / Territory: Country’s or territory short name'],
+        ['Year: Year of the event figures'],
+        [
+            'Event Name:  IDMC adopts that name. Otherwise, the event is coded based '
+            'on the country, type of hazard, location, and start date of the event.'
+        ],
+        ['Date of event (start): Approximate starting date of the event'],
+        [
+            'Disaster Internal Displacements: Total number of internal displacements '
+            'reported (rounded figures at national level), as a result of disasters over the reporting year.'
+        ],
+        ['Hazard Category: Hazard category based on CRED EM-DAT.'],
+        ['Hazard Type: Hazard type category based on CRED EM-DAT.'],
+        ['Hazard Sub Type: Hazard sub-type category based on CRED EM-DAT.'],
+    ]
+    for item in table:
+        ws.append(item)
+
+
+def append_displacement_readme(ws):
+    readme_text = [
+        ['Title: Global Internal Displacement Database (GIDD)'],
+        ['File name: IDMC_Internal_Displacement_Conflict-Violence_Disasters'],
+        ['Creator: Internal Displacement monitoring Centre (IDMC)'],
+
+        ['Date extracted', datetime.now().strftime("%d/%m/%Y")],
+        ['Last update', StatusLog.last_release_date()],
+        [''],
+        [
+            'Description: The data includes figures on internal displacement '
+            'in different countries and regions from 2009 to 2022 for conflict '
+            'induced displacement and from 2008 to 2022 for disaster induced displacement.'
+        ],
+        [
+            'The main definitions used are described below, for further information '
+            'and more robust descriptions of definitions please refer to '
+            'https://www.internal-displacement.org/monitoring-tools'
+        ],
+        [''],
+        [
+            '− Internal displacements correspond to the estimated number of internal '
+            'displacements over a given period of time (reporting year). Figures may '
+            'include individuals who have been displaced more than once.'
+        ],
+        [
+            '− Total number of IDPs: Represents the total number of Internally Displaced '
+            'Person “IDPs”, in a given location at a specific point in time. It could be '
+            'understood as the total number of people living in a situation of '
+            'displacement as of the end of the reporting year.'
+        ],
+        [''],
+        [
+            'Use license: Content is licensed under CC BY-NC (See: '
+            'https://creativecommons.org/licenses/by-nc/4.0/)'
+        ],
+
+        ['Coverage: Worldwide'],
+        ['Contact: ch-idmcdataandanalysishub@idmc.ch'],
+        [''],
+        [''],
+        ['Methodological notes for the 2023 release:'],
+        [
+            '− The description of our methodology is available at '
+            'https://www.internal-displacement.org/monitoring-tools'],
+        [
+            '− This is the first time IDMC reports on IDPs in Serbia since 2015, which '
+            'is not due to internal displacements in 2022 but to a review of the context in '
+            'which displacement occurred. This decision was made to acknowledge that '
+            'these IDPs did not cross an international border at the time of their '
+            'displacement and to harmonise IDMC’s IDP estimates with those of the '
+            'Government of Serbia and the UN agencies.'
+        ],
+        [
+            '− As part of a methodological revision, IDMC has decided not to publish '
+            'IDP total figures and Internal displacements for the countries listed below. '
+            'This decision is aimed at maintaining the accuracy and integrity of our '
+            'data and ensuring that it meets the highest standards of quality.'
+        ],
+        [''],
+    ]
+
+    for item in readme_text:
+        ws.append(item)
+
+    table = [
+        ['Country', 'Year', 'Displacement category'],
+        ['Togo', '2019', 'IDPs'],
+        ['South Africa', '2019', 'IDPs'],
+        ['Ghana', '2019', 'IDPs'],
+        ['Malawi', '2019', 'IDPs'],
+        ['Tunisia', '2019', 'IDPs'],
+        ['Togo', '2019', 'Internal Displacements'],
+        ['Madagascar', '2019', 'Internal Displacements'],
+        ['Benin', '2019', 'Internal Displacements'],
+        ['Malawi', '2019', 'Internal Displacements'],
+        ['Tunisia', '2019', 'Internal Displacements'],
+        ['South Africa', '2020', 'IDPs'],
+        ['South Africa', '2020', 'Internal Displacements'],
+    ]
+    for item in table:
+        ws.append(item)
+
+    ws.append([])
+    ws.append([])
+
+    ws.append([
+        '− As part of a methodological revision and our ongoing commitment to providing '
+        'the most accurate and reliable information on internal displacement, IDMC is '
+        'pleased to announce the publication of IDP total figures and Internal '
+        'displacements for certain countries and years that were not previously available. '
+        'These figures have been carefully reviewed and verified by our team of experts '
+        'to ensure the highest standards of quality.'
+
+    ])
+    ws.append([])
+
+    table2 = [
+        ['Country', 'Year', 'Displacement category'],
+        ['Israel', '2016', 'Internal displacements'],
+        ['Israel', '2017 ', 'Internal displacements'],
+        ['Israel', '2018', 'Internal displacements'],
+        ['Kyrgyzstan', '2019', 'IDPs'],
+        ['Israel', '2019', 'Internal displacements'],
+        ['Nicaragua', '2020', 'IDPs'],
+        ['Nicaragua', '2020', 'Internal displacements'],
+        ['Nicaragua', '2021', 'IDPs'],
+    ]
+
+    for item in table2:
+        ws.append(item)
+
+    ws.append([])
+    ws.append([
+        '− As part of a methodological revision some figures published may differ from '
+        'previous publications due to retroactive changes or the inclusion of previously '
+        'unavailable data. We encourage our data users to refer to the latest version of '
+        'our publications for the most up-to-date information.'
+    ])
+    ws.append([])
+    ws.append(['1_ Displacement data (Tab table description):'])
+    ws.append([])
+    readme_text_2 = [
+        ['Where (raw) means “not rounded”.'],
+        ['ISO3: ISO 3166-1 alpha-3. The ISO3 “AB9” was assigned to the Abyei Area'],
+        ['Name: Country’s or territory short name '],
+        ['Year: Year of the reporting figures'],
+        [
+            'Conflict Total number of IDPs: Total number of IDPs (rounded figures at '
+            'national level), as a result, of Conflict and Violence as of the end of '
+            'the reporting year.'
+        ],
+        [
+            'Conflict Total number of IDPs raw: Total number of IDPs (not rounded), as '
+            'a result, of Conflict and Violence as of the end of the reporting year.'
+        ],
+        [
+            'Conflict Internal Displacements: Total number of internal displacements '
+            'reported (rounded figures at national level), as a result of Conflict and '
+            'Violence over the reporting year.'
+        ],
+        [
+            'Conflict Internal Displacements raw: Total number of internal displacements '
+            'reported (not rounded), as a result of Conflict and Violence over the '
+            'reporting year.'
+        ],
+        [
+            'Disaster Internal Displacements: Total number of internal displacements reported '
+            '(rounded figures at national '
+            'level), as a result of disasters over the reporting year.'
+        ],
+        [
+            'Disaster Internal Displacements raw: Total number of internal displacements reported '
+            '(not rounded), as a result of disasters over the reporting year.'
+        ],
+        [
+            'Disaster Total number of IDPs: Total number of IDPs (rounded figures at '
+            'national level), as a result, of disasters as of the end of the reporting year.'
+        ],
+        [
+            'Disaster Total number of IDPs raw: Total number of IDPs (not rounded), as a result, of disasters as of '
+            'the end of the reporting year.'
+        ],
+    ]
+    ws.append([])
+    for item in readme_text_2:
+        ws.append(item)
+    ws.append([])
+
+    readme_text3 = [
+        ['ISO3: ISO 3166-1 alpha-3. The ISO3 “AB9” was assigned to the Abyei Area'],
+        ['Country: Country’s or territory short name'],
+        ['Year: Reporting year of the data'],
+        ['Sex: Data encoded into male, female and both sexes'],
+        ['Cause: Cause of displacement'],
+        [
+            'Age groups are organized as follows: 0-1, 0-4, 0-14, 0-17, 0-24, 5-11, 5-14, '
+            '12-14, 12-16, 15-17, 15-24, 25-64, 65+'
+        ],
+    ]
+    ws.append([])
+    ws.append([
+        '2_IDPs_SADD_estimates (Tab table description):'
+    ])
+    ws.append([])
+    for item in readme_text3:
+        ws.append(item)
+    ws.append([])
+
+    ws.append([])
+    ws.append([
+        'Disaggregating IDMC’s IDP Figures by Sex and Age methodological notes:'
+    ])
+    ws.append([])
+    ws.append([
+        'Sex and Age Disaggregated Data (SADD) for displacement associated with conflict or '
+        'disasters is often scarce. One way to estimate it is to use SADD available at the national '
+        'level. IDMC employs United Nations Population Estimates and Projections to break down the '
+        'number of internally displaced people by sex and age. The methodology and limitations of '
+        'this approach are described on IDMC’s website at: https://www.internal-displacement.org/monitoring-tools',
+    ])
+
+
+def write_disaster_export(qs, file):
+    """
+    Write the disaster export to the given file using a write-only workbook,
+    rows are fetched in chunks so that the memory usage doesn't grow with the data.
+    """
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet('1_Disaster_Displacement_data')
+    ws.append(DISASTER_EXPORT_HEADERS)
+    for row in iter_disaster_export_rows(qs):
+        ws.append(row)
+    append_disaster_readme(wb.create_sheet('README'))
+    wb.save(file)
+
+
+def write_displacement_export(qs, idps_sadd_qs, cause, file):
+    """
+    Write the displacement export to the given file using a write-only workbook
+    """
+    headers, fields = get_displacement_export_headers_and_fields(cause)
+    wb = Workbook(write_only=True)
+    # Tab 1
+    ws = wb.create_sheet('1_Displacement_data')
+    ws.append(headers)
+    for row in iter_values_export_rows(qs, fields):
+        ws.append(row)
+    # Tab 2
+    ws2 = wb.create_sheet('2_IDPs_SADD_estimates')
+    ws2.append(IDPS_SADD_ESTIMATE_EXPORT_HEADERS)
+    for row in iter_idps_sadd_estimate_export_rows(idps_sadd_qs):
+        ws2.append(row)
+    append_displacement_readme(wb.create_sheet('README'))
+    wb.save(file)
+
+
+class _EchoBuffer:
+    """
+    Pseudo buffer which returns the value written by csv.writer
+    """
+    def write(self, value):
+        return value
+
+
+def iter_csv_lines(headers, rows):
+    writer = csv.writer(_EchoBuffer())
+    yield writer.writerow(headers)
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def get_csv_export_response(filename, headers, rows):
+    response = StreamingHttpResponse(iter_csv_lines(headers, rows), content_type='text/csv')
+    response['Content-Disposition'] = f'attachment; filename={filename}.csv'
+    return response
+
+
+def get_xlsx_export_response(filename, write_export, *args):
+    """
+    Write the export to a temporary file and stream it.
+    NOTE: The temporary file is removed once the response is closed.
+    """
+    file = get_temp_file(suffix='.xlsx')
+    write_export(*args, file)
+    file.seek(0)
+    return FileResponse(file, as_attachment=True, filename=f'{filename}.xlsx')
+
+
+def get_disaster_export_qs(params):
+    return RestDisasterFilterSet(data=params, queryset=Disaster.objects.select_related('country')).qs
+
+
+def get_displacement_export_qs(params):
+    return RestDisplacementDataFilterSet(data=params, queryset=DisplacementData.objects.all()).qs.order_by(
+        '-year',
+        'iso3',
+    )
+
+
+def get_idps_sadd_estimate_export_qs(params):
+    return IdpsSaddEstimateFilter(data=params, queryset=IdpsSaddEstimate.objects.all()).qs
+
+
+def get_export_file_variants(export_type):
+    """
+    Returns the (cause, iso3) combinations which are pre-generated for the export type
+    """
+    if export_type == ExportFile.ExportType.DISASTER:
+        iso3_qs = Disaster.objects.all()
+        causes = []
+    else:
+        iso3_qs = DisplacementData.objects.all()
+        causes = ['conflict', 'disaster']
+    yield '', ''
+    for cause in causes:
+        yield cause, ''
+    for iso3 in iso3_qs.order_by().values_list('iso3', flat=True).distinct():
+        yield '', iso3
+
+
+def get_export_file_variant_params(cause, iso3):
+    params = {}
+    if cause:
+        params['cause'] = cause
+    if iso3:
+        params['iso3__in'] = iso3
+    return params
+
+
+def get_export_file_variant(export_type, query_params):
+    """
+    Returns the (cause, iso3) pre-generated variant for the request query params.
+    Returns None if the query params are not covered by the pre-generated files.
+    """
+    params = {
+        key: value
+        for key, value in query_params.items()
+        if key not in ['client_id', 'export_format']
+    }
+    if query_params.get('export_format', ExportFormat.XLSX) != ExportFormat.XLSX:
+        return
+    if not params:
+        return '', ''
+    if (
+        export_type == ExportFile.ExportType.DISPLACEMENT and
+        params.keys() == {'cause'} and
+        params['cause'] in ['conflict', 'disaster']
+    ):
+        return params['cause'], ''
+    if params.keys() == {'iso3__in'} and params['iso3__in'] and ',' not in params['iso3__in']:
+        return '', params['iso3__in']
+
+
+def get_cached_export_file(export_type, query_params):
+    """
+    Returns the pre-generated export file for the latest GIDD data, if available for the query params
+    """
+    variant = get_export_file_variant(export_type, query_params)
+    if variant is None:
+        return
+    status_log = StatusLog.objects.filter(
+        status=StatusLog.Status.SUCCESS,
+    ).order_by('-triggered_at').first()
+    if status_log is None:
+        return
+    cause, iso3 = variant
+    qs = ExportFile.objects.filter(
+        status_log=status_log,
+        export_type=export_type,
+        cause=cause,
+        iso3=iso3,
+    )
+    # NOTE: The exports are filtered using the release metadata
+    release_metadata = ReleaseMetadata.objects.last()
+    if release_metadata:
+        qs = qs.filter(created_at__gte=release_metadata.modified_at)
+    return qs.first()
+
+
+def write_export_file(export_type, cause, iso3, file):
+    params = get_export_file_variant_params(cause, iso3)
+    if export_type == ExportFile.ExportType.DISASTER:
+        write_disaster_export(get_disaster_export_qs(params), file)
+    else:
+        write_displacement_export(
+            get_displacement_export_qs(params),
+            get_idps_sadd_estimate_export_qs(params),
+            cause,
+            file,
+        )
+
+
+def delete_export_files(qs):
+    for export_file in qs:
+        export_file.file.delete(save=False)
+        export_file.delete()
+
+
+def generate_export_files(status_log):
+    """
+    Pre-generate the common exports for the status log and remove the exports of the older status logs
+    """
+    delete_export_files(ExportFile.objects.filter(status_log=status_log))
+    for export_type, filename in [
+        (ExportFile.ExportType.DISASTER, DISASTER_EXPORT_FILENAME),
+        (ExportFile.ExportType.DISPLACEMENT, DISPLACEMENT_EXPORT_FILENAME),
+    ]:
+        for cause, iso3 in get_export_file_variants(export_type):
+            with get_temp_file(suffix='.xlsx') as tmp:
+                write_export_file(export_type, cause, iso3, tmp)
+                tmp.seek(0)
+                export_file = ExportFile(
+                    status_log=status_log,
+                    export_type=export_type,
+                    cause=cause,
+                    iso3=iso3,
+                )
+                export_file.file.save(f'{filename}.xlsx', File(tmp))
+    delete_export_files(ExportFile.objects.exclude(status_log=status_log))
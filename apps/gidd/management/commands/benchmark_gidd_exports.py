@@ -0,0 +1,45 @@
+import resource
+import time
+from django.core.management.base import BaseCommand
+
+from apps.gidd.models import Disaster, DisplacementData, IdpsSaddEstimate
+from apps.gidd.exports import write_disaster_export, write_displacement_export
+from utils.common import get_temp_file
+
+
+class Command(BaseCommand):
+
+    help = "Benchmark the GIDD exports (runtime and peak RSS) for increasing number of rows"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--steps', type=int, default=4)
+
+    def benchmark(self, label, write_export, total, *args):
+        with get_temp_file(suffix='.xlsx') as file:
+            start = time.time()
+            write_export(*args, file)
+            runtime = time.time() - start
+        # NOTE: ru_maxrss is the peak for the whole process (KB in linux)
+        peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        self.stdout.write(f'{label}: rows={total} runtime={runtime:.2f}s peak_rss={peak_rss / 1024:.1f}MB')
+
+    def handle(self, *args, **kwargs):
+        steps = kwargs['steps']
+        disaster_qs = Disaster.objects.order_by('id')
+        displacement_qs = DisplacementData.objects.order_by('-year', 'iso3')
+        disaster_count = disaster_qs.count()
+        displacement_count = displacement_qs.count()
+        for step in range(1, steps + 1):
+            limit = disaster_count * step // steps
+            self.benchmark(
+                'disaster-export', write_disaster_export, limit,
+                Disaster.objects.filter(id__in=disaster_qs.values('id')[:limit]),
+            )
+        for step in range(1, steps + 1):
+            limit = displacement_count * step // steps
+            self.benchmark(
+                'displacement-export', write_displacement_export, limit,
+                DisplacementData.objects.filter(id__in=displacement_qs.values('id')[:limit]),
+                IdpsSaddEstimate.objects.all(),
+                None,
+            )
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from apps.gidd.cache import get_statistics_cache_stats, set_gidd_data_version
+
+
+class Command(BaseCommand):
+
+    help = "Show the hit/miss counters of the GIDD statistics cache"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--invalidate', action='store_true', help='Invalidate the cached statistics')
+
+    def handle(self, *args, **kwargs):
+        if kwargs['invalidate']:
+            set_gidd_data_version()
+            self.stdout.write('GIDD statistics cache invalidated')
+        for name, stats in get_statistics_cache_stats(['conflict', 'disaster', 'combined']).items():
+            total = stats['hit'] + stats['miss']
+            hit_ratio = stats['hit'] / total if total else 0
+            self.stdout.write(f"{name}: hit={stats['hit']} miss={stats['miss']} hit_ratio={hit_ratio:.2f}")
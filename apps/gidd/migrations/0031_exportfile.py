@@ -0,0 +1,32 @@
+# Generated by Django 3.2 on 2024-01-20 09:12
+
+import apps.gidd.models
+from django.db import migrations, models
+import django.db.models.deletion
+import helix.storages
+import utils.fields
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gidd', '0030_auto_20240114_1147'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExportFile',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('export_type', models.CharField(choices=[('disaster', 'Disaster'), ('displacement', 'Displacement')], max_length=20, verbose_name='Export type')),
+                ('cause', models.CharField(blank=True, max_length=20, verbose_name='Cause')),
+                ('iso3', models.CharField(blank=True, max_length=5, verbose_name='ISO3')),
+                ('file', utils.fields.CachedFileField(storage=helix.storages.get_external_storage, upload_to=apps.gidd.models.export_file_upload_to, verbose_name='File')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('status_log', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='export_files', to='gidd.statuslog', verbose_name='Status log')),
+            ],
+            options={
+                'unique_together': {('status_log', 'export_type', 'cause', 'iso3')},
+            },
+        ),
+    ]
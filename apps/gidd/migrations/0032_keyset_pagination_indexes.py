@@ -0,0 +1,21 @@
+# Generated by Django 3.2 on 2026-10-18 10:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gidd', '0031_exportfile'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='disaster',
+            index=models.Index(fields=['year', 'iso3', 'id'], name='gidd_disaster_year_iso3_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='displacementdata',
+            index=models.Index(fields=['year', 'iso3', 'id'], name='gidd_displ_year_iso3_idx'),
+        ),
+    ]
@@ -1,9 +1,13 @@
 from django.db import models
+from django.utils import timezone
+from django.utils.crypto import get_random_string
 from django.utils.translation import gettext_lazy as _
 from django_enumfield import enum
 from django.contrib.postgres.fields import ArrayField
 from apps.crisis.models import Crisis
 from apps.entry.models import Figure
+from helix.storages import get_external_storage
+from utils.fields import CachedFileField
 
 
 class Conflict(models.Model):
@@ -113,6 +117,10 @@ class Disaster(models.Model):
     class Meta:
         verbose_name = _('Disaster')
         verbose_name_plural = _('Disasters')
+        indexes = [
+            # For keyset pagination
+            models.Index(fields=['year', 'iso3', 'id'], name='gidd_disaster_year_iso3_idx'),
+        ]
 
     def __str__(self):
         return str(self.id)
@@ -152,6 +160,34 @@ class StatusLog(models.Model):
         return StatusLog.objects.last().completed_at.strftime("%d/%m/%Y")
 
 
+class DirtyCell(models.Model):
+    """
+    (year, country) cells with GIDD rows made stale by changes which can't be detected later,
+    e.g. deleted figures or figures moved to another country/year.
+    These are re-generated by the next incremental update and cleared when the update is swapped.
+    """
+    year = models.IntegerField(verbose_name=_('Year'))
+    country = models.ForeignKey(
+        'country.Country', related_name='+', on_delete=models.CASCADE,
+        verbose_name=_('Country')
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f'{self.year}: {self.country_id}'
+
+    @classmethod
+    def add(cls, country_id, start_date, end_date):
+        start_date = start_date or end_date
+        end_date = end_date or start_date
+        if country_id is None or start_date is None:
+            return
+        cls.objects.bulk_create([
+            cls(year=year, country_id=country_id)
+            for year in range(start_date.year, end_date.year + 1)
+        ])
+
+
 class ConflictLegacy(models.Model):
     total_displacement = models.BigIntegerField(blank=True, null=True)
     new_displacement = models.BigIntegerField(blank=True, null=True)
@@ -279,6 +315,12 @@ class DisplacementData(models.Model):
     disaster_total_displacement_rounded = models.BigIntegerField(null=True, verbose_name=_('Disaster total nds'))
     disaster_new_displacement_rounded = models.BigIntegerField(null=True, verbose_name=_('Disaster total nd'))
 
+    class Meta:
+        indexes = [
+            # For keyset pagination
+            models.Index(fields=['year', 'iso3', 'id'], name='gidd_displ_year_iso3_idx'),
+        ]
+
     def __str__(self):
         return self.iso3
 
@@ -311,3 +353,39 @@ class IdpsSaddEstimate(models.Model):
 
     def __str__(self):
         return self.iso3
+
+
+def export_file_upload_to(instance, filename):
+    date_str = timezone.now().strftime('%Y-%m-%d-%H-%M-%S')
+    random_chars = get_random_string(length=5)
+    return f'gidd-export/{instance.status_log_id}/{date_str}/{random_chars}/{filename}'
+
+
+class ExportFile(models.Model):
+    """
+    Pre-generated GIDD exports for a GIDD data release (StatusLog)
+    """
+    class ExportType(models.TextChoices):
+        DISASTER = 'disaster', _('Disaster')
+        DISPLACEMENT = 'displacement', _('Displacement')
+
+    status_log = models.ForeignKey(
+        StatusLog, verbose_name=_('Status log'),
+        related_name='export_files', on_delete=models.CASCADE
+    )
+    export_type = models.CharField(verbose_name=_('Export type'), max_length=20, choices=ExportType.choices)
+    # NOTE: Empty value means the export is not filtered by the field
+    cause = models.CharField(verbose_name=_('Cause'), max_length=20, blank=True)
+    iso3 = models.CharField(verbose_name=_('ISO3'), max_length=5, blank=True)
+    file = CachedFileField(
+        verbose_name=_('File'),
+        upload_to=export_file_upload_to,
+        storage=get_external_storage,
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ('status_log', 'export_type', 'cause', 'iso3')
+
+    def __str__(self):
+        return f'{self.status_log_id}: {self.export_type} {self.cause} {self.iso3}'
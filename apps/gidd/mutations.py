@@ -7,10 +7,14 @@ from django.utils.translation import gettext
 from .serializers import StatusLogSerializer, ReleaseMetadataSerializer
 from .schema import GiddStatusLogType, GiddReleaseMetadataType
 from .tasks import update_gidd_data
+from .cache import set_gidd_data_version
 from .models import StatusLog
 
 
 class GiddUpdateData(graphene.Mutation):
+    class Arguments:
+        incremental = graphene.Boolean()
+
     errors = graphene.List(graphene.NonNull(CustomErrorType))
     ok = graphene.Boolean()
     result = graphene.Field(GiddStatusLogType)
@@ -18,7 +22,7 @@ class GiddUpdateData(graphene.Mutation):
     @staticmethod
     @is_authenticated()
     @permission_checker(['gidd.update_gidd_data_gidd'])
-    def mutate(root, info):
+    def mutate(root, info, incremental=False):
         user = info.context.user
         # Check if any pending updates
         status_log = StatusLog.objects.last()
@@ -38,7 +42,7 @@ class GiddUpdateData(graphene.Mutation):
             return GiddUpdateData(errors=errors, ok=False)
         instance = serializer.save()
         # Update date in background
-        transaction.on_commit(lambda: update_gidd_data.delay(log_id=instance.id))
+        transaction.on_commit(lambda: update_gidd_data.delay(log_id=instance.id, incremental=incremental))
         return GiddUpdateData(result=instance, errors=None, ok=True)
 
 
@@ -65,6 +69,7 @@ class GiddUpdateReleaseMetaData(graphene.Mutation):
         if errors := mutation_is_not_valid(serializer):
             return GiddUpdateReleaseMetaData(errors=errors, ok=False)
         instance = serializer.save()
+        transaction.on_commit(set_gidd_data_version)
         # FIXME: We should not call update_gidd_data when setting metadata
         # NOTE: Update date in background
         transaction.on_commit(lambda: update_gidd_data.delay(log_id=instance.id))
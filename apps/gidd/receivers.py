@@ -0,0 +1,28 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from apps.entry.models import Figure
+from apps.entry.receivers import get_figure_previous_state
+from .models import DirtyCell
+
+
+# NOTE: Incremental GIDD updates detect the changed figures using modified_at,
+# the cells which the figures are removed from are recorded here as those can't be detected later.
+
+@receiver(post_save, sender=Figure)
+def add_figure_previous_dirty_cells(sender, instance, created, **kwargs):
+    previous_state = get_figure_previous_state(instance)
+    if previous_state is None:
+        return
+    if (
+        previous_state['country_id'] == instance.country_id and
+        previous_state['start_date'] == instance.start_date and
+        previous_state['end_date'] == instance.end_date
+    ):
+        return
+    DirtyCell.add(previous_state['country_id'], previous_state['start_date'], previous_state['end_date'])
+
+
+@receiver(post_delete, sender=Figure)
+def add_figure_dirty_cells(sender, instance, **kwargs):
+    DirtyCell.add(instance.country_id, instance.start_date, instance.end_date)
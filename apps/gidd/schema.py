@@ -1,5 +1,6 @@
 # types.py
 import graphene
+from collections import defaultdict
 from graphene_django_extras import DjangoObjectField
 from graphene_django.filter.utils import get_filtering_args_from_filterset
 from utils.graphene.types import CustomDjangoListObjectType
@@ -34,24 +35,7 @@ from .filters import (
     ReleaseMetadataFilter,
 )
 from .enums import GiddStatusLogEnum
-
-
-def custom_date_filters(start_year, end_year):
-    filters = {
-        'idps_date_filters': dict(),
-        'nd_date_filters': dict(),
-    }
-
-    filters['idps_date_filters'].update({'total_displacement__gt': 0})
-    filters['nd_date_filters'].update({'new_displacement__gt': 0})
-
-    if start_year:
-        filters['nd_date_filters'].update({'year__gte': start_year})
-    if end_year:
-        filters['nd_date_filters'].update({'year__lte': end_year})
-        filters['idps_date_filters'].update({'year__gte': end_year})
-        filters['idps_date_filters'].update({'year__lte': end_year})
-    return filters
+from .cache import get_or_set_statistics
 
 
 class GiddDisasterCountryType(graphene.ObjectType):
@@ -352,6 +336,192 @@ class GiddEventType(graphene.ObjectType):
     )
 
 
+def aggregate_statistics(qs, start_year, end_year):
+    """
+    Aggregate the conflict/disaster rows by (year, country) using a single query,
+    the totals, countries and time series are derived from the grouped rows.
+
+    NOTE:
+    - Internal displacements (new_displacement) use the rows within start_year and end_year
+    - IDPs (total_displacement) use the rows of the end_year only, all years if end_year is not provided
+    """
+    qs = qs.filter(
+        models.Q(new_displacement__gt=0) | models.Q(total_displacement__gt=0)
+    )
+    if end_year:
+        qs = qs.filter(year__lte=end_year)
+    grouped_rows = qs.order_by().values('year', 'country_id', 'country_name', 'iso3').annotate(
+        new_displacement_sum=models.Sum('new_displacement', filter=models.Q(new_displacement__gt=0)),
+        total_displacement_sum=models.Sum('total_displacement', filter=models.Q(total_displacement__gt=0)),
+        new_displacement_count=models.Count('id', filter=models.Q(new_displacement__gt=0)),
+    ).order_by('year', 'iso3')
+
+    def _in_year_range(year):
+        return (start_year is None or year >= start_year) and (end_year is None or year <= end_year)
+
+    statistics = dict(
+        new_displacements=0,
+        new_displacement_count=0,
+        total_displacements=0,
+        internal_displacement_countries=set(),
+        total_displacement_countries=set(),
+        new_displacement_timeseries_by_year=defaultdict(int),
+        new_displacement_timeseries_by_country=[],
+        total_displacement_timeseries_by_year=defaultdict(int),
+        total_displacement_timeseries_by_country=[],
+    )
+    for row in grouped_rows:
+        year = row['year']
+        country = dict(id=row['country_id'], iso3=row['iso3'], country_name=row['country_name'])
+        in_year_range = _in_year_range(year)
+        if row['new_displacement_sum'] and in_year_range:
+            statistics['new_displacements'] += row['new_displacement_sum']
+            statistics['new_displacement_count'] += row['new_displacement_count']
+            statistics['internal_displacement_countries'].add(row['iso3'])
+            statistics['new_displacement_timeseries_by_year'][year] += row['new_displacement_sum']
+            statistics['new_displacement_timeseries_by_country'].append(
+                dict(year=year, total=row['new_displacement_sum'], country=country)
+            )
+        if row['total_displacement_sum']:
+            if in_year_range:
+                statistics['total_displacement_timeseries_by_year'][year] += row['total_displacement_sum']
+                statistics['total_displacement_timeseries_by_country'].append(
+                    dict(year=year, total=row['total_displacement_sum'], country=country)
+                )
+            if not end_year or year == end_year:
+                statistics['total_displacements'] += row['total_displacement_sum']
+                statistics['total_displacement_countries'].add(row['iso3'])
+    return statistics
+
+
+def get_timeseries_by_year(timeseries):
+    return [
+        GiddTimeSeriesStatisticsByYearType(
+            year=year,
+            total=total,
+            total_rounded=round_and_remove_zero(total),
+        ) for year, total in timeseries.items()
+    ]
+
+
+def get_timeseries_by_country(timeseries):
+    return [
+        GiddTimeSeriesStatisticsByCountryType(
+            year=item['year'],
+            total=item['total'],
+            total_rounded=round_and_remove_zero(item['total']),
+            country=GiddDisasterCountryType(**item['country']),
+        ) for item in timeseries
+    ]
+
+
+def get_conflict_statistics(**kwargs):
+    start_year = kwargs.pop('start_year', None)
+    end_year = kwargs.pop('end_year', None)
+    statistics = aggregate_statistics(ConflictStatisticsFilter(data=kwargs).qs, start_year, end_year)
+
+    return GiddConflictStatisticsType(
+        new_displacements_rounded=round_and_remove_zero(statistics['new_displacements']),
+        new_displacements=statistics['new_displacements'],
+        total_displacements_rounded=round_and_remove_zero(statistics['total_displacements']),
+        total_displacements=statistics['total_displacements'],
+        total_displacement_countries=len(statistics['total_displacement_countries']),
+        internal_displacement_countries=len(statistics['internal_displacement_countries']),
+        new_displacement_timeseries_by_year=get_timeseries_by_year(
+            statistics['new_displacement_timeseries_by_year']
+        ),
+        new_displacement_timeseries_by_country=get_timeseries_by_country(
+            statistics['new_displacement_timeseries_by_country']
+        ),
+        total_displacement_timeseries_by_year=get_timeseries_by_year(
+            statistics['total_displacement_timeseries_by_year']
+        ),
+        total_displacement_timeseries_by_country=get_timeseries_by_country(
+            statistics['total_displacement_timeseries_by_country']
+        ),
+    )
+
+
+def get_disaster_statistics(**kwargs):
+    disaster_qs = DisasterStatisticsFilter(data=kwargs).qs
+    start_year = kwargs.pop('start_year', None)
+    end_year = kwargs.pop('end_year', None)
+    statistics = aggregate_statistics(DisasterStatisticsFilter(data=kwargs).qs, start_year, end_year)
+
+    categories_qs = disaster_qs.values('hazard_type', 'hazard_type__id').annotate(
+        total=Coalesce(models.Sum('new_displacement', output_field=models.IntegerField()), 0),
+        label=models.Case(
+            models.When(hazard_sub_category=None, then=models.Value('Not labeled')),
+            default=models.F('hazard_type_name'),
+            output_field=models.CharField()
+        )
+    ).filter(total__gt=0)
+
+    return GiddDisasterStatisticsType(
+        new_displacements_rounded=round_and_remove_zero(statistics['new_displacements']),
+        new_displacements=statistics['new_displacements'],
+        total_displacements_rounded=round_and_remove_zero(statistics['total_displacements']),
+        total_displacements=statistics['total_displacements'],
+        total_events=statistics['new_displacement_count'],
+
+        total_displacement_countries=len(statistics['total_displacement_countries']),
+        internal_displacement_countries=len(statistics['internal_displacement_countries']),
+
+        new_displacement_timeseries_by_year=get_timeseries_by_year(
+            statistics['new_displacement_timeseries_by_year']
+        ),
+        new_displacement_timeseries_by_country=get_timeseries_by_country(
+            statistics['new_displacement_timeseries_by_country']
+        ),
+        total_displacement_timeseries_by_year=get_timeseries_by_year(
+            statistics['total_displacement_timeseries_by_year']
+        ),
+        total_displacement_timeseries_by_country=get_timeseries_by_country(
+            statistics['total_displacement_timeseries_by_country']
+        ),
+
+        displacements_by_hazard_type=[
+            DisplacementByHazardType(
+                id=item['hazard_type__id'],
+                label=item['label'],
+                new_displacements=item['total'],
+                new_displacements_rounded=round_and_remove_zero(item['total']),
+            ) for item in categories_qs
+        ]
+    )
+
+
+def get_combined_statistics(**kwargs):
+    start_year = kwargs.pop('start_year', None)
+    end_year = kwargs.pop('end_year', None)
+
+    disaster_statistics = aggregate_statistics(DisasterStatisticsFilter(data=kwargs).qs, start_year, end_year)
+    # NOTE: Conflict doesn't have hazard_types, ConflictStatisticsFilter ignores it
+    conflict_statistics = aggregate_statistics(ConflictStatisticsFilter(data=kwargs).qs, start_year, end_year)
+
+    total_displacements = disaster_statistics['total_displacements'] + conflict_statistics['total_displacements']
+    internal_displacements = disaster_statistics['new_displacements'] + conflict_statistics['new_displacements']
+
+    return GiddCombinedStatisticsType(
+        internal_displacements=internal_displacements,
+        total_displacements=total_displacements,
+        internal_displacements_rounded=round_and_remove_zero(
+            internal_displacements
+        ),
+        total_displacements_rounded=round_and_remove_zero(
+            total_displacements
+        ),
+        internal_displacement_countries=len(
+            disaster_statistics['internal_displacement_countries'] |
+            conflict_statistics['internal_displacement_countries']
+        ),
+        total_displacement_countries=len(
+            disaster_statistics['total_displacement_countries'] |
+            conflict_statistics['total_displacement_countries']
+        ),
+    )
+
+
 class Query(graphene.ObjectType):
     gidd_public_conflicts = DjangoPaginatedListObjectField(
         GiddConflictListType,
@@ -481,92 +651,10 @@ class Query(graphene.ObjectType):
         client_id = kwargs.pop('client_id')
         track_gidd(client_id, ExternalApiDump.ExternalApiType.GIDD_CONFLICT_STAT_GRAPHQL)
 
-        conflict_qs = ConflictStatisticsFilter(data=kwargs).qs
-        start_year = kwargs.pop('start_year', None)
-        end_year = kwargs.pop('end_year', None)
-        filters = custom_date_filters(start_year, end_year)
-
-        conflict_total_displacement_qs = ConflictStatisticsFilter(data=kwargs).qs.filter(
-            **filters.get('idps_date_filters')
-        )
-        conflict_new_displacement_qs = ConflictStatisticsFilter(data=kwargs).qs.filter(
-            **filters.get('nd_date_filters')
-        )
-
-        new_displacement_timeseries_by_year_qs = conflict_qs.filter(new_displacement__gt=0).values('year').annotate(
-            total=Coalesce(models.Sum('new_displacement', output_field=models.IntegerField()), 0)
-        ).order_by('year').values('year', 'total')
-
-        new_displacement_timeseries_by_country_qs = conflict_qs.filter(new_displacement__gt=0).values('year').annotate(
-            total=Coalesce(models.Sum('new_displacement', output_field=models.IntegerField()), 0)
-        ).order_by('year').values('year', 'total', 'country_id', 'country_name', 'iso3')
-
-        total_displacement_timeseries_by_year_qs = conflict_qs.filter(total_displacement__gt=0).values('year').annotate(
-            total=Coalesce(models.Sum('total_displacement', output_field=models.IntegerField()), 0)
-        ).order_by('year').values('year', 'total')
-
-        total_displacement_timeseries_by_country_qs = conflict_qs.filter(total_displacement__gt=0).values('year').annotate(
-            total=Coalesce(models.Sum('total_displacement', output_field=models.IntegerField()), 0)
-        ).order_by('year').values('year', 'total', 'country_id', 'country_name', 'iso3')
-
-        return GiddConflictStatisticsType(
-            new_displacements_rounded=round_and_remove_zero(
-                conflict_new_displacement_qs.aggregate(
-                    total=Coalesce(models.Sum('new_displacement', output_field=models.IntegerField()), 0)
-                )['total']
-            ),
-            new_displacements=conflict_new_displacement_qs.aggregate(
-                total=Coalesce(models.Sum('new_displacement', output_field=models.IntegerField()), 0)
-            )['total'],
-
-            total_displacements_rounded=round_and_remove_zero(
-                conflict_total_displacement_qs.aggregate(
-                    total=Coalesce(models.Sum('total_displacement', output_field=models.IntegerField()), 0)
-                )['total']
-            ),
-            total_displacements=conflict_total_displacement_qs.aggregate(
-                total=Coalesce(models.Sum('total_displacement', output_field=models.IntegerField()), 0)
-            )['total'],
-            total_displacement_countries=conflict_total_displacement_qs.distinct('iso3').count(),
-            internal_displacement_countries=conflict_new_displacement_qs.distinct('iso3').count(),
-            new_displacement_timeseries_by_year=[
-                GiddTimeSeriesStatisticsByYearType(
-                    year=item['year'],
-                    total=item['total'],
-                    total_rounded=round_and_remove_zero(item['total']),
-                ) for item in new_displacement_timeseries_by_year_qs
-            ],
-            new_displacement_timeseries_by_country=[
-                GiddTimeSeriesStatisticsByCountryType(
-                    year=item['year'],
-                    total_rounded=round_and_remove_zero(item['total']),
-                    total=item['total'],
-                    country=GiddDisasterCountryType(
-                        id=item['country_id'],
-                        iso3=item['iso3'],
-                        country_name=item['country_name']
-                    )
-                ) for item in new_displacement_timeseries_by_country_qs
-            ],
-            total_displacement_timeseries_by_year=[
-                GiddTimeSeriesStatisticsByYearType(
-                    year=item['year'],
-                    total=item['total'],
-                    total_rounded=round_and_remove_zero(item['total']),
-                ) for item in total_displacement_timeseries_by_year_qs
-            ],
-            total_displacement_timeseries_by_country=[
-                GiddTimeSeriesStatisticsByCountryType(
-                    year=item['year'],
-                    total_rounded=round_and_remove_zero(item['total']),
-                    total=item['total'],
-                    country=GiddDisasterCountryType(
-                        id=item['country_id'],
-                        iso3=item['iso3'],
-                        country_name=item['country_name']
-                    )
-                ) for item in total_displacement_timeseries_by_country_qs
-            ],
+        return get_or_set_statistics(
+            'conflict',
+            kwargs,
+            lambda: get_conflict_statistics(**kwargs),
         )
 
     @staticmethod
@@ -575,118 +663,10 @@ class Query(graphene.ObjectType):
         client_id = kwargs.pop('client_id')
         track_gidd(client_id, ExternalApiDump.ExternalApiType.GIDD_DISASTER_STAT_GRAPHQL)
 
-        disaster_qs = DisasterStatisticsFilter(data=kwargs).qs
-        start_year = kwargs.pop('start_year', None)
-        end_year = kwargs.pop('end_year', None)
-        filters = custom_date_filters(start_year, end_year)
-
-        disaster_total_displacement_qs = DisasterStatisticsFilter(data=kwargs).qs.filter(
-            **filters.get('idps_date_filters')
-        )
-        disaster_new_displacement_qs = DisasterStatisticsFilter(data=kwargs).qs.filter(
-            **filters.get('nd_date_filters')
-        )
-
-        new_displacement_timeseries_by_year_qs = disaster_qs.filter(new_displacement__gt=0).values('year').annotate(
-            total=Coalesce(models.Sum('new_displacement', output_field=models.IntegerField()), 0)
-        ).order_by('year').values('year', 'total')
-
-        new_displacement_timeseries_by_country_qs = disaster_qs.filter(new_displacement__gt=0).values('year').annotate(
-            total=Coalesce(models.Sum('new_displacement', output_field=models.IntegerField()), 0)
-        ).order_by('year').values('year', 'total', 'country_id', 'country_name', 'iso3')
-
-        total_displacement_timeseries_by_year_qs = disaster_qs.filter(total_displacement__gt=0).values('year').annotate(
-            total=Coalesce(models.Sum('total_displacement', output_field=models.IntegerField()), 0)
-        ).order_by('year').values('year', 'total')
-
-        total_displacement_timeseries_by_country_qs = disaster_qs.filter(total_displacement__gt=0).values('year').annotate(
-            total=Coalesce(models.Sum('total_displacement', output_field=models.IntegerField()), 0)
-        ).order_by('year').values('year', 'total', 'country_id', 'country_name', 'iso3')
-
-        categories_qs = disaster_qs.values('hazard_type', 'hazard_type__id').annotate(
-            total=Coalesce(models.Sum('new_displacement', output_field=models.IntegerField()), 0),
-            label=models.Case(
-                models.When(hazard_sub_category=None, then=models.Value('Not labeled')),
-                default=models.F('hazard_type_name'),
-                output_field=models.CharField()
-            )
-        ).filter(total__gt=0)
-
-        return GiddDisasterStatisticsType(
-            new_displacements_rounded=round_and_remove_zero(
-                disaster_new_displacement_qs.aggregate(
-                    total=Coalesce(models.Sum('new_displacement', output_field=models.IntegerField()), 0)
-                )['total']
-            ),
-            new_displacements=disaster_new_displacement_qs.aggregate(
-                total=Coalesce(models.Sum('new_displacement', output_field=models.IntegerField()), 0)
-            )['total'],
-            total_displacements_rounded=round_and_remove_zero(
-                disaster_total_displacement_qs.aggregate(
-                    total=Coalesce(models.Sum('total_displacement', output_field=models.IntegerField()), 0)
-                )['total']
-            ),
-            total_displacements=disaster_total_displacement_qs.aggregate(
-                total=Coalesce(models.Sum('total_displacement', output_field=models.IntegerField()), 0)
-            )['total'],
-            total_events=disaster_new_displacement_qs.filter(
-                models.Q(new_displacement__gt=0) | models.Q(total_displacement__gt=0)
-            ).values('event__name').annotate(
-                events=models.Count('id')
-            ).aggregate(total_events=Coalesce(models.Sum('events', output_field=models.IntegerField()), 0))['total_events'],
-
-            total_displacement_countries=disaster_total_displacement_qs.distinct('iso3').count(),
-            internal_displacement_countries=disaster_new_displacement_qs.distinct('iso3').count(),
-
-            new_displacement_timeseries_by_year=[
-                GiddTimeSeriesStatisticsByYearType(
-                    year=item['year'],
-                    total_rounded=round_and_remove_zero(item['total']),
-                    total=item['total'],
-                ) for item in new_displacement_timeseries_by_year_qs
-            ],
-
-            new_displacement_timeseries_by_country=[
-                GiddTimeSeriesStatisticsByCountryType(
-                    year=item['year'],
-                    total_rounded=round_and_remove_zero(item['total']),
-                    total=item['total'],
-                    country=GiddDisasterCountryType(
-                        id=item['country_id'],
-                        iso3=item['iso3'],
-                        country_name=item['country_name']
-                    )
-                ) for item in new_displacement_timeseries_by_country_qs
-            ],
-            total_displacement_timeseries_by_year=[
-                GiddTimeSeriesStatisticsByYearType(
-                    year=item['year'],
-                    total_rounded=round_and_remove_zero(item['total']),
-                    total=item['total'],
-                ) for item in total_displacement_timeseries_by_year_qs
-            ],
-
-            total_displacement_timeseries_by_country=[
-                GiddTimeSeriesStatisticsByCountryType(
-                    year=item['year'],
-                    total=item['total'],
-                    total_rounded=round_and_remove_zero(item['total']),
-                    country=GiddDisasterCountryType(
-                        id=item['country_id'],
-                        iso3=item['iso3'],
-                        country_name=item['country_name']
-                    )
-                ) for item in total_displacement_timeseries_by_country_qs
-            ],
-
-            displacements_by_hazard_type=[
-                DisplacementByHazardType(
-                    id=item['hazard_type__id'],
-                    label=item['label'],
-                    new_displacements=item['total'],
-                    new_displacements_rounded=round_and_remove_zero(item['total']),
-                ) for item in categories_qs
-            ]
+        return get_or_set_statistics(
+            'disaster',
+            kwargs,
+            lambda: get_disaster_statistics(**kwargs),
         )
 
     @staticmethod
@@ -787,77 +767,8 @@ class Query(graphene.ObjectType):
         client_id = kwargs.pop('client_id')
         track_gidd(client_id, ExternalApiDump.ExternalApiType.GIDD_COMBINED_STAT_GRAPHQL)
 
-        start_year = kwargs.pop('start_year', None)
-        end_year = kwargs.pop('end_year', None)
-
-        filters = custom_date_filters(start_year, end_year)
-
-        disaster_total_displacement_qs = DisasterStatisticsFilter(data=kwargs).qs.filter(
-            **filters.get('idps_date_filters')
-        )
-        disaster_internal_displacement_qs = DisasterStatisticsFilter(data=kwargs).qs.filter(
-            **filters.get('nd_date_filters')
-        )
-
-        disaster_total_displacement_stats = disaster_total_displacement_qs.aggregate(
-            models.Sum('total_displacement'),
-        )
-        disaster_internal_displacement_stats = disaster_internal_displacement_qs.aggregate(
-            models.Sum('new_displacement'),
-        )
-
-        disaster_total_displacement_countries = disaster_total_displacement_qs.order_by()\
-            .values_list('iso3', flat=True).distinct()
-        disaster_internal_displacement_countries = disaster_internal_displacement_qs.order_by()\
-            .values_list('iso3', flat=True).distinct()
-
-        # Conflict doesn't has hazard_type
-        if kwargs.get('hazard_type'):
-            kwargs = kwargs.pop('hazard_type')
-
-        conflict_total_displacement_qs = ConflictStatisticsFilter(data=kwargs).qs.filter(
-            **filters.get('idps_date_filters')
-        )
-        conflict_internal_displacement_qs = ConflictStatisticsFilter(data=kwargs).qs.filter(
-            **filters.get('nd_date_filters')
-        )
-
-        conflict_total_displacement_stats = conflict_total_displacement_qs.aggregate(
-            models.Sum('total_displacement'),
-        )
-        conflict_internal_displacement_stats = conflict_internal_displacement_qs.aggregate(
-            models.Sum('new_displacement'),
-        )
-
-        conflict_total_displacement_countries = conflict_total_displacement_qs.order_by()\
-            .values_list('iso3', flat=True).distinct()
-        conflict_internal_displacement_countries = conflict_internal_displacement_qs.order_by()\
-            .values_list('iso3', flat=True).distinct()
-
-        total_displacements = (
-            (disaster_total_displacement_stats['total_displacement__sum'] or 0) +
-            (conflict_total_displacement_stats['total_displacement__sum'] or 0)
-        )
-        internal_displacements = (
-            (disaster_internal_displacement_stats['new_displacement__sum'] or 0) +
-            (conflict_internal_displacement_stats['new_displacement__sum'] or 0)
-        )
-
-        return GiddCombinedStatisticsType(
-            internal_displacements=internal_displacements,
-            total_displacements=total_displacements,
-            internal_displacements_rounded=round_and_remove_zero(
-                internal_displacements
-            ),
-            total_displacements_rounded=round_and_remove_zero(
-                total_displacements
-            ),
-            internal_displacement_countries=len(set([
-                *disaster_internal_displacement_countries,
-                *conflict_internal_displacement_countries,
-            ])),
-            total_displacement_countries=len(set([
-                *disaster_total_displacement_countries,
-                *conflict_total_displacement_countries,
-            ])),
+        return get_or_set_statistics(
+            'combined',
+            kwargs,
+            lambda: get_combined_statistics(**kwargs),
         )
@@ -1,16 +1,20 @@
 import datetime
 import logging
+import typing
+from collections import defaultdict
+from celery import chord
 from helix.celery import app as celery_app
 from django.utils import timezone
-from django.db import models
+from django.db import connection, models, transaction
 from django.db.models.functions import Cast
 from django.contrib.postgres.aggregates.general import ArrayAgg
 from django.db.models import (
-    Sum, Case, When, IntegerField, Value, F, Subquery, OuterRef, Q
+    Sum, Case, When, IntegerField, Value, F, Q
 )
 from django.contrib.postgres.fields import ArrayField
+from psycopg2.extras import execute_values
 
-from utils.common import round_and_remove_zero
+from utils.common import round_and_remove_zero, RuntimeProfile
 from apps.entry.models import Figure
 from apps.event.models import Crisis
 from .models import (
@@ -20,9 +24,12 @@ from .models import (
     PublicFigureAnalysis,
     Conflict,
     Disaster,
+    DirtyCell,
     DisplacementData,
     IdpsSaddEstimate,
 )
+from .cache import set_gidd_data_version
+from .exports import generate_export_files
 from apps.country.models import Country
 from apps.report.models import Report
 from apps.common.utils import get_attr_list_from_event_codes
@@ -32,6 +39,11 @@ from utils.db import Array
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# NOTE: year -> country ids for which the GIDD rows needs to be re-generated
+AffectedCells = typing.Dict[int, typing.Set[int]]
+# NOTE: Rows generated by the per-year tasks are saved in a staging table for each update
+GIDD_STAGED_MODELS = (Conflict, Disaster)
+
 
 def get_gidd_years():
     return Report.objects.filter(is_gidd_report=True)\
@@ -40,6 +52,63 @@ def get_gidd_years():
         .values_list('gidd_report_year', flat=True)
 
 
+def get_last_successful_status_log(exclude_log_id=None):
+    return StatusLog.objects.filter(
+        status=StatusLog.Status.SUCCESS,
+    ).exclude(id=exclude_log_id).order_by('-triggered_at').first()
+
+
+def get_gidd_affected_cells(
+    since: datetime.datetime,
+    years: typing.List[int],
+    until: typing.Optional[datetime.datetime] = None,
+) -> typing.Optional[AffectedCells]:
+    """
+    Returns the (year, country) cells which are affected by figures or events changed since the given time.
+    Disaster rows are re-generated for every event within an affected cell.
+    Returns None if the whole dataset should be re-generated.
+
+    NOTE: Cells which figures are deleted from or moved out of are recorded as DirtyCell,
+    the ones recorded before until are included.
+    """
+    # New or removed GIDD report years affect every cell
+    if Report.objects.filter(modified_at__gte=since, gidd_report_year__isnull=False).exists():
+        return None
+
+    gidd_years = set(years)
+    affected_cells: AffectedCells = defaultdict(set)
+
+    changed_figures_qs = Figure.objects.filter(
+        Q(modified_at__gte=since) |
+        Q(event__modified_at__gte=since)
+    ).values('country', 'event', 'start_date', 'end_date')
+
+    changed_event_ids = set()
+    for figure in changed_figures_qs.iterator(chunk_size=2000):
+        changed_event_ids.add(figure['event'])
+        start_date = figure['start_date'] or figure['end_date']
+        end_date = figure['end_date'] or figure['start_date']
+        if figure['country'] is None or start_date is None:
+            continue
+        for year in gidd_years.intersection(range(start_date.year, end_date.year + 1)):
+            affected_cells[year].add(figure['country'])
+
+    dirty_cells_qs = DirtyCell.objects.filter(year__in=gidd_years)
+    if until:
+        dirty_cells_qs = dirty_cells_qs.filter(created_at__lt=until)
+    for year, country_id in dirty_cells_qs.values_list('year', 'country_id').distinct():
+        affected_cells[year].add(country_id)
+
+    # Figures moved out of a country/event are still referenced by the existing disaster rows
+    for year, country_id in Disaster.objects.filter(
+        event__in=changed_event_ids,
+        year__in=gidd_years,
+    ).values_list('year', 'country_id').distinct():
+        affected_cells[year].add(country_id)
+
+    return dict(affected_cells)
+
+
 def annotate_conflict(qs, year):
     return qs.annotate(
         year=Value(year, output_field=IntegerField()),
@@ -66,7 +135,7 @@ def annotate_conflict(qs, year):
     ).order_by('year')
 
 
-def update_gidd_legacy_data():
+def get_gidd_legacy_data():
     iso3_to_country_id_map = {
         country['iso3']: country['id'] for country in Country.objects.values('iso3', 'id')
     }
@@ -74,98 +143,105 @@ def update_gidd_legacy_data():
         country['iso3']: country['idmc_short_name'] for country in Country.objects.values('iso3', 'idmc_short_name')
     }
 
-    # Bulk create conflict legacy data
-    Conflict.objects.bulk_create(
-        [
-            Conflict(
-                total_displacement=item['total_displacement'],
-                new_displacement=item['new_displacement'],
-                total_displacement_rounded=round_and_remove_zero(
-                    item['total_displacement']
-                ),
-                new_displacement_rounded=round_and_remove_zero(
-                    item['new_displacement']
-                ),
-                year=item['year'],
-                iso3=item['iso3'],
-                country_id=iso3_to_country_id_map[item['iso3']],
-                country_name=iso3_to_country_name_map[item['iso3']],
-            ) for item in ConflictLegacy.objects.values(
-                'total_displacement',
-                'new_displacement',
-                'year',
-                'iso3',
-            )
-        ]
-    )
-
-    # Bulk create legacy disaster data
-    Disaster.objects.bulk_create(
-        [
-            Disaster(
-                event_name=item['event_name'],
-                year=item['year'],
-                start_date=item['start_date'],
-                start_date_accuracy=item['start_date_accuracy'],
-                end_date=item['end_date'],
-                end_date_accuracy=item['end_date_accuracy'],
-
-                hazard_category_id=item['hazard_category'],
-                hazard_sub_category_id=item['hazard_sub_category'],
-                hazard_type_id=item['hazard_type'],
-                hazard_sub_type_id=item['hazard_sub_type'],
-
-                # FIXME: we should get this from database
-                hazard_category_name=item['hazard_category__name'],
-                hazard_sub_category_name=item['hazard_sub_category__name'],
-                hazard_type_name=item['hazard_type__name'],
-                hazard_sub_type_name=item['hazard_sub_type__name'],
-
-                new_displacement=item['new_displacement'],
-
-                new_displacement_rounded=round_and_remove_zero(
-                    item['new_displacement']
-                ),
-                iso3=item['iso3'],
-                country_id=iso3_to_country_id_map[item['iso3']],
-                country_name=iso3_to_country_name_map[item['iso3']],
-            ) for item in DisasterLegacy.objects.values(
-                'event_name',
-                'year',
-                'start_date',
-                'start_date_accuracy',
-                'end_date',
-                'end_date_accuracy',
-                'hazard_category',
-                'hazard_sub_category',
-                'hazard_type',
-                'hazard_sub_type',
-                'hazard_category__name',
-                'hazard_sub_category__name',
-                'hazard_type__name',
-                'hazard_sub_type__name',
-                'new_displacement',
-                'iso3',
-            )
-        ]
-    )
+    conflicts = [
+        Conflict(
+            total_displacement=item['total_displacement'],
+            new_displacement=item['new_displacement'],
+            total_displacement_rounded=round_and_remove_zero(
+                item['total_displacement']
+            ),
+            new_displacement_rounded=round_and_remove_zero(
+                item['new_displacement']
+            ),
+            year=item['year'],
+            iso3=item['iso3'],
+            country_id=iso3_to_country_id_map[item['iso3']],
+            country_name=iso3_to_country_name_map[item['iso3']],
+        ) for item in ConflictLegacy.objects.values(
+            'total_displacement',
+            'new_displacement',
+            'year',
+            'iso3',
+        )
+    ]
+
+    disasters = [
+        Disaster(
+            event_name=item['event_name'],
+            year=item['year'],
+            start_date=item['start_date'],
+            start_date_accuracy=item['start_date_accuracy'],
+            end_date=item['end_date'],
+            end_date_accuracy=item['end_date_accuracy'],
+
+            hazard_category_id=item['hazard_category'],
+            hazard_sub_category_id=item['hazard_sub_category'],
+            hazard_type_id=item['hazard_type'],
+            hazard_sub_type_id=item['hazard_sub_type'],
+
+            # FIXME: we should get this from database
+            hazard_category_name=item['hazard_category__name'],
+            hazard_sub_category_name=item['hazard_sub_category__name'],
+            hazard_type_name=item['hazard_type__name'],
+            hazard_sub_type_name=item['hazard_sub_type__name'],
+
+            new_displacement=item['new_displacement'],
+
+            new_displacement_rounded=round_and_remove_zero(
+                item['new_displacement']
+            ),
+            iso3=item['iso3'],
+            country_id=iso3_to_country_id_map[item['iso3']],
+            country_name=iso3_to_country_name_map[item['iso3']],
+        ) for item in DisasterLegacy.objects.values(
+            'event_name',
+            'year',
+            'start_date',
+            'start_date_accuracy',
+            'end_date',
+            'end_date_accuracy',
+            'hazard_category',
+            'hazard_sub_category',
+            'hazard_type',
+            'hazard_sub_type',
+            'hazard_category__name',
+            'hazard_sub_category__name',
+            'hazard_type__name',
+            'hazard_sub_type__name',
+            'new_displacement',
+            'iso3',
+        )
+    ]
+    return conflicts, disasters
 
 
-def update_conflict_and_disaster_data():
+def get_conflict_and_disaster_data(years, affected_cells: typing.Optional[AffectedCells] = None):
+    """
+    Generate (without saving) the conflict and disaster rows for the provided years.
+    If affected_cells is provided, only the rows for those (year, country) are generated.
+    """
+    conflicts = []
+    disasters = []
     figure_queryset = Figure.objects.filter(
         role=Figure.ROLE.RECOMMENDED
     )
-    for year in get_gidd_years():
+    for year in years:
+        year_figure_queryset = figure_queryset
+        if affected_cells is not None:
+            if not affected_cells.get(year):
+                continue
+            year_figure_queryset = figure_queryset.filter(country__in=affected_cells[year])
+
         # FIXME: Check if this should be
         # - Figure.filtered_nd_figures_for_listing
         # - Figure.filtered_idp_figures_for_listing
         nd_figure_qs = Figure.filtered_nd_figures(
-            qs=figure_queryset,
+            qs=year_figure_queryset,
             start_date=datetime.datetime(year=year, month=1, day=1),
             end_date=datetime.datetime(year=year, month=12, day=31),
         )
         stock_figure_qs = Figure.filtered_idp_figures(
-            qs=figure_queryset,
+            qs=year_figure_queryset,
             start_date=datetime.datetime(year=year, month=1, day=1),
             end_date=datetime.datetime(year=year, month=12, day=31),
         )
@@ -174,24 +250,21 @@ def update_conflict_and_disaster_data():
         conflict_figure_qs = conflict_nd_figure_qs | conflict_stock_figure_qs
         qs = annotate_conflict(Figure.objects.filter(id__in=conflict_figure_qs.values('id')), year)
 
-        # Create new conflict figures
-        Conflict.objects.bulk_create(
-            [
-                Conflict(
-                    country_id=figure['country'],
-                    total_displacement=figure['total_displacement'],
-                    new_displacement=figure['new_displacement'],
-                    total_displacement_rounded=round_and_remove_zero(
-                        figure['total_displacement']
-                    ),
-                    new_displacement_rounded=round_and_remove_zero(
-                        figure['new_displacement']
-                    ),
-                    year=figure['year'],
-                    iso3=figure['country__iso3'],
-                    country_name=figure['country__idmc_short_name'],
-                ) for figure in qs
-            ]
+        conflicts.extend(
+            Conflict(
+                country_id=figure['country'],
+                total_displacement=figure['total_displacement'],
+                new_displacement=figure['new_displacement'],
+                total_displacement_rounded=round_and_remove_zero(
+                    figure['total_displacement']
+                ),
+                new_displacement_rounded=round_and_remove_zero(
+                    figure['new_displacement']
+                ),
+                year=figure['year'],
+                iso3=figure['country__iso3'],
+                country_name=figure['country__idmc_short_name'],
+            ) for figure in qs
         )
 
         disaster_nd_figure_qs = nd_figure_qs.filter(event__event_type=Crisis.CRISIS_TYPE.DISASTER)
@@ -200,7 +273,7 @@ def update_conflict_and_disaster_data():
         disaster_qs = Figure.objects.filter(id__in=disaster_figures.values('id'))
 
         # Sync disaster data
-        disasters = disaster_qs.values(
+        disaster_data = disaster_qs.values(
             'event__id',
             'event__name',
             'event__disaster_category',
@@ -253,44 +326,118 @@ def update_conflict_and_disaster_data():
             year__gte=2016,
         )
 
-        Disaster.objects.bulk_create(
-            [
-                Disaster(
-                    event_id=item['event__id'],
-                    event_name=item['event__name'],
-                    year=item['year'],
-                    start_date=item['event__start_date'],
-                    start_date_accuracy=item['event__start_date_accuracy'],
-                    end_date=item['event__end_date'],
-                    end_date_accuracy=item['event__end_date_accuracy'],
-
-                    hazard_category_id=item['event__disaster_category'],
-                    hazard_sub_category_id=item['event__disaster_sub_category'],
-                    hazard_type_id=item['event__disaster_type'],
-                    hazard_sub_type_id=item['event__disaster_sub_type'],
-
-                    hazard_category_name=item['event__disaster_category__name'],
-                    hazard_sub_category_name=item['event__disaster_sub_category__name'],
-                    hazard_type_name=item['event__disaster_type__name'],
-                    hazard_sub_type_name=item['event__disaster_sub_type__name'],
-                    glide_numbers=item['event__glide_numbers'] or list(),
-
-                    new_displacement=item['new_displacement'],
-                    total_displacement=item['total_displacement'],
-                    new_displacement_rounded=round_and_remove_zero(
-                        item['new_displacement']
-                    ),
-                    total_displacement_rounded=round_and_remove_zero(
-                        item['total_displacement']
-                    ),
-                    iso3=item['country__iso3'],
-                    country_id=item['country'],
-                    country_name=item['country__idmc_short_name'],
-                    event_codes=get_attr_list_from_event_codes(item['event_codes'], 'code') or [],
-                    event_codes_type=get_attr_list_from_event_codes(item['event_codes'], 'code_type') or [],
-                ) for item in disasters
-            ]
+        disasters.extend(
+            Disaster(
+                event_id=item['event__id'],
+                event_name=item['event__name'],
+                year=item['year'],
+                start_date=item['event__start_date'],
+                start_date_accuracy=item['event__start_date_accuracy'],
+                end_date=item['event__end_date'],
+                end_date_accuracy=item['event__end_date_accuracy'],
+
+                hazard_category_id=item['event__disaster_category'],
+                hazard_sub_category_id=item['event__disaster_sub_category'],
+                hazard_type_id=item['event__disaster_type'],
+                hazard_sub_type_id=item['event__disaster_sub_type'],
+
+                hazard_category_name=item['event__disaster_category__name'],
+                hazard_sub_category_name=item['event__disaster_sub_category__name'],
+                hazard_type_name=item['event__disaster_type__name'],
+                hazard_sub_type_name=item['event__disaster_sub_type__name'],
+                glide_numbers=item['event__glide_numbers'] or list(),
+
+                new_displacement=item['new_displacement'],
+                total_displacement=item['total_displacement'],
+                new_displacement_rounded=round_and_remove_zero(
+                    item['new_displacement']
+                ),
+                total_displacement_rounded=round_and_remove_zero(
+                    item['total_displacement']
+                ),
+                iso3=item['country__iso3'],
+                country_id=item['country'],
+                country_name=item['country__idmc_short_name'],
+                event_codes=get_attr_list_from_event_codes(item['event_codes'], 'code') or [],
+                event_codes_type=get_attr_list_from_event_codes(item['event_codes'], 'code_type') or [],
+            ) for item in disaster_data
+        )
+    return conflicts, disasters
+
+
+def get_gidd_staging_table(model, log_id):
+    return f'{model._meta.db_table}_staging_{int(log_id)}'
+
+
+def get_gidd_staging_columns(model):
+    return [field for field in model._meta.concrete_fields if not field.primary_key]
+
+
+def create_gidd_staging_tables(log_id):
+    """
+    Create the tables where the per-year tasks save the generated rows (instead of passing them through celery)
+    """
+    with connection.cursor() as cursor:
+        for model in GIDD_STAGED_MODELS:
+            cursor.execute(
+                f'CREATE UNLOGGED TABLE IF NOT EXISTS {connection.ops.quote_name(get_gidd_staging_table(model, log_id))}'
+                f' (LIKE {connection.ops.quote_name(model._meta.db_table)} INCLUDING DEFAULTS)'
+            )
+
+
+def drop_gidd_staging_tables(log_id):
+    with connection.cursor() as cursor:
+        for model in GIDD_STAGED_MODELS:
+            cursor.execute(
+                f'DROP TABLE IF EXISTS {connection.ops.quote_name(get_gidd_staging_table(model, log_id))}'
+            )
+
+
+def save_gidd_staging_rows(log_id, model, instances, batch_size=2000) -> int:
+    """
+    Insert the generated (unsaved) rows into the staging table, returns the number of rows
+    """
+    fields = get_gidd_staging_columns(model)
+    columns = ', '.join(connection.ops.quote_name(field.column) for field in fields)
+    rows = [
+        [
+            field.get_db_prep_save(field.pre_save(instance, True), connection)
+            for field in fields
+        ]
+        for instance in instances
+    ]
+    with connection.cursor() as cursor:
+        execute_values(
+            cursor,
+            f'INSERT INTO {connection.ops.quote_name(get_gidd_staging_table(model, log_id))} ({columns}) VALUES %s',
+            rows,
+            page_size=batch_size,
         )
+    return len(rows)
+
+
+def swap_conflict_and_disaster_data(log_id, affected_cells: typing.Optional[AffectedCells] = None):
+    """
+    Replace the existing conflict and disaster rows with the staged ones.
+    NOTE: This should be called inside a transaction
+    """
+    if affected_cells is None:
+        Conflict.objects.all().delete()
+        Disaster.objects.all().delete()
+    else:
+        for year, country_ids in affected_cells.items():
+            Conflict.objects.filter(year=year, country__in=country_ids).delete()
+            Disaster.objects.filter(year=year, country__in=country_ids).delete()
+    with connection.cursor() as cursor:
+        for model in GIDD_STAGED_MODELS:
+            columns = ', '.join(
+                connection.ops.quote_name(field.column)
+                for field in get_gidd_staging_columns(model)
+            )
+            cursor.execute(
+                f'INSERT INTO {connection.ops.quote_name(model._meta.db_table)} ({columns})'
+                f' SELECT {columns} FROM {connection.ops.quote_name(get_gidd_staging_table(model, log_id))}'
+            )
 
 
 def update_public_figure_analysis():
@@ -374,92 +521,81 @@ def update_public_figure_analysis():
     PublicFigureAnalysis.objects.bulk_create(data)
 
 
-def update_displacement_data():
-    DisplacementData.objects.all().delete()
-    start_year = min(
-        Disaster.objects.order_by('year').first().year,
-        Conflict.objects.order_by('year').first().year
-    )
-    end_year = max(
-        Disaster.objects.order_by('-year').first().year,
-        Conflict.objects.order_by('-year').first().year
-    )
-
-    for year in range(start_year, end_year + 1):
-        displacement_data = Country.objects.annotate(
-            conflict_total_displacement=Subquery(
-                Conflict.objects.filter(
-                    year=year,
-                    country_id=OuterRef('pk'),
-                ).values('total_displacement')[:1]
-            ),
-            conflict_new_displacement=Subquery(
-                Conflict.objects.filter(
-                    year=year,
-                    country_id=OuterRef('pk'),
-                ).values('new_displacement')[:1]
-            ),
-            disaster_total_displacement=Subquery(
-                Disaster.objects.filter(
-                    year=year,
-                    country_id=OuterRef('pk'),
-                ).values('iso3').order_by().annotate(
-                    disaster_total_displacement=Sum('total_displacement')
-                ).values('disaster_total_displacement')[:1]
-            ),
-            disaster_new_displacement=Subquery(
-                Disaster.objects.filter(
-                    year=year,
-                    country_id=OuterRef('pk'),
-                ).values('iso3').order_by().annotate(
-                    disaster_new_displacement=Sum('new_displacement')
-                ).values('disaster_new_displacement')[:1]
-            ),
-            year=Value(year, output_field=IntegerField()),
-        ).filter(
-            Q(conflict_new_displacement__isnull=False) |
-            Q(conflict_total_displacement__isnull=False) |
-            Q(disaster_new_displacement__isnull=False) |
-            Q(disaster_total_displacement__isnull=False)
-        ).values(
-            'iso3',
-            'idmc_short_name',
-            'id',
-            'conflict_total_displacement',
-            'conflict_new_displacement',
-            'disaster_new_displacement',
-            'disaster_total_displacement',
-            'year',
+def update_displacement_data(affected_cells: typing.Optional[AffectedCells] = None):
+    """
+    Re-generate the displacement data using the conflict and disaster rows.
+    The conflict and disaster rows are aggregated by (year, country) once and joined here.
+    """
+    conflict_qs = Conflict.objects.all()
+    disaster_qs = Disaster.objects.all()
+    if affected_cells is None:
+        DisplacementData.objects.all().delete()
+    else:
+        cells_filter = Q(pk__in=[])
+        for year, country_ids in affected_cells.items():
+            cells_filter |= Q(year=year, country__in=country_ids)
+        DisplacementData.objects.filter(cells_filter).delete()
+        conflict_qs = conflict_qs.filter(cells_filter)
+        disaster_qs = disaster_qs.filter(cells_filter)
+
+    # (year, country) -> displacement data
+    displacement_data = defaultdict(dict)
+    for item in conflict_qs.values('year', 'country').order_by().annotate(
+        conflict_total_displacement=Sum('total_displacement'),
+        conflict_new_displacement=Sum('new_displacement'),
+    ):
+        displacement_data[(item['year'], item['country'])].update(
+            conflict_total_displacement=item['conflict_total_displacement'],
+            conflict_new_displacement=item['conflict_new_displacement'],
         )
-
-        DisplacementData.objects.bulk_create(
-            [
-                DisplacementData(
-                    iso3=item['iso3'],
-                    country_name=item['idmc_short_name'],
-                    country_id=item['id'],
-
-                    conflict_total_displacement=item['conflict_total_displacement'],
-                    conflict_new_displacement=item['conflict_new_displacement'],
-                    disaster_new_displacement=item['disaster_new_displacement'],
-                    disaster_total_displacement=item['disaster_total_displacement'],
-                    conflict_total_displacement_rounded=round_and_remove_zero(
-                        item['conflict_total_displacement']
-                    ),
-                    conflict_new_displacement_rounded=round_and_remove_zero(
-                        item['conflict_new_displacement']
-                    ),
-                    disaster_new_displacement_rounded=round_and_remove_zero(
-                        item['disaster_new_displacement']
-                    ),
-                    disaster_total_displacement_rounded=round_and_remove_zero(
-                        item['disaster_total_displacement']
-                    ),
-                    year=item['year'],
-                ) for item in displacement_data
-            ]
+    for item in disaster_qs.values('year', 'country').order_by().annotate(
+        disaster_total_displacement=Sum('total_displacement'),
+        disaster_new_displacement=Sum('new_displacement'),
+    ):
+        displacement_data[(item['year'], item['country'])].update(
+            disaster_total_displacement=item['disaster_total_displacement'],
+            disaster_new_displacement=item['disaster_new_displacement'],
         )
 
+    country_map = {
+        country['id']: country
+        for country in Country.objects.filter(
+            id__in={country_id for _, country_id in displacement_data.keys()}
+        ).values('id', 'iso3', 'idmc_short_name')
+    }
+
+    def _get_displacement_data_objects():
+        for (year, country_id), data in sorted(displacement_data.items()):
+            conflict_total_displacement = data.get('conflict_total_displacement')
+            conflict_new_displacement = data.get('conflict_new_displacement')
+            disaster_total_displacement = data.get('disaster_total_displacement')
+            disaster_new_displacement = data.get('disaster_new_displacement')
+            if (
+                conflict_total_displacement is None and
+                conflict_new_displacement is None and
+                disaster_total_displacement is None and
+                disaster_new_displacement is None
+            ):
+                continue
+            country = country_map[country_id]
+            yield DisplacementData(
+                iso3=country['iso3'],
+                country_name=country['idmc_short_name'],
+                country_id=country_id,
+
+                conflict_total_displacement=conflict_total_displacement,
+                conflict_new_displacement=conflict_new_displacement,
+                disaster_new_displacement=disaster_new_displacement,
+                disaster_total_displacement=disaster_total_displacement,
+                conflict_total_displacement_rounded=round_and_remove_zero(conflict_total_displacement),
+                conflict_new_displacement_rounded=round_and_remove_zero(conflict_new_displacement),
+                disaster_new_displacement_rounded=round_and_remove_zero(disaster_new_displacement),
+                disaster_total_displacement_rounded=round_and_remove_zero(disaster_total_displacement),
+                year=year,
+            )
+
+    DisplacementData.objects.bulk_create(_get_displacement_data_objects(), batch_size=2000)
+
 
 def update_idps_sadd_estimates_country_names():
     country_name_map = {
@@ -470,28 +606,152 @@ def update_idps_sadd_estimates_country_names():
         obj.save()
 
 
+def serialize_affected_cells(affected_cells: typing.Optional[AffectedCells]):
+    if affected_cells is None:
+        return None
+    return [[year, list(country_ids)] for year, country_ids in affected_cells.items()]
+
+
+def deserialize_affected_cells(affected_cells) -> typing.Optional[AffectedCells]:
+    if affected_cells is None:
+        return None
+    return {year: set(country_ids) for year, country_ids in affected_cells}
+
+
+def set_status_log_failed(log_id):
+    StatusLog.objects.filter(id=log_id).update(
+        status=StatusLog.Status.FAILED,
+        completed_at=timezone.now()
+    )
+
+
 @celery_app.task
-def update_gidd_data(log_id):
-    # Delete all the conflicts TODO: Find way to update records
-    Conflict.objects.all().delete()
+def generate_gidd_legacy_data(log_id):
+    with RuntimeProfile('generate_gidd_legacy_data'):
+        conflicts, disasters = get_gidd_legacy_data()
+        return (
+            save_gidd_staging_rows(log_id, Conflict, conflicts),
+            save_gidd_staging_rows(log_id, Disaster, disasters),
+        )
 
-    # Delete disasters
-    Disaster.objects.all().delete()
 
+@celery_app.task
+def generate_gidd_year_data(log_id, year, country_ids=None):
+    affected_cells = None
+    if country_ids is not None:
+        affected_cells = {year: set(country_ids)}
+    with RuntimeProfile(f'generate_gidd_year_data: {year}'):
+        conflicts, disasters = get_conflict_and_disaster_data([year], affected_cells=affected_cells)
+        return (
+            save_gidd_staging_rows(log_id, Conflict, conflicts),
+            save_gidd_staging_rows(log_id, Disaster, disasters),
+        )
+
+
+@celery_app.task
+def update_gidd_data_failed(log_id):
+    set_status_log_failed(log_id)
+    drop_gidd_staging_tables(log_id)
+    logger.error(f'Failed to generate GIDD data for status log: {log_id}')
+
+
+@celery_app.task
+def swap_gidd_data(results, log_id, affected_cells=None):
+    """
+    Swap the rows staged by the per-year tasks and update the data depending on them
+    results: (conflict count, disaster count) from each per-year task
+    """
+    affected_cells = deserialize_affected_cells(affected_cells)
     try:
-        update_gidd_legacy_data()
-        update_conflict_and_disaster_data()
-        update_public_figure_analysis()
-        update_displacement_data()
-        update_idps_sadd_estimates_country_names()
-        StatusLog.objects.filter(id=log_id).update(
-            status=StatusLog.Status.SUCCESS,
-            completed_at=timezone.now()
+        status_log = StatusLog.objects.get(id=log_id)
+        logger.info(
+            'Swapping GIDD data: '
+            f'conflicts={sum(count for count, _ in results)} disasters={sum(count for _, count in results)}'
         )
+        with RuntimeProfile('update_gidd_data_transaction'), transaction.atomic():
+            with RuntimeProfile('swap_conflict_and_disaster_data'):
+                swap_conflict_and_disaster_data(log_id, affected_cells=affected_cells)
+            with RuntimeProfile('update_public_figure_analysis'):
+                update_public_figure_analysis()
+            with RuntimeProfile('update_displacement_data'):
+                update_displacement_data(affected_cells=affected_cells)
+            with RuntimeProfile('update_idps_sadd_estimates_country_names'):
+                update_idps_sadd_estimates_country_names()
+            # NOTE: Cells recorded after the update is triggered are left for the next update
+            DirtyCell.objects.filter(created_at__lt=status_log.triggered_at).delete()
+            StatusLog.objects.filter(id=log_id).update(
+                status=StatusLog.Status.SUCCESS,
+                completed_at=timezone.now()
+            )
         logger.info('GIDD data updated.')
     except Exception as e:
-        StatusLog.objects.filter(id=log_id).update(
-            status=StatusLog.Status.FAILED,
-            completed_at=timezone.now()
-        )
+        set_status_log_failed(log_id)
+        logger.error('Failed update data: ' + str(e), exc_info=True)
+    else:
+        set_gidd_data_version()
+    finally:
+        drop_gidd_staging_tables(log_id)
+        transaction.on_commit(lambda: generate_gidd_export_files.delay(log_id))
+
+
+@celery_app.task
+def update_gidd_data(log_id, incremental=False):
+    """
+    Re-generate the GIDD data.
+
+    The rows for each year are generated in parallel by the workers (celery chord) into staging
+    tables, then swapped with the existing rows inside a single transaction, so the public APIs never
+    serve a partially generated dataset.
+    If incremental is provided, only the rows affected by the changes since the last successful
+    update are re-generated.
+    """
+    try:
+        years = list(get_gidd_years())
+        affected_cells = None
+        last_status_log = incremental and get_last_successful_status_log(exclude_log_id=log_id)
+        if last_status_log:
+            with RuntimeProfile('get_gidd_affected_cells'):
+                affected_cells = get_gidd_affected_cells(
+                    last_status_log.triggered_at,
+                    years,
+                    until=StatusLog.objects.get(id=log_id).triggered_at,
+                )
+            if affected_cells is None:
+                logger.info('GIDD report years changed, updating all GIDD data.')
+
+        if affected_cells is None:
+            header = [
+                generate_gidd_legacy_data.s(log_id),
+                *[generate_gidd_year_data.s(log_id, year) for year in years],
+            ]
+        else:
+            logger.info(f'Updating GIDD data for {sum(len(i) for i in affected_cells.values())} year/country.')
+            header = [
+                generate_gidd_year_data.s(log_id, year, list(country_ids))
+                for year, country_ids in affected_cells.items()
+            ]
+
+        # NOTE: The generated rows are staged in the database, only the counts are passed to the callback
+        create_gidd_staging_tables(log_id)
+        callback = swap_gidd_data.s(log_id, serialize_affected_cells(affected_cells))
+        if not header:
+            # NOTE: Nothing to re-generate, the dependent data are still updated
+            callback.delay([])
+            return
+        chord(header)(callback.on_error(update_gidd_data_failed.si(log_id)))
+    except Exception as e:
         logger.error('Failed update data: ' + str(e), exc_info=True)
+        update_gidd_data_failed(log_id)
+
+
+@celery_app.task
+def generate_gidd_export_files(log_id):
+    status_log = StatusLog.objects.filter(id=log_id, status=StatusLog.Status.SUCCESS).first()
+    if status_log is None:
+        return
+    try:
+        with RuntimeProfile('generate_gidd_export_files'):
+            generate_export_files(status_log)
+        logger.info('GIDD export files generated.')
+    except Exception:
+        logger.error('Failed to generate GIDD export files', exc_info=True)
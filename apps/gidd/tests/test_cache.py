@@ -0,0 +1,48 @@
+from unittest.mock import patch
+
+from helix.caches import external_api_cache
+from utils.tests import HelixTestCase, create_user_with_role
+from apps.users.enums import USER_ROLE
+from apps.gidd.models import StatusLog
+from apps.gidd.cache import (
+    GIDD_DATA_VERSION_KEY,
+    GIDD_DATA_VERSION_FALLBACK_TIMEOUT,
+    get_gidd_data_version,
+    set_gidd_data_version,
+)
+
+
+class TestGiddDataVersion(HelixTestCase):
+    def setUp(self):
+        super().setUp()
+        external_api_cache.clear()
+        self.admin = create_user_with_role(USER_ROLE.ADMIN.name)
+
+    def test_set_gidd_data_version(self):
+        initial_version = get_gidd_data_version()
+        # Cached version is used until it's set again
+        StatusLog.objects.create(triggered_by=self.admin, status=StatusLog.Status.SUCCESS)
+        self.assertEqual(initial_version, get_gidd_data_version())
+
+        set_gidd_data_version()
+        new_version = get_gidd_data_version()
+        self.assertNotEqual(initial_version['version'], new_version['version'])
+
+    def test_lazy_version_is_not_pinned(self):
+        # Version computed by a reader before the update is committed
+        stale_version = get_gidd_data_version()
+        assert external_api_cache.ttl(GIDD_DATA_VERSION_KEY) <= GIDD_DATA_VERSION_FALLBACK_TIMEOUT
+
+        StatusLog.objects.create(triggered_by=self.admin, status=StatusLog.Status.SUCCESS)
+        set_gidd_data_version()
+        new_version = get_gidd_data_version()
+        self.assertNotEqual(stale_version['version'], new_version['version'])
+        assert external_api_cache.ttl(GIDD_DATA_VERSION_KEY) > GIDD_DATA_VERSION_FALLBACK_TIMEOUT
+
+        # Lazily computed version doesn't override the version set after the update
+        external_api_cache.delete(GIDD_DATA_VERSION_KEY)
+        set_gidd_data_version()
+        with patch('apps.gidd.cache.external_api_cache.get', return_value=None):
+            with patch('apps.gidd.cache._get_gidd_data_version', return_value=stale_version):
+                get_gidd_data_version()
+        self.assertEqual(new_version, get_gidd_data_version())
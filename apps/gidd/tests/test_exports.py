@@ -0,0 +1,273 @@
+import csv
+import datetime
+import io
+
+from django.utils import timezone
+from openpyxl import load_workbook
+from rest_framework import status
+
+from utils.tests import HelixAPITestCase
+from utils.factories import (
+    ClientFactory,
+    CountryFactory,
+    DisasterSubTypeFactory,
+    EventFactory,
+)
+from apps.crisis.models import Crisis
+from apps.gidd.models import (
+    Disaster,
+    DisplacementData,
+    ExportFile,
+    IdpsSaddEstimate,
+    ReleaseMetadata,
+    StatusLog,
+)
+from apps.gidd.exports import (
+    DISASTER_EXPORT_HEADERS,
+    DISPLACEMENT_EXPORT_HEADERS,
+    CONFLICT_DISPLACEMENT_EXPORT_HEADERS,
+    IDPS_SADD_ESTIMATE_EXPORT_HEADERS,
+    delete_export_files,
+    generate_export_files,
+)
+
+
+class TestGiddExports(HelixAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.disaster_export_url = '/external-api/gidd/disasters/disaster-export/'
+        self.displacement_export_url = '/external-api/gidd/displacements/displacement-export/'
+        self.api_client = ClientFactory.create(code='random-code-1', is_active=True)
+
+        self.release_metadata = ReleaseMetadata.objects.create(
+            release_year=2022,
+            pre_release_year=2023,
+            modified_by=self.user,
+        )
+        self.status_log = StatusLog.objects.create(
+            triggered_by=self.user,
+            status=StatusLog.Status.SUCCESS,
+            completed_at=self.now_datetime,
+        )
+
+        self.country1 = CountryFactory.create(iso3='ABC', idmc_short_name='Country 1')
+        self.country2 = CountryFactory.create(iso3='DEF', idmc_short_name='Country 2')
+        for country, year, conflict_new_displacement, disaster_new_displacement in [
+            (self.country1, 2021, 1234, None),
+            (self.country2, 2022, None, 20),
+            # Not released yet
+            (self.country2, 2023, 30, 40),
+        ]:
+            DisplacementData.objects.create(
+                iso3=country.iso3,
+                country_name=country.idmc_short_name,
+                country=country,
+                year=year,
+                conflict_new_displacement=conflict_new_displacement,
+                conflict_new_displacement_rounded=conflict_new_displacement,
+                disaster_new_displacement=disaster_new_displacement,
+                disaster_new_displacement_rounded=disaster_new_displacement,
+            )
+
+        hazard_sub_type = DisasterSubTypeFactory.create()
+        hazard_type = hazard_sub_type.type
+        event = EventFactory.create(event_type=Crisis.CRISIS_TYPE.DISASTER)
+        for country, year, new_displacement in [
+            (self.country1, 2022, 1000),
+            (self.country2, 2022, 0),
+        ]:
+            Disaster.objects.create(
+                event=event,
+                event_name='Event 1',
+                year=year,
+                country=country,
+                iso3=country.iso3,
+                country_name=country.idmc_short_name,
+                hazard_category=hazard_type.disaster_sub_category.category,
+                hazard_sub_category=hazard_type.disaster_sub_category,
+                hazard_type=hazard_type,
+                hazard_sub_type=hazard_sub_type,
+                hazard_category_name='Weather related',
+                hazard_type_name='Flood',
+                hazard_sub_type_name='Riverine flood',
+                new_displacement=new_displacement,
+                new_displacement_rounded=new_displacement,
+                event_codes=['GLIDE-1'],
+                event_codes_type=['Glide Number'],
+            )
+
+        IdpsSaddEstimate.objects.create(
+            iso3=self.country1.iso3,
+            country_name=self.country1.idmc_short_name,
+            country=self.country1,
+            year=2021,
+            sex='Both',
+            cause=Crisis.CRISIS_TYPE.CONFLICT,
+            zero_to_one=10,
+        )
+
+    def _get(self, url, **params):
+        return self.client.get(url, data={'client_id': self.api_client.code, **params})
+
+    def _get_csv_rows(self, response):
+        assert response.status_code == status.HTTP_200_OK
+        assert response.streaming
+        assert response['Content-Type'] == 'text/csv'
+        content = b''.join(response.streaming_content).decode()
+        return list(csv.reader(io.StringIO(content)))
+
+    def _get_workbook(self, response):
+        assert response.status_code == status.HTTP_200_OK
+        assert response.streaming
+        return load_workbook(io.BytesIO(b''.join(response.streaming_content)), read_only=True)
+
+    def _get_sheet_rows(self, ws):
+        return [list(row) for row in ws.iter_rows(values_only=True)]
+
+    def test_disaster_export(self):
+        # CSV
+        response = self._get(self.disaster_export_url, export_format='csv')
+        self.assertEqual(
+            [
+                DISASTER_EXPORT_HEADERS,
+                [
+                    'ABC', self.country1.name, '2022', 'Event 1', '', '1000', '1000',
+                    'Weather related', 'Flood', 'Riverine flood', 'GLIDE-1:Glide Number',
+                ],
+            ],
+            self._get_csv_rows(response),
+        )
+
+        # XLSX
+        response = self._get(self.disaster_export_url)
+        wb = self._get_workbook(response)
+        self.assertEqual(['1_Disaster_Displacement_data', 'README'], wb.sheetnames)
+        self.assertEqual(
+            [
+                DISASTER_EXPORT_HEADERS,
+                [
+                    'ABC', self.country1.name, 2022, 'Event 1', None, 1000, 1000,
+                    'Weather related', 'Flood', 'Riverine flood', 'GLIDE-1:Glide Number',
+                ],
+            ],
+            self._get_sheet_rows(wb['1_Disaster_Displacement_data']),
+        )
+
+    def test_displacement_export(self):
+        # CSV only includes the displacement data
+        response = self._get(self.displacement_export_url, export_format='csv')
+        self.assertEqual(
+            [
+                DISPLACEMENT_EXPORT_HEADERS,
+                ['DEF', 'Country 2', '2022', '', '', '', '', '20', '20', '', ''],
+                ['ABC', 'Country 1', '2021', '', '', '1234', '1234', '', '', '', ''],
+            ],
+            self._get_csv_rows(response),
+        )
+        response = self._get(self.displacement_export_url, export_format='csv', cause='conflict')
+        self.assertEqual(
+            [
+                CONFLICT_DISPLACEMENT_EXPORT_HEADERS,
+                ['ABC', 'Country 1', '2021', '', '', '1234', '1234'],
+            ],
+            self._get_csv_rows(response),
+        )
+
+        # XLSX
+        response = self._get(self.displacement_export_url)
+        wb = self._get_workbook(response)
+        self.assertEqual(['1_Displacement_data', '2_IDPs_SADD_estimates', 'README'], wb.sheetnames)
+        self.assertEqual(
+            [
+                DISPLACEMENT_EXPORT_HEADERS,
+                ['DEF', 'Country 2', 2022, None, None, None, None, 20, 20, None, None],
+                ['ABC', 'Country 1', 2021, None, None, 1234, 1234, None, None, None, None],
+            ],
+            self._get_sheet_rows(wb['1_Displacement_data']),
+        )
+        self.assertEqual(
+            [
+                IDPS_SADD_ESTIMATE_EXPORT_HEADERS,
+                ['ABC', 'Country 1', 2021, 'Both', 'Conflict', 10, *[None] * 12],
+            ],
+            self._get_sheet_rows(wb['2_IDPs_SADD_estimates']),
+        )
+
+    def test_cached_export_files(self):
+        def _get_export_file_url(export_type, cause='', iso3=''):
+            export_file = ExportFile.objects.get(export_type=export_type, cause=cause, iso3=iso3)
+            return f'http://testserver{export_file.file.url}'
+
+        generate_export_files(self.status_log)
+        self.addCleanup(delete_export_files, ExportFile.objects.all())
+        self.assertEqual(
+            {
+                (ExportFile.ExportType.DISASTER, '', ''),
+                (ExportFile.ExportType.DISASTER, '', 'ABC'),
+                (ExportFile.ExportType.DISASTER, '', 'DEF'),
+                (ExportFile.ExportType.DISPLACEMENT, '', ''),
+                (ExportFile.ExportType.DISPLACEMENT, 'conflict', ''),
+                (ExportFile.ExportType.DISPLACEMENT, 'disaster', ''),
+                (ExportFile.ExportType.DISPLACEMENT, '', 'ABC'),
+                (ExportFile.ExportType.DISPLACEMENT, '', 'DEF'),
+            },
+            set(ExportFile.objects.values_list('export_type', 'cause', 'iso3')),
+        )
+
+        # Pre-generated variants are redirected to the file
+        for url, params, expected_url in [
+            (self.disaster_export_url, {}, _get_export_file_url(ExportFile.ExportType.DISASTER)),
+            (
+                self.disaster_export_url,
+                {'iso3__in': 'ABC'},
+                _get_export_file_url(ExportFile.ExportType.DISASTER, iso3='ABC'),
+            ),
+            (self.displacement_export_url, {}, _get_export_file_url(ExportFile.ExportType.DISPLACEMENT)),
+            (
+                self.displacement_export_url,
+                {'cause': 'conflict'},
+                _get_export_file_url(ExportFile.ExportType.DISPLACEMENT, cause='conflict'),
+            ),
+        ]:
+            response = self._get(url, **params)
+            assert response.status_code == status.HTTP_302_FOUND, params
+            assert response.url == expected_url
+
+        # Other query params are generated on request
+        for url, params in [
+            (self.disaster_export_url, {'iso3__in': 'ABC,DEF'}),
+            (self.disaster_export_url, {'start_year': 2022}),
+            (self.displacement_export_url, {'export_format': 'csv'}),
+            (self.displacement_export_url, {'cause': 'conflict', 'iso3__in': 'ABC'}),
+        ]:
+            response = self._get(url, **params)
+            assert response.status_code == status.HTTP_200_OK, params
+
+        # Files generated before the release metadata change are stale
+        timezone.now.return_value = self.now_datetime + datetime.timedelta(hours=1)
+        self.release_metadata.release_year = 2021
+        self.release_metadata.save()
+        response = self._get(self.displacement_export_url, export_format='csv')
+        self.assertEqual(
+            [
+                DISPLACEMENT_EXPORT_HEADERS,
+                ['ABC', 'Country 1', '2021', '', '', '1234', '1234', '', '', '', ''],
+            ],
+            self._get_csv_rows(response),
+        )
+        response = self._get(self.displacement_export_url)
+        assert response.status_code == status.HTTP_200_OK
+        wb = self._get_workbook(response)
+        self.assertEqual(
+            [
+                DISPLACEMENT_EXPORT_HEADERS,
+                ['ABC', 'Country 1', 2021, None, None, 1234, 1234, None, None, None, None],
+            ],
+            self._get_sheet_rows(wb['1_Displacement_data']),
+        )
+
+        # Re-generated files are used again
+        generate_export_files(self.status_log)
+        response = self._get(self.displacement_export_url)
+        assert response.status_code == status.HTTP_302_FOUND
+        assert response.url == _get_export_file_url(ExportFile.ExportType.DISPLACEMENT)
@@ -0,0 +1,149 @@
+from rest_framework import status
+
+from utils.tests import HelixAPITestCase
+from utils.factories import (
+    ClientFactory,
+    CountryFactory,
+    DisasterSubTypeFactory,
+    EventFactory,
+)
+from utils.keyset_pagination import encode_cursor
+from apps.crisis.models import Crisis
+from apps.gidd.models import Disaster, DisplacementData, ReleaseMetadata
+
+
+class TestGiddCursorPagination(HelixAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.disaster_url = '/external-api/gidd/disasters/'
+        self.displacement_url = '/external-api/gidd/displacements/'
+        self.api_client = ClientFactory.create(code='random-code-1', is_active=True)
+        ReleaseMetadata.objects.create(release_year=2022, pre_release_year=2023, modified_by=self.user)
+
+        # NOTE: Created in a different order than the cursor ordering (year, iso3, id)
+        countries = [
+            CountryFactory.create(iso3='GHI', idmc_short_name='Country 3'),
+            CountryFactory.create(iso3='ABC', idmc_short_name='Country 1'),
+            CountryFactory.create(iso3='DEF', idmc_short_name='Country 2'),
+        ]
+        hazard_sub_type = DisasterSubTypeFactory.create()
+        hazard_type = hazard_sub_type.type
+        event = EventFactory.create(event_type=Crisis.CRISIS_TYPE.DISASTER)
+        # NOTE: 2023 is not released yet
+        for year in [2023, 2022, 2021, 2020]:
+            for country in countries:
+                DisplacementData.objects.create(
+                    iso3=country.iso3,
+                    country_name=country.idmc_short_name,
+                    country=country,
+                    year=year,
+                )
+                # Multiple disaster events for a (year, country)
+                for index in range(2):
+                    Disaster.objects.create(
+                        event=event,
+                        event_name=f'Event {country.iso3}-{year}-{index}',
+                        year=year,
+                        country=country,
+                        iso3=country.iso3,
+                        country_name=country.idmc_short_name,
+                        hazard_category=hazard_type.disaster_sub_category.category,
+                        hazard_sub_category=hazard_type.disaster_sub_category,
+                        hazard_type=hazard_type,
+                        hazard_sub_type=hazard_sub_type,
+                    )
+
+    def _get(self, url, **params):
+        return self.client.get(url, data={'client_id': self.api_client.code, **params})
+
+    def _walk_cursor_pages(self, url, limit, **params):
+        """
+        Returns the results of each page by following the next links from the first page
+        """
+        pages = []
+        response = self._get(url, cursor='', limit=limit, **params)
+        while True:
+            assert response.status_code == status.HTTP_200_OK
+            content = response.json()
+            # NOTE: Count is not calculated for the cursor pages
+            assert 'count' not in content
+            assert content['previous'] is None
+            pages.append(content['results'])
+            if content['next'] is None:
+                break
+            assert len(pages) <= 20, 'Cursor pagination did not end'
+            response = self.client.get(content['next'])
+        return pages
+
+    def test_disaster_cursor_pagination(self):
+        expected = [
+            (year, iso3, event_name)
+            for year, iso3, event_name in Disaster.objects.filter(
+                year__lte=2022,
+            ).order_by('year', 'iso3', 'id').values_list('year', 'iso3', 'event_name')
+        ]
+        assert len(expected) == 18
+
+        pages = self._walk_cursor_pages(self.disaster_url, 4)
+        self.assertEqual([4, 4, 4, 4, 2], [len(page) for page in pages])
+        self.assertEqual(
+            expected,
+            [
+                (item['year'], item['iso3'], item['event_name'])
+                for page in pages
+                for item in page
+            ],
+        )
+
+        # Same as the limit/offset pagination
+        response = self._get(self.disaster_url, limit=100)
+        assert response.status_code == status.HTTP_200_OK
+        content = response.json()
+        self.assertEqual(18, content['count'])
+        self.assertEqual(
+            expected,
+            [(item['year'], item['iso3'], item['event_name']) for item in content['results']],
+        )
+
+    def test_displacement_cursor_pagination(self):
+        expected = [
+            (year, iso3)
+            for year in [2020, 2021, 2022]
+            for iso3 in ['ABC', 'DEF', 'GHI']
+        ]
+        # Last page is full, but there is no next link for it
+        pages = self._walk_cursor_pages(self.displacement_url, 3)
+        self.assertEqual([3, 3, 3], [len(page) for page in pages])
+        self.assertEqual(
+            expected,
+            [
+                (item['year'], item['iso3'])
+                for page in pages
+                for item in page
+            ],
+        )
+
+        # Filters are applied to the cursor pages
+        pages = self._walk_cursor_pages(self.displacement_url, 2, iso3__in='ABC')
+        self.assertEqual(
+            [(2020, 'ABC'), (2021, 'ABC'), (2022, 'ABC')],
+            [
+                (item['year'], item['iso3'])
+                for page in pages
+                for item in page
+            ],
+        )
+
+    def test_invalid_cursor(self):
+        for url in [self.disaster_url, self.displacement_url]:
+            for cursor in [
+                'invalid-cursor',
+                # Valid base64 but not a json list
+                encode_cursor({'year': 2020}),
+                # Missing the ordering fields
+                encode_cursor([2020]),
+                # Invalid value for the field
+                encode_cursor(['year', 'ABC', 1]),
+            ]:
+                response = self._get(url, cursor=cursor)
+                assert response.status_code == status.HTTP_404_NOT_FOUND, (url, cursor)
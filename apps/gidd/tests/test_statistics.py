@@ -0,0 +1,163 @@
+from django.db import models
+from django.db.models.functions import Coalesce
+
+from utils.tests import HelixTestCase, create_user_with_role
+from utils.factories import (
+    CountryFactory,
+    DisasterSubTypeFactory,
+    EventFactory,
+)
+from apps.users.enums import USER_ROLE
+from apps.crisis.models import Crisis
+from apps.gidd.models import Conflict, Disaster, ReleaseMetadata
+from apps.gidd.filters import ConflictStatisticsFilter, DisasterStatisticsFilter
+from apps.gidd.schema import aggregate_statistics
+
+
+def get_previous_statistics(filterset_class, start_year, end_year):
+    """
+    Statistics using the separate queries of the resolvers before aggregate_statistics
+    """
+    year_range_qs = filterset_class(data=dict(start_year=start_year, end_year=end_year)).qs
+    nd_filters = dict(new_displacement__gt=0)
+    idps_filters = dict(total_displacement__gt=0)
+    if start_year:
+        nd_filters['year__gte'] = start_year
+    if end_year:
+        nd_filters['year__lte'] = end_year
+        idps_filters['year__gte'] = end_year
+        idps_filters['year__lte'] = end_year
+    nd_qs = filterset_class(data=dict()).qs.filter(**nd_filters)
+    idps_qs = filterset_class(data=dict()).qs.filter(**idps_filters)
+
+    def _get_total(qs, field):
+        return qs.aggregate(
+            total=Coalesce(models.Sum(field, output_field=models.IntegerField()), 0)
+        )['total']
+
+    def _get_timeseries_by_year(field):
+        return {
+            item['year']: item['total']
+            for item in year_range_qs.filter(**{f'{field}__gt': 0}).values('year').annotate(
+                total=Coalesce(models.Sum(field, output_field=models.IntegerField()), 0)
+            ).order_by('year').values('year', 'total')
+        }
+
+    def _get_timeseries_by_country(field):
+        return sorted(
+            (item['year'], item['iso3'], item['total'])
+            for item in year_range_qs.filter(**{f'{field}__gt': 0}).values('year').annotate(
+                total=Coalesce(models.Sum(field, output_field=models.IntegerField()), 0)
+            ).order_by('year').values('year', 'total', 'country_id', 'country_name', 'iso3')
+        )
+
+    return dict(
+        new_displacements=_get_total(nd_qs, 'new_displacement'),
+        new_displacement_count=nd_qs.count(),
+        total_displacements=_get_total(idps_qs, 'total_displacement'),
+        internal_displacement_countries=set(nd_qs.values_list('iso3', flat=True)),
+        total_displacement_countries=set(idps_qs.values_list('iso3', flat=True)),
+        new_displacement_timeseries_by_year=_get_timeseries_by_year('new_displacement'),
+        new_displacement_timeseries_by_country=_get_timeseries_by_country('new_displacement'),
+        total_displacement_timeseries_by_year=_get_timeseries_by_year('total_displacement'),
+        total_displacement_timeseries_by_country=_get_timeseries_by_country('total_displacement'),
+    )
+
+
+def get_statistics(filterset_class, start_year, end_year):
+    statistics = aggregate_statistics(filterset_class(data=dict()).qs, start_year, end_year)
+    return {
+        **statistics,
+        'new_displacement_timeseries_by_year': dict(statistics['new_displacement_timeseries_by_year']),
+        'new_displacement_timeseries_by_country': sorted(
+            (item['year'], item['country']['iso3'], item['total'])
+            for item in statistics['new_displacement_timeseries_by_country']
+        ),
+        'total_displacement_timeseries_by_year': dict(statistics['total_displacement_timeseries_by_year']),
+        'total_displacement_timeseries_by_country': sorted(
+            (item['year'], item['country']['iso3'], item['total'])
+            for item in statistics['total_displacement_timeseries_by_country']
+        ),
+    }
+
+
+class TestGiddStatistics(HelixTestCase):
+    def setUp(self):
+        super().setUp()
+        admin = create_user_with_role(USER_ROLE.ADMIN.name)
+        ReleaseMetadata.objects.create(release_year=2022, pre_release_year=2023, modified_by=admin)
+        self.country1 = CountryFactory.create(iso3='ABC', idmc_short_name='Country 1')
+        self.country2 = CountryFactory.create(iso3='DEF', idmc_short_name='Country 2')
+        self.country3 = CountryFactory.create(iso3='GHI', idmc_short_name='Country 3')
+
+        hazard_sub_type = DisasterSubTypeFactory.create()
+        hazard_type = hazard_sub_type.type
+        event1, event2 = EventFactory.create_batch(2, event_type=Crisis.CRISIS_TYPE.DISASTER)
+        # (country, year, new_displacement, total_displacement)
+        data = [
+            (self.country1, 2019, 100, 10),
+            (self.country1, 2020, 200, None),
+            (self.country1, 2021, 0, 30),
+            (self.country1, 2022, 400, 40),
+            (self.country2, 2020, None, 50),
+            (self.country2, 2021, 600, 60),
+            (self.country2, 2022, 700, 0),
+            (self.country3, 2021, 800, 80),
+            # Not released yet
+            (self.country3, 2023, 900, 90),
+        ]
+        for country, year, new_displacement, total_displacement in data:
+            Conflict.objects.create(
+                country=country,
+                iso3=country.iso3,
+                country_name=country.idmc_short_name,
+                year=year,
+                new_displacement=new_displacement,
+                total_displacement=total_displacement,
+            )
+            # Multiple disaster events for a (year, country)
+            for event in [event1, event2]:
+                Disaster.objects.create(
+                    event=event,
+                    event_name=event.name,
+                    year=year,
+                    country=country,
+                    iso3=country.iso3,
+                    country_name=country.idmc_short_name,
+                    hazard_category=hazard_type.disaster_sub_category.category,
+                    hazard_sub_category=hazard_type.disaster_sub_category,
+                    hazard_type=hazard_type,
+                    hazard_sub_type=hazard_sub_type,
+                    new_displacement=new_displacement,
+                    total_displacement=total_displacement,
+                )
+
+    def test_aggregate_statistics(self):
+        for filterset_class in [ConflictStatisticsFilter, DisasterStatisticsFilter]:
+            for start_year, end_year in [
+                (None, None),
+                (2020, None),
+                (None, 2021),
+                (2020, 2021),
+                (2021, 2021),
+                # IDPs of the end year are used even if the end year is before the start year
+                (2022, 2020),
+            ]:
+                with self.assertNumQueries(2):
+                    # NOTE: ReleaseMetadata and the grouped rows
+                    statistics = get_statistics(filterset_class, start_year, end_year)
+                self.assertEqual(
+                    get_previous_statistics(filterset_class, start_year, end_year),
+                    statistics,
+                    (filterset_class, start_year, end_year),
+                )
+
+    def test_aggregate_statistics_values(self):
+        statistics = get_statistics(ConflictStatisticsFilter, 2020, 2021)
+        self.assertEqual(1600, statistics['new_displacements'])
+        self.assertEqual(3, statistics['new_displacement_count'])
+        self.assertEqual(170, statistics['total_displacements'])
+        self.assertEqual({'ABC', 'DEF', 'GHI'}, statistics['internal_displacement_countries'])
+        self.assertEqual({'ABC', 'DEF', 'GHI'}, statistics['total_displacement_countries'])
+        self.assertEqual({2020: 200, 2021: 1400}, statistics['new_displacement_timeseries_by_year'])
+        self.assertEqual({2020: 50, 2021: 170}, statistics['total_displacement_timeseries_by_year'])
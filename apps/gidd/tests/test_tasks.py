@@ -0,0 +1,261 @@
+import datetime
+from unittest.mock import patch
+
+from django.db import connection
+
+from utils.tests import HelixTestCase, create_user_with_role
+from utils.factories import (
+    CountryFactory,
+    EntryFactory,
+    EventFactory,
+    FigureFactory,
+    ReportFactory,
+)
+from apps.users.enums import USER_ROLE
+from apps.crisis.models import Crisis
+from apps.entry.models import Figure
+from apps.gidd.models import StatusLog, Disaster, Conflict, DirtyCell, DisplacementData
+from apps.gidd.tasks import (
+    GIDD_STAGED_MODELS,
+    get_gidd_affected_cells,
+    get_gidd_staging_table,
+    update_displacement_data,
+    update_gidd_data,
+)
+
+
+@patch('apps.gidd.tasks.generate_gidd_export_files.delay')
+class TestUpdateGiddData(HelixTestCase):
+    def setUp(self):
+        super().setUp()
+        self.admin = create_user_with_role(USER_ROLE.ADMIN.name)
+        self.report = ReportFactory.create(
+            created_by=self.admin,
+            is_gidd_report=True,
+            gidd_report_year=2022,
+            filter_figure_start_after=datetime.date(2022, 1, 1),
+            filter_figure_end_before=datetime.date(2022, 12, 31),
+        )
+        self.country1 = CountryFactory.create(iso3='ABC', idmc_short_name='Country 1')
+        self.country2 = CountryFactory.create(iso3='DEF', idmc_short_name='Country 2')
+        self.event1 = EventFactory.create(event_type=Crisis.CRISIS_TYPE.DISASTER, countries=[self.country1])
+        self.event2 = EventFactory.create(event_type=Crisis.CRISIS_TYPE.DISASTER, countries=[self.country2])
+        self.conflict_event = EventFactory.create(event_type=Crisis.CRISIS_TYPE.CONFLICT, countries=[self.country1])
+        entry = EntryFactory.create(created_by=self.admin)
+        self.figure_kwargs = dict(
+            entry=entry,
+            role=Figure.ROLE.RECOMMENDED,
+            category=Figure.FIGURE_CATEGORY_TYPES.NEW_DISPLACEMENT,
+            start_date=datetime.date(2022, 3, 1),
+            end_date=datetime.date(2022, 3, 10),
+        )
+        self.figure1 = FigureFactory.create(
+            **self.figure_kwargs,
+            event=self.event1,
+            country=self.country1,
+            figure_cause=Crisis.CRISIS_TYPE.DISASTER,
+            total_figures=100,
+        )
+        self.figure2 = FigureFactory.create(
+            **self.figure_kwargs,
+            event=self.event2,
+            country=self.country2,
+            figure_cause=Crisis.CRISIS_TYPE.DISASTER,
+            total_figures=200,
+        )
+        self.conflict_figure = FigureFactory.create(
+            **self.figure_kwargs,
+            event=self.conflict_event,
+            country=self.country1,
+            figure_cause=Crisis.CRISIS_TYPE.CONFLICT,
+            total_figures=300,
+        )
+
+    def _update_gidd_data(self, **kwargs):
+        status_log = StatusLog.objects.create(triggered_by=self.admin)
+        update_gidd_data(status_log.pk, **kwargs)
+        status_log.refresh_from_db()
+        return status_log
+
+    def assertStagingTablesDropped(self, status_log):
+        table_names = connection.introspection.table_names()
+        for model in GIDD_STAGED_MODELS:
+            assert get_gidd_staging_table(model, status_log.pk) not in table_names
+
+    def test_update_gidd_data(self, *_):
+        status_log = self._update_gidd_data()
+        self.assertEqual(StatusLog.Status.SUCCESS, status_log.status)
+        self.assertStagingTablesDropped(status_log)
+        self.assertEqual(
+            [
+                (2022, self.country1.pk, self.event1.pk, 100),
+                (2022, self.country2.pk, self.event2.pk, 200),
+            ],
+            list(
+                Disaster.objects.order_by('country_id').values_list('year', 'country_id', 'event_id', 'new_displacement')
+            ),
+        )
+        self.assertEqual(
+            [(2022, self.country1.pk, 300)],
+            list(Conflict.objects.values_list('year', 'country_id', 'new_displacement')),
+        )
+        self.assertEqual(
+            [
+                (self.country1.pk, 300, 100),
+                (self.country2.pk, None, 200),
+            ],
+            list(
+                DisplacementData.objects.order_by('country_id').values_list(
+                    'country_id', 'conflict_new_displacement', 'disaster_new_displacement',
+                )
+            ),
+        )
+
+    def test_update_gidd_data_failed(self, *_):
+        self._update_gidd_data()
+        existing_disaster_ids = set(Disaster.objects.values_list('id', flat=True))
+
+        with patch('apps.gidd.tasks.get_conflict_and_disaster_data', side_effect=Exception('Random error')):
+            status_log = self._update_gidd_data()
+        self.assertEqual(StatusLog.Status.FAILED, status_log.status)
+        self.assertStagingTablesDropped(status_log)
+        # Existing data is kept
+        self.assertEqual(existing_disaster_ids, set(Disaster.objects.values_list('id', flat=True)))
+
+    def test_get_gidd_affected_cells(self, *_):
+        status_log = self._update_gidd_data()
+        self.assertEqual({}, get_gidd_affected_cells(status_log.triggered_at, [2022]))
+
+        self.figure1.save()
+        self.assertEqual({2022: {self.country1.pk}}, get_gidd_affected_cells(status_log.triggered_at, [2022]))
+        # Figures outside the GIDD years are ignored
+        self.assertEqual({}, get_gidd_affected_cells(status_log.triggered_at, [2021]))
+
+        # GIDD report changes require a full update
+        self.report.save()
+        self.assertIsNone(get_gidd_affected_cells(status_log.triggered_at, [2022]))
+
+    def test_update_gidd_data_incremental(self, *_):
+        def _get_disasters():
+            return {
+                country_id: (disaster_id, new_displacement)
+                for disaster_id, country_id, new_displacement in Disaster.objects.values_list(
+                    'id', 'country_id', 'new_displacement',
+                )
+            }
+
+        self._update_gidd_data()
+        disasters = _get_disasters()
+
+        # Only the (year, country) cell of the changed figure is re-generated
+        self.figure1.total_figures = 150
+        self.figure1.save()
+        status_log = self._update_gidd_data(incremental=True)
+        self.assertEqual(StatusLog.Status.SUCCESS, status_log.status)
+        self.assertStagingTablesDropped(status_log)
+        new_disasters = _get_disasters()
+        self.assertEqual(disasters[self.country2.pk], new_disasters[self.country2.pk])
+        self.assertNotEqual(disasters[self.country1.pk][0], new_disasters[self.country1.pk][0])
+        self.assertEqual(150, new_disasters[self.country1.pk][1])
+        self.assertEqual(
+            150,
+            DisplacementData.objects.get(year=2022, country=self.country1).disaster_new_displacement,
+        )
+        # Conflict rows of the cell are re-generated too
+        self.assertEqual(1, Conflict.objects.filter(year=2022, country=self.country1).count())
+
+        # Report change re-generates everything
+        disasters = new_disasters
+        self.report.save()
+        self._update_gidd_data(incremental=True)
+        new_disasters = _get_disasters()
+        for country in [self.country1, self.country2]:
+            self.assertNotEqual(disasters[country.pk][0], new_disasters[country.pk][0])
+            self.assertEqual(disasters[country.pk][1], new_disasters[country.pk][1])
+
+    def test_update_gidd_data_incremental_removed_figures(self, *_):
+        self._update_gidd_data()
+
+        # Deleted figure
+        self.figure2.delete()
+        # Conflict figure moved to another country
+        self.conflict_figure.country = self.country2
+        self.conflict_figure.save()
+        self.assertEqual(
+            {2022: {self.country1.pk, self.country2.pk}},
+            get_gidd_affected_cells(StatusLog.objects.get().triggered_at, [2022]),
+        )
+
+        status_log = self._update_gidd_data(incremental=True)
+        self.assertEqual(StatusLog.Status.SUCCESS, status_log.status)
+        self.assertEqual(
+            [(2022, self.country1.pk, self.event1.pk, 100)],
+            list(Disaster.objects.values_list('year', 'country_id', 'event_id', 'new_displacement')),
+        )
+        self.assertEqual(
+            [(2022, self.country2.pk, 300)],
+            list(Conflict.objects.values_list('year', 'country_id', 'new_displacement')),
+        )
+        self.assertEqual(
+            [
+                (self.country1.pk, None, 100),
+                (self.country2.pk, 300, None),
+            ],
+            list(
+                DisplacementData.objects.order_by('country_id').values_list(
+                    'country_id', 'conflict_new_displacement', 'disaster_new_displacement',
+                )
+            ),
+        )
+        # Dirty cells are cleared after the update
+        self.assertFalse(DirtyCell.objects.exists())
+        self.assertEqual({}, get_gidd_affected_cells(status_log.triggered_at, [2022]))
+
+    def test_update_displacement_data(self, *_):
+        def _get_displacement_data():
+            return list(
+                DisplacementData.objects.order_by('year', 'country_id').values_list(
+                    'year',
+                    'country_id',
+                    'conflict_new_displacement',
+                    'conflict_total_displacement',
+                    'disaster_new_displacement',
+                    'conflict_new_displacement_rounded',
+                )
+            )
+
+        self._update_gidd_data()
+        Conflict.objects.update(total_displacement=20)
+        # Conflict rows of the same (year, country) are summed like the disaster rows
+        Conflict.objects.create(
+            country=self.country1, iso3='XYZ', country_name='Country',
+            year=2022, new_displacement=355, total_displacement=10,
+        )
+        # (year, country) without any displacement is skipped
+        Conflict.objects.create(
+            country=self.country2, iso3='XYZ', country_name='Country',
+            year=2021,
+        )
+        update_displacement_data()
+        self.assertEqual(
+            [
+                (2022, self.country1.pk, 655, 30, 100, 660),
+                (2022, self.country2.pk, None, None, 200, None),
+            ],
+            _get_displacement_data(),
+        )
+
+        # Only the affected (year, country) cells are re-generated
+        Conflict.objects.filter(country=self.country1).update(new_displacement=1)
+        Conflict.objects.create(
+            country=self.country2, iso3='XYZ', country_name='Country',
+            year=2022, new_displacement=40,
+        )
+        update_displacement_data(affected_cells={2022: {self.country2.pk}})
+        self.assertEqual(
+            [
+                (2022, self.country1.pk, 655, 30, 100, 660),
+                (2022, self.country2.pk, 40, None, 200, 40),
+            ],
+            _get_displacement_data(),
+        )
@@ -115,9 +115,9 @@ class ReportFilter(df.FilterSet):
             user = self.request.user
             return super().qs.filter(
                 Q(is_public=True) | Q(is_public=False, created_by=user)
-            )
+            ).select_related('figure_aggregation')
 
-        return super().qs.distinct()
+        return super().qs.distinct().select_related('figure_aggregation')
 
 
 class DummyFilter(df.FilterSet):
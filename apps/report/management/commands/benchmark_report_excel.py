@@ -0,0 +1,53 @@
+import os
+import time
+import tracemalloc
+from django.core.management.base import BaseCommand
+
+from apps.report.models import Report
+from apps.report.tasks import generate_excel_file
+from apps.report.utils import report_get_excel_sheets_data
+from utils.common import get_temp_file
+
+
+class Command(BaseCommand):
+
+    help = "Benchmark the report workbook generation (time, peak memory and file size)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('report_id', type=int)
+        parser.add_argument('--include-history', action='store_true')
+
+    @staticmethod
+    def evaluate(sheet_data):
+        # NOTE: evaluate the querysets here so that only the workbook generation is measured below
+        aggregation = sheet_data.get('aggregation')
+        return {
+            **sheet_data,
+            'data': list(sheet_data['data']),
+            **({'aggregation': {**aggregation, 'data': list(aggregation['data'])}} if aggregation else {}),
+        }
+
+    def handle(self, *args, **kwargs):
+        report = Report.objects.get(id=kwargs['report_id'])
+
+        start = time.time()
+        excel_sheet_data = [
+            (sheet_name, self.evaluate(sheet_data))
+            for sheet_name, sheet_data in report_get_excel_sheets_data(report, kwargs['include_history']).items()
+        ]
+        rows = sum(len(sheet_data['data']) for _, sheet_data in excel_sheet_data)
+        self.stdout.write(f'Sheet data: sheets={len(excel_sheet_data)} rows={rows} runtime={time.time() - start:.3f}s')
+
+        tracemalloc.start()
+        start = time.time()
+        workbook = generate_excel_file(excel_sheet_data)
+        with get_temp_file() as tmp:
+            workbook.save(tmp.name)
+            workbook.close()
+            size = os.path.getsize(tmp.name)
+        runtime = time.time() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        self.stdout.write(
+            f'Workbook: runtime={runtime:.3f}s peak_memory={peak / 1024 / 1024:.2f}MB size={size / 1024:.1f}KB'
+        )
@@ -0,0 +1,29 @@
+# Generated by Django 3.2 on 2024-03-21 10:04
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('report', '0058_auto_20231208_1142'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReportFigureAggregation',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('version', models.CharField(max_length=255, verbose_name='Version')),
+                ('total_stock_conflict_sum', models.BigIntegerField(null=True, verbose_name='Total stock conflict')),
+                ('total_flow_conflict_sum', models.BigIntegerField(null=True, verbose_name='Total flow conflict')),
+                ('total_flow_disaster_sum', models.BigIntegerField(null=True, verbose_name='Total flow disaster')),
+                ('total_stock_disaster_sum', models.BigIntegerField(null=True, verbose_name='Total stock disaster')),
+                ('total_flow_sum', models.BigIntegerField(null=True, verbose_name='Total flow')),
+                ('total_stock_sum', models.BigIntegerField(null=True, verbose_name='Total stock')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Updated at')),
+                ('report', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='figure_aggregation', to='report.report', verbose_name='Report')),
+            ],
+        ),
+    ]
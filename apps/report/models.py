@@ -1,6 +1,7 @@
 from collections import OrderedDict
 from functools import cached_property
 import logging
+import typing
 from uuid import uuid4
 
 from django.contrib.auth import get_user_model
@@ -21,7 +22,8 @@ from django.utils import timezone
 from django_enumfield import enum
 from django.contrib.postgres.aggregates.general import StringAgg
 
-from utils.common import get_string_from_list
+from utils.common import get_string_from_list, get_figure_data_version
+from utils.db import upsert
 from apps.contrib.models import MetaInformationArchiveAbstractModel
 from apps.crisis.models import Crisis
 from apps.entry.models import (
@@ -234,7 +236,7 @@ class Report(MetaInformationArchiveAbstractModel,
             filter_figure_end_before='End date',
             filter_figure_categories="Figure category",
             total_figures='Masterfact figures',
-            # these are calculated in transformer ref: heavy
+            # these are read from the materialized ReportFigureAggregation
             total_flow_conflict_sum='ND conflict',
             total_flow_disaster_sum='ND disaster',
             total_stock_conflict_sum='IDPs conflict',
@@ -248,15 +250,20 @@ class Report(MetaInformationArchiveAbstractModel,
             gidd_published_date='Date of data publication in GIDD',
             is_pfa_published_in_gidd='Is public figure analysis published in GIDD'
         )
-        data = ReportFilter(
+        reports_qs = ReportFilter(
             data=filters,
             request=DummyRequest(user=User.objects.get(id=user_id)),
-        ).qs.annotate(
+        ).qs
+        # NOTE: Only the stale aggregations are re-calculated here
+        cls.refresh_figure_aggregations(reports_qs)
+        data = reports_qs.annotate(
+            total_flow_conflict_sum=F('figure_aggregation__total_flow_conflict_sum'),
+            total_flow_disaster_sum=F('figure_aggregation__total_flow_disaster_sum'),
+            total_stock_conflict_sum=F('figure_aggregation__total_stock_conflict_sum'),
+            total_stock_disaster_sum=F('figure_aggregation__total_stock_disaster_sum'),
+            total_flow_sum=F('figure_aggregation__total_flow_sum'),
+            total_stock_sum=F('figure_aggregation__total_stock_sum'),
             # placeholder
-            total_flow_conflict_sum=Value(0, output_field=models.IntegerField()),
-            total_flow_disaster_sum=Value(0, output_field=models.IntegerField()),
-            total_stock_conflict_sum=Value(0, output_field=models.IntegerField()),
-            total_stock_disaster_sum=Value(0, output_field=models.IntegerField()),
             remarks=Value('', output_field=models.CharField()),
             iso3=StringAgg(
                 'filter_figure_countries__iso3', EXTERNAL_ARRAY_SEPARATOR,
@@ -270,13 +277,14 @@ class Report(MetaInformationArchiveAbstractModel,
             return ''
 
         def transformer(datum):
-            total_disaggregation = Report.objects.get(id=datum['id']).total_disaggregation
             return {
                 **datum,
-                # ref: heavy
-                # NOTE: there must be a better way
-                **total_disaggregation,
-                'remarks': Report.objects.get(id=datum['id']).generate_remarks_for_report,
+                'remarks': cls.get_remarks(
+                    datum['total_figures'],
+                    datum['filter_figure_categories'],
+                    datum['total_flow_sum'],
+                    datum['total_stock_sum'],
+                ),
                 'filter_figure_categories': transform_filter_figure_category(datum['filter_figure_categories']),
 
                 'is_pfa_published_in_gidd': 'Yes' if datum['is_pfa_published_in_gidd'] else 'No',
@@ -284,7 +292,7 @@ class Report(MetaInformationArchiveAbstractModel,
 
         return {
             'headers': headers,
-            'data': data.values(*[header for header in headers.keys()]),
+            'data': data.values(*[header for header in headers.keys()], 'total_flow_sum', 'total_stock_sum'),
             'formulae': None,
             'transformer': transformer,
         }
@@ -293,8 +301,7 @@ class Report(MetaInformationArchiveAbstractModel,
     def report_figures(self):
         return self.extract_report_figures
 
-    @property
-    def total_disaggregation(self) -> dict:
+    def calculate_total_disaggregation(self) -> dict:
         return self.report_figures.annotate(
             **self.TOTAL_FIGURE_DISAGGREGATIONS,
         ).aggregate(
@@ -306,24 +313,75 @@ class Report(MetaInformationArchiveAbstractModel,
             total_stock_sum=Sum('total_stock'),
         )
 
+    def get_figure_aggregation_version(self) -> str:
+        """
+        The aggregation is stale if the report filters, the figures within its countries
+        or the date (for open reports) changes
+        """
+        return ':'.join([
+            self.modified_at.isoformat(),
+            get_figure_data_version(self.figure_data_country_ids),
+            # NOTE: stock figures are calculated using today's date if end date is not defined
+            '' if self.filter_figure_end_before else str(timezone.now().date()),
+        ])
+
+    def get_figure_aggregation(self) -> typing.Optional['ReportFigureAggregation']:
+        """
+        Returns the materialized aggregation if it's up to date
+        """
+        figure_aggregation = getattr(self, 'figure_aggregation', None)
+        if figure_aggregation is not None and figure_aggregation.version == self.get_figure_aggregation_version():
+            return figure_aggregation
+        return None
+
+    def refresh_figure_aggregation(self) -> 'ReportFigureAggregation':
+        version = self.get_figure_aggregation_version()
+        self.figure_aggregation = upsert(
+            ReportFigureAggregation,
+            ['report'],
+            report=self,
+            version=version,
+            **self.calculate_total_disaggregation(),
+        )
+        return self.figure_aggregation
+
+    @classmethod
+    def refresh_figure_aggregations(cls, qs):
+        for report in qs.select_related('figure_aggregation').iterator():
+            if report.get_figure_aggregation() is None:
+                report.refresh_figure_aggregation()
+
     @property
-    def generate_remarks_for_report(self):
-        total_disaggregation = self.total_disaggregation
-        total_flow_sum = total_disaggregation['total_flow_sum'] or 0
-        total_stock_sum = total_disaggregation['total_stock_sum'] or 0
+    def total_disaggregation(self) -> dict:
+        from apps.report.tasks import refresh_report_figure_aggregation
+
+        figure_aggregation = self.get_figure_aggregation()
+        if figure_aggregation is None:
+            # NOTE: Not writing on the read path, the aggregation is refreshed in the background
+            transaction.on_commit(lambda: refresh_report_figure_aggregation.delay(self.pk))
+            return self.calculate_total_disaggregation()
+        return {
+            field: getattr(figure_aggregation, field)
+            for field in ReportFigureAggregation.TOTAL_DISAGGREGATION_FIELDS
+        }
+
+    @staticmethod
+    def get_remarks(total_figures, filter_figure_categories, total_flow_sum, total_stock_sum):
+        total_flow_sum = total_flow_sum or 0
+        total_stock_sum = total_stock_sum or 0
         figure_categories_to_check = [
             Figure.FIGURE_CATEGORY_TYPES.NEW_DISPLACEMENT.value,
             Figure.FIGURE_CATEGORY_TYPES.IDPS.value
         ]
-        if self.total_figures in [0, None]:
+        if total_figures in [0, None]:
             return 'The masterfact figure is missing.'
 
-        total_masterfact_figures = self.total_figures or 0
+        total_masterfact_figures = total_figures or 0
         if (
-            self.filter_figure_categories is None or
+            filter_figure_categories is None or
             (
                 bool(
-                    set([item.value for item in self.filter_figure_categories]) & set(figure_categories_to_check)
+                    set([item.value for item in filter_figure_categories]) & set(figure_categories_to_check)
                 ) and
                 (
                     total_masterfact_figures != total_flow_sum and
@@ -332,10 +390,20 @@ class Report(MetaInformationArchiveAbstractModel,
             )
         ):
             return 'The numbers do no match'
-        if not bool(set([item.value for item in self.filter_figure_categories]) & set(figure_categories_to_check)):
+        if not bool(set([item.value for item in filter_figure_categories]) & set(figure_categories_to_check)):
             return "The figure category is not 'internal displacement' or 'idps'"
         return ''
 
+    @property
+    def generate_remarks_for_report(self):
+        total_disaggregation = self.total_disaggregation
+        return self.get_remarks(
+            self.total_figures,
+            self.filter_figure_categories,
+            total_disaggregation['total_flow_sum'],
+            total_disaggregation['total_stock_sum'],
+        )
+
     @cached_property
     def is_approved(self):
         if self.last_generation:
@@ -395,6 +463,34 @@ class Report(MetaInformationArchiveAbstractModel,
         return self.name
 
 
+class ReportFigureAggregation(models.Model):
+    """
+    Materialized Report.TOTAL_FIGURE_DISAGGREGATIONS sums, re-calculated when the version changes
+    """
+    TOTAL_DISAGGREGATION_FIELDS = [
+        'total_stock_conflict_sum',
+        'total_flow_conflict_sum',
+        'total_flow_disaster_sum',
+        'total_stock_disaster_sum',
+        'total_flow_sum',
+        'total_stock_sum',
+    ]
+
+    report = models.OneToOneField('Report', verbose_name=_('Report'),
+                                  related_name='figure_aggregation', on_delete=models.CASCADE)
+    version = models.CharField(verbose_name=_('Version'), max_length=255)
+    total_stock_conflict_sum = models.BigIntegerField(verbose_name=_('Total stock conflict'), null=True)
+    total_flow_conflict_sum = models.BigIntegerField(verbose_name=_('Total flow conflict'), null=True)
+    total_flow_disaster_sum = models.BigIntegerField(verbose_name=_('Total flow disaster'), null=True)
+    total_stock_disaster_sum = models.BigIntegerField(verbose_name=_('Total stock disaster'), null=True)
+    total_flow_sum = models.BigIntegerField(verbose_name=_('Total flow'), null=True)
+    total_stock_sum = models.BigIntegerField(verbose_name=_('Total stock'), null=True)
+    updated_at = models.DateTimeField(verbose_name=_('Updated at'), auto_now=True)
+
+    def __str__(self):
+        return f'{self.report_id}: {self.version}'
+
+
 class ReportComment(MetaInformationArchiveAbstractModel, models.Model):
     body = models.TextField(verbose_name=_('Body'))
     report = models.ForeignKey('Report', verbose_name=_('Report'),
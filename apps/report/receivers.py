@@ -1,6 +1,11 @@
-from django.db.models.signals import post_save
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 
+from apps.entry.models import Entry, Figure
+from apps.entry.receivers import get_figure_previous_state
+from apps.event.models import Event
+from utils.common import bump_figure_data_version
 from .models import ReportGeneration
 
 
@@ -15,3 +20,26 @@ def update_report_reviewer_status(sender, instance, created, **kwargs):
             instance.report.is_signed_off = True
             instance.report.is_signed_off_by = instance.is_signed_off_by
             instance.report.save(update_fields=['is_signed_off', 'is_signed_off_by'])
+
+
+@receiver(post_save, sender=Figure)
+@receiver(post_delete, sender=Figure)
+def invalidate_figure_data(sender, instance, **kwargs):
+    country_ids = {instance.country_id}
+    # NOTE: Figures moved to another country change the data of both the countries
+    if previous_state := get_figure_previous_state(instance):
+        country_ids.add(previous_state['country_id'])
+    # NOTE: Bumped after commit, data materialized by other transactions before that uses the old data
+    transaction.on_commit(lambda: bump_figure_data_version(country_ids))
+
+
+# NOTE: Figures are deleted with their Event/Entry, which is handled by the Figure post_delete
+@receiver(post_save, sender=Event)
+@receiver(post_save, sender=Entry)
+def invalidate_related_figure_data(sender, instance, **kwargs):
+    figure_filter = {'event': instance} if sender == Event else {'entry': instance}
+    country_ids = set(
+        Figure.objects.filter(**figure_filter).order_by().values_list('country', flat=True).distinct()
+    )
+    if country_ids:
+        transaction.on_commit(lambda: bump_figure_data_version(country_ids))
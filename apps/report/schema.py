@@ -90,7 +90,7 @@ class ReportGenerationListType(CustomDjangoListObjectType):
 class ReportType(DjangoObjectType):
     class Meta:
         model = Report
-        exclude_fields = ('reports', 'figures', 'masterfact_reports')
+        exclude_fields = ('reports', 'figures', 'masterfact_reports', 'figure_aggregation')
 
     comments = DjangoPaginatedListObjectField(ReportCommentListType,
                                               pagination=PageGraphqlPaginationWithoutCount(
@@ -19,58 +19,55 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
-def generate_excel_file(excel_sheet_data):
-    wb = Workbook()
-    active = wb.active.title
-    del wb[active]
+def get_report_sheet_rows(headers, data, formulae, aggregation=None):
+    '''
+    Yields the sheet rows: data with formulae, followed by the aggregation block after a gap
+    '''
+    header_keys = list(headers.keys())
+    data_formulae = list(formulae.values())
+    # NOTE: the gap is two columns wide if there are no formulae
+    gap_width = 1 if formulae else 2
+    agg_headers = aggregation['headers'] if aggregation else {}
+    agg_data = aggregation['data'] if aggregation else []
+    agg_formulae = list(aggregation['formulae'].values()) if aggregation else []
+
+    yield [
+        *headers.values(),
+        *formulae.keys(),
+        *[None] * (gap_width - 1),
+        '',
+        *agg_headers.values(),
+        *(aggregation['formulae'].keys() if aggregation else []),
+    ]
+    for row, (datum, agg_datum) in enumerate(itertools.zip_longest(data, agg_data), 2):
+        if datum is None:
+            cells = [None] * (len(header_keys) + len(data_formulae))
+        else:
+            cells = [
+                *[datum.get(header_key, '') for header_key in header_keys],
+                *[formula.format(row=row) for formula in data_formulae],
+            ]
+        if aggregation:
+            cells.extend([None] * gap_width)
+            if agg_datum is None:
+                cells.extend([None] * len(agg_headers))
+            else:
+                cells.extend(agg_datum.get(header_key, '') for header_key in agg_headers.keys())
+            cells.extend(formula.format(row=row) for formula in agg_formulae)
+        yield cells
 
-    for sheet_name, sheet_data in excel_sheet_data:
-        headers = sheet_data['headers']
-        data = sheet_data['data']
-        formulae = sheet_data['formulae']
-        aggregation = sheet_data.get('aggregation', None)
 
+def generate_excel_file(excel_sheet_data):
+    wb = Workbook(write_only=True)
+    for sheet_name, sheet_data in excel_sheet_data:
         ws = wb.create_sheet(sheet_name)
-        # primary headers and data
-        for idx, (header_key, header_val) in enumerate(headers.items()):
-            ws.cell(column=idx + 1, row=1, value=header_val)
-            for idy, datum in enumerate(data):
-                ws.cell(column=idx + 1, row=idy + 2, value=datum.get(header_key, ''))
-        # secondary headers and data
-        idx2 = 0
-        for idx2, (header_key, formula) in enumerate(formulae.items()):
-            # column starts at 1, hence idx+idx2+2
-            ws.cell(column=idx + idx2 + 2, row=1, value=header_key)
-            # list indexing starts at 0, hence idx+idx2+1
-            for row, cell in enumerate(list(ws.columns)[idx + idx2 + 1], 1):
-                if row == 1:
-                    continue
-                cell.value = formula.format(row=row)
-        # add a gap
-        column_at = idx + idx2 + 3
-        ws.cell(column=column_at, row=1, value='')
-
-        if not aggregation:
-            continue
-        agg_headers = aggregation['headers']
-        agg_data = aggregation['data']
-        agg_formulae = aggregation['formulae']
-
-        # primary headers and data
-        for idx, (header_key, header_val) in enumerate(agg_headers.items()):
-            ws.cell(column=column_at + idx + 1, row=1, value=header_val)
-            for idy, datum in enumerate(agg_data):
-                ws.cell(column=column_at + idx + 1, row=idy + 2, value=datum.get(header_key, ''))
-        # secondary headers and data
-        for idx2, (header_key, formula) in enumerate(agg_formulae.items()):
-            # column starts at 1, hence idx+idx2+2
-            ws.cell(column=column_at + idx + idx2 + 2, row=1, value=header_key)
-            # list indexing starts at 0, hence idx+idx2+1
-            for row, cell in enumerate(list(ws.columns)[column_at + idx + idx2 + 1], 1):
-                if row == 1:
-                    continue
-                cell.value = formula.format(row=row)
-
+        for row in get_report_sheet_rows(
+            sheet_data['headers'],
+            sheet_data['data'],
+            sheet_data['formulae'],
+            sheet_data.get('aggregation', None),
+        ):
+            ws.append(row)
     return wb
 
 
@@ -135,3 +132,16 @@ def trigger_report_generation(generation_id):
         logger.error('Report Generation Failed', exc_info=True)
         generation.status = ReportGeneration.REPORT_GENERATION_STATUS.FAILED
         generation.save(update_fields=['status'])
+
+
+@celery_app.task
+def refresh_report_figure_aggregation(report_id):
+    """
+    Refresh the materialized figure aggregation of the report if it's stale
+    """
+    from apps.report.models import Report
+
+    report = Report.objects.select_related('figure_aggregation').filter(pk=report_id).first()
+    if report is None or report.get_figure_aggregation() is not None:
+        return
+    report.refresh_figure_aggregation()
@@ -1,6 +1,8 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
 from apps.users.enums import USER_ROLE
-from apps.report.models import ReportGeneration, Report
+from apps.report.models import ReportGeneration, Report, ReportComment
 from apps.crisis.models import Crisis
 from apps.entry.models import Figure
 from utils.factories import (
@@ -391,6 +393,104 @@ class TestReportComment(HelixGraphQLTestCase):
         self.assertFalse(content['data']['updateReportComment']['ok'], content)
 
 
+class TestReportCommentsNestedList(HelixGraphQLTestCase):
+    def setUp(self) -> None:
+        self.q = '''
+            query ReportList($page: Int, $pageSize: Int, $ordering: String) {
+              reportList(ordering: "id") {
+                results {
+                  id
+                  comments(page: $page, pageSize: $pageSize, ordering: $ordering) {
+                    results {
+                      id
+                    }
+                    totalCount
+                  }
+                }
+              }
+            }
+        '''
+        now = timezone.now()
+        self.reports = ReportFactory.create_batch(4, is_public=True)
+        # Comments with created_at days offset, ids are in the creation order
+        self.comments = {}
+        for report, offsets in zip(self.reports, [[3, 5, 1, 5, 2], [1, 2, 3], [1], []]):
+            self.comments[report.id] = []
+            for offset in offsets:
+                comment = ReportCommentFactory.create(report=report, body='comment')
+                ReportComment.objects.filter(pk=comment.pk).update(created_at=now + timezone.timedelta(days=offset))
+                self.comments[report.id].append(comment.id)
+        self.force_login(create_user_with_role(USER_ROLE.ADMIN.name))
+
+    def _query_comments(self, **variables):
+        comment_table = ReportComment._meta.db_table
+        with CaptureQueriesContext(connection) as queries:
+            response = self.query(self.q, variables=variables)
+        self.assertResponseNoErrors(response)
+        comments_by_report = {
+            int(report['id']): (
+                [int(comment['id']) for comment in report['comments']['results']],
+                report['comments']['totalCount'],
+            )
+            for report in response.json()['data']['reportList']['results']
+        }
+        return comments_by_report, len([query for query in queries.captured_queries if comment_table in query['sql']])
+
+    def test_nested_comments_page(self):
+        report1, report2, report3, report4 = [self.comments[report.id] for report in self.reports]
+        comments_by_report, comment_queries = self._query_comments(page=1, pageSize=2, ordering='id')
+        self.assertEqual(
+            {
+                self.reports[0].id: (report1[:2], 5),
+                self.reports[1].id: (report2[:2], 3),
+                self.reports[2].id: (report3, 1),
+                self.reports[3].id: ([], 0),
+            },
+            comments_by_report,
+        )
+        self.assertEqual(1, comment_queries)
+
+        # Parents with an empty page use the grouped count query for the totalCount
+        comments_by_report, comment_queries = self._query_comments(page=2, pageSize=2, ordering='id')
+        self.assertEqual(
+            {
+                self.reports[0].id: (report1[2:4], 5),
+                self.reports[1].id: (report2[2:], 3),
+                self.reports[2].id: ([], 1),
+                self.reports[3].id: ([], 0),
+            },
+            comments_by_report,
+        )
+        self.assertEqual(2, comment_queries)
+
+        comments_by_report, _ = self._query_comments(page=2, pageSize=2, ordering='-id')
+        self.assertEqual(
+            (report1[::-1][2:4], 5),
+            comments_by_report[self.reports[0].id],
+        )
+
+    def test_nested_comments_default_ordering(self):
+        # ReportComment.Meta.ordering (-created_at), then pk for the same created_at
+        report1, report2, report3, _ = [self.comments[report.id] for report in self.reports]
+        comments_by_report, _ = self._query_comments(page=1, pageSize=10)
+        self.assertEqual(
+            [report1[1], report1[3], report1[0], report1[4], report1[2]],
+            comments_by_report[self.reports[0].id][0],
+        )
+        self.assertEqual(report2[::-1], comments_by_report[self.reports[1].id][0])
+
+        comments_by_report, _ = self._query_comments(page=2, pageSize=2)
+        self.assertEqual(
+            {
+                self.reports[0].id: ([report1[0], report1[4]], 5),
+                self.reports[1].id: ([report2[0]], 3),
+                self.reports[2].id: ([], 1),
+                self.reports[3].id: ([], 0),
+            },
+            comments_by_report,
+        )
+
+
 class TestReportFilter(HelixGraphQLTestCase):
     def setUp(self) -> None:
         self.create_report = '''mutation MyMutation($input: ReportCreateInputType!) {
@@ -7,9 +7,11 @@ from apps.report.models import (
     Report,
     ReportGeneration,
     ReportApproval,
+    ReportFigureAggregation,
 )
 from apps.crisis.models import Crisis
 from apps.entry.models import Figure
+from apps.extraction.models import FigureIdSnapshot
 from apps.users.enums import USER_ROLE
 from utils.tests import HelixTestCase, create_user_with_role
 from utils.factories import (
@@ -126,6 +128,97 @@ class TestReportModel(HelixTestCase):
         assert len(data) == 2
         assert len(gen.stat_conflict_typology['data']) == 2, gen.stat_conflict_typology['data']
 
+    def test_003_total_disaggregation_is_refreshed_when_figures_change(self):
+        country = CountryFactory.create()
+        figure_kwargs = dict(
+            category=Figure.FIGURE_CATEGORY_TYPES.NEW_DISPLACEMENT,
+            role=Figure.ROLE.RECOMMENDED,
+            country=country,
+            event=self.event_conflict,
+            start_date='2019-02-01',
+            end_date='2019-04-01',
+        )
+        FigureFactory.create(total_figures=100, **figure_kwargs)
+        report = ReportFactory.create(
+            filter_figure_start_after='2019-01-01',
+            filter_figure_end_before='2019-12-31',
+        )
+        assert report.total_disaggregation['total_flow_conflict_sum'] == 100
+        assert ReportFigureAggregation.objects.filter(report=report).count() == 1
+
+        with self.captureOnCommitCallbacks(execute=True):
+            FigureFactory.create(total_figures=50, **figure_kwargs)
+        report = Report.objects.get(pk=report.pk)
+        assert report.total_disaggregation['total_flow_conflict_sum'] == 150
+        assert ReportFigureAggregation.objects.filter(report=report).count() == 1
+
+    def test_004_report_figures_use_the_figure_id_snapshot(self):
+        figure_kwargs = dict(
+            category=Figure.FIGURE_CATEGORY_TYPES.NEW_DISPLACEMENT,
+            role=Figure.ROLE.RECOMMENDED,
+            country=CountryFactory.create(),
+            event=self.event_conflict,
+            start_date='2019-02-01',
+            end_date='2019-04-01',
+        )
+        figure1 = FigureFactory.create(**figure_kwargs)
+        report = ReportFactory.create(
+            filter_figure_start_after='2019-01-01',
+            filter_figure_end_before='2019-12-31',
+        )
+        assert set(report.report_figures) == {figure1}
+        snapshot = FigureIdSnapshot.objects.get(key=report.figure_id_snapshot_key)
+        assert snapshot.figure_ids == [figure1.id]
+
+        # Snapshot is re-used if nothing changes
+        with self.assertNumQueries(2):
+            assert report.report_figures.count() == 1
+
+        # Snapshot is refreshed if figures change
+        figure2 = FigureFactory.create(**figure_kwargs)
+        assert set(report.report_figures) == {figure1, figure2}
+        assert FigureIdSnapshot.objects.get(key=report.figure_id_snapshot_key).figure_ids == sorted([
+            figure1.id, figure2.id,
+        ])
+
+        snapshot_key = report.figure_id_snapshot_key
+        report.delete()
+        assert FigureIdSnapshot.objects.filter(key=snapshot_key).exists() is False
+
+    def test_005_figure_id_snapshot_is_scoped_to_the_report_countries(self):
+        country1, country2 = CountryFactory.create_batch(2)
+        figure_kwargs = dict(
+            category=Figure.FIGURE_CATEGORY_TYPES.NEW_DISPLACEMENT,
+            role=Figure.ROLE.RECOMMENDED,
+            event=self.event_conflict,
+            start_date='2019-02-01',
+            end_date='2019-04-01',
+        )
+        figure1 = FigureFactory.create(country=country1, **figure_kwargs)
+        report = ReportFactory.create(
+            filter_figure_start_after='2019-01-01',
+            filter_figure_end_before='2019-12-31',
+        )
+        report.filter_figure_countries.set([country1])
+        report = Report.objects.get(pk=report.pk)
+        assert set(report.report_figures) == {figure1}
+        version = report.get_figure_id_snapshot_version()
+
+        # Figures of other countries don't affect the snapshot
+        FigureFactory.create(country=country2, **figure_kwargs)
+        assert report.get_figure_id_snapshot_version() == version
+        assert report.get_figure_id_snapshot() is not None
+
+        # Figures moved into the report countries do
+        figure3 = FigureFactory.create(country=country2, **figure_kwargs)
+        figure3.country = country1
+        figure3.save()
+        assert report.get_figure_id_snapshot_version() != version
+        assert report.get_figure_id_snapshot() is None
+        assert set(report.report_figures) == {figure1, figure3}
+        # Refreshed in the background
+        assert report.get_figure_id_snapshot() is not None
+
 
 class TestReportGenerationApproval(HelixTestCase):
     def setUp(self) -> None:
@@ -0,0 +1,137 @@
+import io
+
+from openpyxl import Workbook, load_workbook
+
+from utils.tests import HelixTestCase
+from apps.report.tasks import generate_excel_file, get_report_sheet_rows
+
+
+def generate_previous_excel_file(excel_sheet_data):
+    """
+    Workbook using the cell by cell layout before get_report_sheet_rows
+    """
+    wb = Workbook()
+    active = wb.active.title
+    del wb[active]
+
+    for sheet_name, sheet_data in excel_sheet_data:
+        headers = sheet_data['headers']
+        data = sheet_data['data']
+        formulae = sheet_data['formulae']
+        aggregation = sheet_data.get('aggregation', None)
+
+        ws = wb.create_sheet(sheet_name)
+        for idx, (header_key, header_val) in enumerate(headers.items()):
+            ws.cell(column=idx + 1, row=1, value=header_val)
+            for idy, datum in enumerate(data):
+                ws.cell(column=idx + 1, row=idy + 2, value=datum.get(header_key, ''))
+        idx2 = 0
+        for idx2, (header_key, formula) in enumerate(formulae.items()):
+            ws.cell(column=idx + idx2 + 2, row=1, value=header_key)
+            for row, cell in enumerate(list(ws.columns)[idx + idx2 + 1], 1):
+                if row == 1:
+                    continue
+                cell.value = formula.format(row=row)
+        column_at = idx + idx2 + 3
+        ws.cell(column=column_at, row=1, value='')
+
+        if not aggregation:
+            continue
+        for idx, (header_key, header_val) in enumerate(aggregation['headers'].items()):
+            ws.cell(column=column_at + idx + 1, row=1, value=header_val)
+            for idy, datum in enumerate(aggregation['data']):
+                ws.cell(column=column_at + idx + 1, row=idy + 2, value=datum.get(header_key, ''))
+        for idx2, (header_key, formula) in enumerate(aggregation['formulae'].items()):
+            ws.cell(column=column_at + idx + idx2 + 2, row=1, value=header_key)
+            for row, cell in enumerate(list(ws.columns)[column_at + idx + idx2 + 1], 1):
+                if row == 1:
+                    continue
+                cell.value = formula.format(row=row)
+    return wb
+
+
+def get_workbook_rows(wb):
+    file = io.BytesIO()
+    wb.save(file)
+    wb = load_workbook(file)
+    return {
+        sheet_name: [list(row) for row in wb[sheet_name].iter_rows(values_only=True)]
+        for sheet_name in wb.sheetnames
+    }
+
+
+class TestReportExcel(HelixTestCase):
+    def setUp(self):
+        super().setUp()
+        self.sheet_data = {
+            'headers': {'id': 'ID', 'country': 'Country', 'total': 'Total'},
+            'data': [
+                {'id': 1, 'country': 'ABC', 'total': 10},
+                {'id': 2, 'country': 'DEF'},
+            ],
+            'formulae': {'Double': '=C{row}*2'},
+            'aggregation': {
+                'headers': {'year': 'Year', 'count': 'Count'},
+                'data': [
+                    {'year': 2020, 'count': 3},
+                    {'year': 2021, 'count': 4},
+                    {'year': 2022, 'count': 5},
+                ],
+                'formulae': {'Share': '=G{row}/SUM(G:G)'},
+            },
+        }
+
+    def test_get_report_sheet_rows(self):
+        rows = list(get_report_sheet_rows(**self.sheet_data))
+        self.assertEqual(4, len(rows))
+        # Header row: headers, formulae, gap and the aggregation block
+        self.assertEqual(['ID', 'Country', 'Total', 'Double', '', 'Year', 'Count', 'Share'], rows[0])
+        # Data row: missing values are empty, formula uses the row number
+        self.assertEqual([2, 'DEF', '', '=C3*2', None, 2021, 4, '=G3/SUM(G:G)'], rows[2])
+        # Aggregation block is longer than the data
+        self.assertEqual([None, None, None, None, None, 2022, 5, '=G4/SUM(G:G)'], rows[3])
+
+        # Without formulae and aggregation, the gap is two columns wide
+        rows = list(get_report_sheet_rows(self.sheet_data['headers'], self.sheet_data['data'], {}))
+        self.assertEqual(
+            [
+                ['ID', 'Country', 'Total', None, ''],
+                [1, 'ABC', 10],
+                [2, 'DEF', ''],
+            ],
+            rows,
+        )
+
+    def test_generate_excel_file(self):
+        excel_sheet_data = [
+            ('Figures', self.sheet_data),
+            (
+                # Aggregation is shorter than the data
+                'Events',
+                {
+                    **self.sheet_data,
+                    'aggregation': {
+                        **self.sheet_data['aggregation'],
+                        'data': self.sheet_data['aggregation']['data'][:1],
+                    },
+                },
+            ),
+            ('Entries', {**self.sheet_data, 'formulae': {}, 'aggregation': None}),
+            ('Empty', {**self.sheet_data, 'data': []}),
+        ]
+        sheets = get_workbook_rows(generate_excel_file(excel_sheet_data))
+        self.assertEqual(['Figures', 'Events', 'Entries', 'Empty'], list(sheets.keys()))
+        self.assertEqual(get_workbook_rows(generate_previous_excel_file(excel_sheet_data)), sheets)
+
+        figure_rows = sheets['Figures']
+        self.assertEqual(['ID', 'Country', 'Total', 'Double'], figure_rows[0][:4])
+        self.assertEqual([1, 'ABC', 10, '=C2*2'], figure_rows[1][:4])
+        self.assertEqual(['Year', 'Count', 'Share'], figure_rows[0][5:])
+        self.assertEqual(
+            [
+                [2020, 3, '=G2/SUM(G:G)'],
+                [2021, 4, '=G3/SUM(G:G)'],
+                [2022, 5, '=G4/SUM(G:G)'],
+            ],
+            [row[5:] for row in figure_rows[1:]],
+        )
@@ -31,21 +31,17 @@ app.conf.beat_schedule = {
         'schedule': crontab(minute='0', hour='*/3'),
         'args': [],
     },
+    'resume-bulk-api-operations': {
+        'task': 'apps.contrib.tasks.resume_bulk_api_operations',
+        'schedule': crontab(minute='*/15'),
+        'args': [],
+    },
 
     # NOTE: when we change the schedule, we should also update the metadata
     # for the external APIs
-    'generate-idus-dump-file': {
-        'task': 'apps.contrib.tasks.generate_idus_dump_file',
-        'schedule': crontab(minute='0', hour='*/2'),
-        'args': [],
-    },
-    'generate-idus-all-dump-file': {
-        'task': 'apps.contrib.tasks.generate_idus_all_dump_file',
-        'schedule': crontab(minute='0', hour='*/2'),
-        'args': [],
-    },
-    'generate-idus-all-disaster-dump-file': {
-        'task': 'apps.contrib.tasks.generate_idus_all_disaster_dump_file',
+    # NOTE: IDUS, IDUS_ALL and IDUS_ALL_DISASTER dumps are generated using a single scan
+    'generate-idus-dump-files': {
+        'task': 'apps.contrib.tasks.generate_idus_dump_files',
         'schedule': crontab(minute='0', hour='*/2'),
         'args': [],
     },
@@ -77,6 +77,12 @@ env = environ.Env(
     COPILOT_SERVICE_NAME=(str, None),
     # Pytest
     PYTEST_XDIST_WORKER=(str, None),
+    # External API client rate limit (token bucket)
+    CLIENT_RATE_LIMIT_CAPACITY=(int, 120),
+    CLIENT_RATE_LIMIT_REFILL_RATE=(float, 1.0),  # tokens per second
+    CLIENT_RATE_LIMIT_EXPORT_COST=(int, 20),
+    # Bulk API operation
+    BULK_API_OPERATION_CHUNK_SIZE=(int, 500),
 )
 
 
@@ -217,6 +223,14 @@ CACHES = {
     },
 }
 
+# External API client rate limit
+CLIENT_RATE_LIMIT_CAPACITY = env('CLIENT_RATE_LIMIT_CAPACITY')
+CLIENT_RATE_LIMIT_REFILL_RATE = env('CLIENT_RATE_LIMIT_REFILL_RATE')
+CLIENT_RATE_LIMIT_EXPORT_COST = env('CLIENT_RATE_LIMIT_EXPORT_COST')
+
+# Items processed (and checkpointed) per chunk by the bulk API operations
+BULK_API_OPERATION_CHUNK_SIZE = env('BULK_API_OPERATION_CHUNK_SIZE')
+
 REST_FRAMEWORK = {
     'DEFAULT_FILTER_BACKENDS': ['django_filters.rest_framework.DjangoFilterBackend'],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.LimitOffsetPagination',
@@ -1,4 +1,6 @@
 import datetime
+import hashlib
+import json
 import traceback
 import typing
 import functools
@@ -9,14 +11,19 @@ import logging
 from datetime import timedelta
 
 from django.conf import settings
-from rest_framework.exceptions import PermissionDenied
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from rest_framework.exceptions import PermissionDenied, Throttled
 from drf_spectacular.types import OpenApiTypes
 from drf_spectacular.utils import extend_schema, OpenApiParameter
 from rest_framework import viewsets
 
 from helix import redis
-from helix.caches import external_api_cache
-from apps.contrib.redis_client_track import track_client
+from apps.contrib.redis_client_track import (
+    track_client,
+    get_client_registry,
+    consume_client_rate_limit,
+)
 from apps.common.utils import EXTERNAL_ARRAY_SEPARATOR
 
 
@@ -130,6 +137,47 @@ def redis_lock(lock_key, timeout=60 * 60 * 4):
     return _dec
 
 
+FIGURE_DATA_VERSION_KEY = 'figure-data:version'
+# NOTE: Hash of country id -> version, ALL_COUNTRIES field is used for the changes which can't be scoped
+FIGURE_DATA_COUNTRY_VERSION_KEY = 'figure-data:version:country'
+FIGURE_DATA_ALL_COUNTRIES_FIELD = '*'
+
+
+def get_figure_data_version(country_ids: typing.Optional[typing.Iterable[int]] = None) -> str:
+    """
+    Returns the version of the figure data used by the materialized report/query data
+    country_ids: Only the changes in these countries are considered, all the changes are considered if not provided
+    """
+    redis_client = redis.get_connection()
+    if country_ids is None:
+        version = redis_client.get(FIGURE_DATA_VERSION_KEY)
+        return version.decode() if version else '0'
+    fields = [FIGURE_DATA_ALL_COUNTRIES_FIELD, *sorted(country_ids)]
+    versions = redis_client.hmget(FIGURE_DATA_COUNTRY_VERSION_KEY, fields)
+    return hashlib.md5(
+        ','.join(
+            f'{field}:{version.decode() if version else 0}'
+            for field, version in zip(fields, versions)
+        ).encode()
+    ).hexdigest()
+
+
+def bump_figure_data_version(country_ids: typing.Optional[typing.Iterable[int]] = None):
+    """
+    Mark the materialized report/query data as stale
+    country_ids: Countries of the changed figures, all the data is marked as stale if not provided
+    """
+    if country_ids is None:
+        country_ids = [FIGURE_DATA_ALL_COUNTRIES_FIELD]
+    pipe = redis.get_connection().pipeline()
+    pipe.incr(FIGURE_DATA_VERSION_KEY)
+    for country_id in set(country_ids):
+        # NOTE: Figures without country are not included in the country scoped data
+        if country_id is not None:
+            pipe.hincrby(FIGURE_DATA_COUNTRY_VERSION_KEY, country_id, 1)
+    pipe.execute()
+
+
 def round_half_up(float_value):
     """
     Returns rounded half upper value, eg 2.5 rounds to 3.0
@@ -156,20 +204,64 @@ def round_and_remove_zero(num):
     return sign * round(num / 1000) * 1000
 
 
-def track_gidd(client_id, endpoint_type, viewset: viewsets.GenericViewSet = None):
-    from apps.contrib.models import Client
+def get_not_modified_response(view, request, version, last_modified=None):
+    """
+    Add the ETag and Last-Modified headers to the view response and return 304 response if not modified
+    NOTE: ETag uses the version, the path and the normalized query params (client_id is excluded)
+    """
+    query_params = sorted(
+        (key, value)
+        for key, values in request.GET.lists()
+        if key != 'client_id'
+        for value in values
+    )
+    etag = quote_etag(
+        hashlib.md5(json.dumps([version, request.path, query_params]).encode()).hexdigest()
+    )
+    # NOTE: Added to the response (including 304 response) by APIView.finalize_response
+    view.headers['ETag'] = etag
+    if last_modified is not None:
+        last_modified = int(last_modified)
+        view.headers['Last-Modified'] = http_date(last_modified)
+    return get_conditional_response(request, etag=etag, last_modified=last_modified)
+
+
+def get_client_rate_limit_cost(endpoint_type):
+    from apps.entry.models import ExternalApiDump
+
+    if endpoint_type in [
+        ExternalApiDump.ExternalApiType.GIDD_DISASTER_EXPORT_REST,
+        ExternalApiDump.ExternalApiType.GIDD_DISPLACEMENT_EXPORT_REST,
+    ]:
+        return settings.CLIENT_RATE_LIMIT_EXPORT_COST
+    return 1
 
+
+def track_gidd(client_id, endpoint_type, viewset: viewsets.GenericViewSet = None):
     if viewset and getattr(viewset, "swagger_fake_view", False):
         # Skip check for swagger view
         return
 
-    if client_id not in external_api_cache.get('client_ids', []):
+    client_registry = get_client_registry()
+    if client_id not in client_registry['codes']:
         raise PermissionDenied('Client is not registered.')
 
-    client = Client.objects.filter(code=client_id).first()
-    if not client.is_active:
+    if client_id not in client_registry['active_codes']:
         raise PermissionDenied('Client is deactivated.')
 
+    # Rate limit client before building the queryset
+    rate_limit = consume_client_rate_limit(
+        client_id,
+        get_client_rate_limit_cost(endpoint_type),
+        settings.CLIENT_RATE_LIMIT_CAPACITY,
+        settings.CLIENT_RATE_LIMIT_REFILL_RATE,
+    )
+    if viewset is not None:
+        # NOTE: Added to the response (including error response) by APIView.finalize_response
+        viewset.headers.update(rate_limit.headers)
+    if not rate_limit.allowed:
+        raise Throttled(wait=rate_limit.retry_after)
+
     # Track client
     track_client(
         endpoint_type,
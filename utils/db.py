@@ -1,6 +1,56 @@
-from django.db import models
+import json
+import typing
+
+from django.db import connection, models
+from django.db.models.functions import Cast
 
 
 class Array(models.Func):
     template = '%(function)s[%(expressions)s]'
     function = 'ARRAY'
+
+
+class JSONBAppend(models.Func):
+    """
+    Append the items to the jsonb array without loading it (field || items)
+    """
+    template = '%(expressions)s'
+    arg_joiner = ' || '
+    output_field = models.JSONField()
+
+    def __init__(self, expression, items: list, **extra):
+        super().__init__(expression, Cast(models.Value(json.dumps(items)), models.JSONField()), **extra)
+
+
+def upsert(model: typing.Type[models.Model], conflict_fields: typing.List[str], **values) -> models.Model:
+    """
+    Insert or update the row using a single INSERT ... ON CONFLICT DO UPDATE
+    NOTE: Unlike update_or_create, concurrent calls for the same key don't fail with IntegrityError
+    conflict_fields: Fields of the unique constraint
+    """
+    instance = model(**values)
+    fields = [field for field in model._meta.concrete_fields if not field.primary_key]
+    conflict_columns = [model._meta.get_field(name).column for name in conflict_fields]
+    quote_name = connection.ops.quote_name
+    update_columns = ', '.join(
+        f'{quote_name(field.column)} = EXCLUDED.{quote_name(field.column)}'
+        for field in fields
+        if field.column not in conflict_columns
+    )
+    sql = (
+        f'INSERT INTO {quote_name(model._meta.db_table)}'
+        f' ({", ".join(quote_name(field.column) for field in fields)})'
+        f' VALUES ({", ".join(["%s"] * len(fields))})'
+        f' ON CONFLICT ({", ".join(quote_name(column) for column in conflict_columns)})'
+        f' DO UPDATE SET {update_columns}'
+        f' RETURNING {quote_name(model._meta.pk.column)}'
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [
+            field.get_db_prep_save(field.pre_save(instance, True), connection)
+            for field in fields
+        ])
+        instance.pk = cursor.fetchone()[0]
+    instance._state.adding = False
+    instance._state.db = connection.alias
+    return instance
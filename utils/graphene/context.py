@@ -1,20 +1,17 @@
 from django.utils.functional import cached_property
 
 from apps.country.dataloaders import (
-    TotalFigureThisYearByCountryCategoryEventTypeLoader,
+    TotalFiguresThisYearByCountryLoader,
     MonitoringSubRegionCountryLoader,
     MonitoringSubRegionCountryCountLoader,
 )
 from apps.crisis.dataloaders import (
-    TotalIDPFigureByCrisisLoader,
-    TotalNDFigureByCrisisLoader,
+    FigureTotalsByCrisisLoader,
     EventCountLoader,
     CrisisReviewCountLoader,
-    MaxStockIDPFigureEndDateByCrisisLoader,
 )
 from apps.entry.dataloaders import (
-    TotalIDPFigureByEntryLoader,
-    TotalNDFigureByEntryLoader,
+    FigureTotalsByEntryLoader,
     FigureTypologyLoader,
     FigureGeoLocationLoader,
     FigureSourcesReliability,
@@ -25,17 +22,14 @@ from apps.contrib.dataloaders import (
     BulkApiOperationSuccessListLoader,
 )
 from apps.event.dataloaders import (
-    TotalIDPFigureByEventLoader,
-    TotalNDFigureByEventLoader,
-    MaxStockIDPFigureEndDateByEventLoader,
+    FigureTotalsByEventLoader,
     EventEntryCountLoader,
     EventTypologyLoader,
     EventFigureTypologyLoader,
     EventReviewCountLoader,
     EventCodeLoader,
 )
-from utils.graphene.dataloaders import OneToManyLoader, CountLoader
-from apps.entry.models import Figure
+from utils.graphene.dataloaders import OneToManyLoader
 from apps.users.dataloaders import UserPortfolioRoleLoader
 
 
@@ -44,7 +38,6 @@ class GQLContext:
         self.request = request
         # global dataloaders
         self.one_to_many_dataloaders = {}
-        self.count_dataloaders = {}
 
     @cached_property
     def user(self):
@@ -58,80 +51,26 @@ class GQLContext:
             self.one_to_many_dataloaders[ref] = OneToManyLoader()
         return self.one_to_many_dataloaders[ref]
 
-    def get_count_loader(self, parent: str, child: str):
-        ref = f'{parent}_{child}'
-        if ref not in self.count_dataloaders:
-            self.count_dataloaders[ref] = CountLoader()
-        return self.count_dataloaders[ref]
-
     '''
     NOTE: As a convention, data loader should have the name as:
     AppName_NodeType_FieldName
     '''
 
     @cached_property
-    def entry_entry_total_stock_idp_figures(self):
-        return TotalIDPFigureByEntryLoader()
-
-    @cached_property
-    def entry_entry_total_flow_nd_figures(self):
-        return TotalNDFigureByEntryLoader()
-
-    @cached_property
-    def crisis_crisis_total_stock_idp_figures(self):
-        return TotalIDPFigureByCrisisLoader()
-
-    @cached_property
-    def crisis_crisis_total_flow_nd_figures(self):
-        return TotalNDFigureByCrisisLoader()
-
-    @cached_property
-    def crisis_stock_idp_figures_max_end_date(self):
-        return MaxStockIDPFigureEndDateByCrisisLoader()
-
-    @cached_property
-    def event_event_total_stock_idp_figures(self):
-        return TotalIDPFigureByEventLoader()
-
-    @cached_property
-    def event_event_total_flow_nd_figures(self):
-        return TotalNDFigureByEventLoader()
-
-    @cached_property
-    def event_stock_idp_figures_max_end_date(self):
-        return MaxStockIDPFigureEndDateByEventLoader()
-
-    @cached_property
-    def country_country_this_year_idps_disaster_loader(self):
-        from apps.crisis.models import Crisis
-        return TotalFigureThisYearByCountryCategoryEventTypeLoader(
-            category=Figure.FIGURE_CATEGORY_TYPES.IDPS,
-            event_type=Crisis.CRISIS_TYPE.DISASTER.value,
-        )
+    def entry_figure_totals_loader(self):
+        return FigureTotalsByEntryLoader()
 
     @cached_property
-    def country_country_this_year_idps_conflict_loader(self):
-        from apps.crisis.models import Crisis
-        return TotalFigureThisYearByCountryCategoryEventTypeLoader(
-            category=Figure.FIGURE_CATEGORY_TYPES.IDPS,
-            event_type=Crisis.CRISIS_TYPE.CONFLICT.value,
-        )
+    def crisis_figure_totals_loader(self):
+        return FigureTotalsByCrisisLoader()
 
     @cached_property
-    def country_country_this_year_nd_conflict_loader(self):
-        from apps.crisis.models import Crisis
-        return TotalFigureThisYearByCountryCategoryEventTypeLoader(
-            category=Figure.FIGURE_CATEGORY_TYPES.NEW_DISPLACEMENT,
-            event_type=Crisis.CRISIS_TYPE.CONFLICT.value,
-        )
+    def event_figure_totals_loader(self):
+        return FigureTotalsByEventLoader()
 
     @cached_property
-    def country_country_this_year_nd_disaster_loader(self):
-        from apps.crisis.models import Crisis
-        return TotalFigureThisYearByCountryCategoryEventTypeLoader(
-            category=Figure.FIGURE_CATEGORY_TYPES.NEW_DISPLACEMENT,
-            event_type=Crisis.CRISIS_TYPE.DISASTER.value,
-        )
+    def country_country_this_year_totals_loader(self):
+        return TotalFiguresThisYearByCountryLoader()
 
     @cached_property
     def monitoring_sub_region_country_loader(self):
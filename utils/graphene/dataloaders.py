@@ -3,12 +3,13 @@ from collections import defaultdict
 from promise import Promise
 from promise.dataloader import DataLoader
 from django.db.models import (
-    Prefetch,
-    Subquery,
-    OuterRef,
+    F,
     Count,
-    IntegerField,
+    Window,
 )
+from django.db.models.functions import RowNumber
+
+from utils.graphene.pagination import get_nulls_last_ordering
 
 
 def get_relations(model1, model2):
@@ -37,66 +38,15 @@ class DataLoaderException(Exception):
     '''
 
 
-class CountLoader(DataLoader):
-    def load(
-        self,
-        key,
-        parent,
-        child,
-        related_name=None,
-        reverse_related_name=None,
-        accessor=None,
-        pagination=None,
-        filterset_class=None,
-        filter_kwargs=None,
-        request=None,
-        **kwargs
-    ):
-        self.parent = parent
-        self.child = child
-        self.related_name = related_name
-        self.reverse_related_name = reverse_related_name
-        self.accessor = accessor
-        self.pagination = pagination
-        self.filterset_class = filterset_class
-        self.filter_kwargs = filter_kwargs
-        self.request = request
-        # kwargs carries pagination kwargs
-        self.kwargs = kwargs
-        return super().load(key)
-
-    def batch_load_fn(self, keys):
-        # queryset by related names
-        reverse_related_name = self.reverse_related_name or get_related_name(self.child, self.parent)
-
-        filtered_qs = self.filterset_class(
-            data=self.filter_kwargs,
-            request=self.request
-        ).qs
-
-        qs = self.parent.objects.filter(
-            id__in=keys
-        ).annotate(
-            count=Subquery(
-                filtered_qs.filter(**{
-                    reverse_related_name: OuterRef('pk')
-                }).order_by().values(
-                    reverse_related_name
-                ).annotate(
-                    c=Count('*')
-                ).values('c'),
-                output_field=IntegerField()
-            )
-        ).values_list('id', 'count')
-
-        related_objects_by_parent = {id_: count for id_, count in qs}
-
-        return Promise.resolve([
-            related_objects_by_parent.get(key) or 0 for key in keys
-        ])
-
-
 class OneToManyLoader(DataLoader):
+    '''
+    Loads the filtered and paginated children with the total count for each parent in a single query,
+    using ROW_NUMBER() and COUNT(*) window functions partitioned by the parent
+    '''
+    PARENT_FIELD = '_parent_id'
+    ROW_NUMBER_FIELD = '_row_number'
+    TOTAL_COUNT_FIELD = '_total_count'
+
     def load(
         self,
         key,
@@ -124,43 +74,92 @@ class OneToManyLoader(DataLoader):
         self.kwargs = kwargs
         return super().load(key)
 
-    def batch_load_fn(self, keys):
-        related_objects_by_parent = defaultdict(list)
+    def get_offset_and_limit(self):
+        # NOTE: Paginations without page (eg: OrderingOnlyArgumentPagination) returns all the children
+        if not hasattr(self.pagination, 'get_offset_and_limit'):
+            return None
+        return self.pagination.get_offset_and_limit(**self.kwargs)
+
+    def get_ordering(self):
+        '''
+        Ordering from the arguments, else pagination's default ordering, else model's default ordering
+        pk is used as the final tiebreaker to keep the pages stable
+        '''
+        ordering_param = self.pagination.ordering_param
+        ordering = get_nulls_last_ordering(
+            ordering_param,
+            **{
+                **self.kwargs,
+                ordering_param: self.kwargs.get(ordering_param) or getattr(self.pagination, 'ordering', None),
+            },
+        )
+        if not ordering:
+            ordering = [
+                # NOTE: Expressions are used as it is, OrderBy is expected (eg: F('name').asc())
+                field if hasattr(field, 'resolve_expression') else get_nulls_last_ordering('ordering', ordering=field)[0]
+                for field in self.child._meta.ordering
+                if field != '?'
+            ]
+        return [*ordering, F('pk').asc()]
 
+    def batch_load_fn(self, keys):
         # queryset by related names
-        related_name = self.related_name or get_related_name(self.parent, self.child)
         reverse_related_name = self.reverse_related_name or get_related_name(self.child, self.parent)
+        parent_filter = {f'{reverse_related_name}__in': keys}
 
-        # pre-ready the filtered and paginated queryset
         filtered_qs = self.filterset_class(
             data=self.filter_kwargs,
             request=self.request,
-        ).qs.filter(**{
-            reverse_related_name: OuterRef(reverse_related_name)
-        })
-        filtered_paginated_qs = self.pagination.paginate_queryset(
-            filtered_qs,
-            **self.kwargs
-        ).values('id')
-
-        OUT_RELATED_FIELD = 'out_related_field'
-
-        prefetch = Prefetch(
-            related_name,
-            queryset=self.child.objects.filter(
-                id__in=Subquery(
-                    filtered_paginated_qs
-                )
-            ).distinct(),
-            to_attr=OUT_RELATED_FIELD,
+        ).qs.filter(**parent_filter)
+
+        partition_by = [F(reverse_related_name)]
+        ordering = self.get_ordering()
+        # NOTE: filtered_qs is used as a subquery as the window functions should run on distinct children
+        qs = self.child.objects.filter(
+            id__in=filtered_qs.values('id'),
+            **parent_filter,
+        ).annotate(**{
+            self.PARENT_FIELD: F(reverse_related_name),
+            self.ROW_NUMBER_FIELD: Window(RowNumber(), partition_by=partition_by, order_by=ordering),
+            self.TOTAL_COUNT_FIELD: Window(Count('pk'), partition_by=partition_by),
+        }).order_by()
+
+        # NOTE: Django doesn't support filtering on window functions, so the page is selected in an outer query
+        sql, params = qs.query.sql_with_params()
+        page_sql, page_params = '', []
+        offset_and_limit = self.get_offset_and_limit()
+        if offset_and_limit is not None:
+            offset, limit = offset_and_limit
+            page_sql = f'WHERE {self.ROW_NUMBER_FIELD} > %s AND {self.ROW_NUMBER_FIELD} <= %s'
+            page_params = [offset, offset + limit]
+        results = self.child.objects.raw(
+            f'SELECT * FROM ({sql}) AS windowed {page_sql} ORDER BY {self.PARENT_FIELD}, {self.ROW_NUMBER_FIELD}',
+            [*params, *page_params],
         )
 
-        # FIXME: this prefetch is causing un-necessary join in generated queries
-        qs = self.parent.objects.filter(id__in=keys).prefetch_related(prefetch)
-
-        for each in qs:
-            related_objects_by_parent[each.id] = getattr(each, OUT_RELATED_FIELD)
+        related_objects_by_parent = defaultdict(list)
+        count_by_parent = {}
+        for each in results:
+            parent_id = getattr(each, self.PARENT_FIELD)
+            related_objects_by_parent[parent_id].append(each)
+            count_by_parent[parent_id] = getattr(each, self.TOTAL_COUNT_FIELD)
+
+        # NOTE: Parents without children in the page (page out of range) still need the total count
+        missing_keys = [key for key in keys if key not in count_by_parent]
+        if missing_keys and offset_and_limit is not None and offset_and_limit[0] > 0:
+            count_by_parent.update(
+                self.child.objects.filter(
+                    id__in=filtered_qs.values('id'),
+                    **{f'{reverse_related_name}__in': missing_keys},
+                ).order_by().values(reverse_related_name).annotate(
+                    count=Count('pk'),
+                ).values_list(reverse_related_name, 'count')
+            )
 
         return Promise.resolve([
-            related_objects_by_parent.get(key, []) for key in keys
+            dict(
+                results=related_objects_by_parent.get(key, []),
+                count=count_by_parent.get(key, 0),
+            )
+            for key in keys
         ])
@@ -22,7 +22,7 @@ from graphene_django.rest_framework.serializer_converter import get_graphene_typ
 from graphene_django.registry import get_global_registry
 from rest_framework import serializers
 
-from utils.graphene.pagination import OrderingOnlyArgumentPagination
+from utils.graphene.pagination import OrderingOnlyArgumentPagination, CursorPageGraphqlPagination
 from utils.filters import generate_type_for_filter_set
 from utils.common import track_gidd
 from apps.gidd.filters import GIDD_API_TYPE_MAP
@@ -42,19 +42,21 @@ def path_has_list(info):
 
 
 class CustomDjangoListObjectBase(DjangoListObjectBase):
-    def __init__(self, results, count, page, pageSize, results_field_name="results"):
+    def __init__(self, results, count, page, pageSize, results_field_name="results", next_cursor=None):
         self.results = results
         self.count = count
         self.results_field_name = results_field_name
         self.page = page
         self.pageSize = pageSize
+        self.next_cursor = next_cursor
 
     def to_dict(self):
         return {
             self.results_field_name: [e.to_dict() for e in self.results],
             "count": self.count,
             "page": self.page,
-            "pageSize": self.pageSize
+            "pageSize": self.pageSize,
+            "next_cursor": self.next_cursor,
         }
 
 
@@ -257,7 +259,7 @@ class DjangoPaginatedListObjectField(DjangoFilterPaginateListField):
             parent_class = root._meta.model
             child_class = manager.model
             # TODO: qs should be executed only when we access the results node in the future
-            qs = info.context.get_dataloader(
+            data = info.context.get_dataloader(
                 parent_class.__name__,
                 self.related_name,
             ).load(
@@ -273,22 +275,9 @@ class DjangoPaginatedListObjectField(DjangoFilterPaginateListField):
                 request=info.context.request,
                 **kwargs,
             )
-            count = info.context.get_count_loader(
-                parent_class.__name__,
-                child_class.__name__,
-            ).load(
-                root.id,
-                parent=parent_class,
-                child=child_class,
-                accessor=self.accessor,
-                related_name=self.related_name,
-                reverse_related_name=self.reverse_related_name,
-                pagination=self.pagination,
-                filterset_class=filterset_class,
-                filter_kwargs=filter_kwargs,
-                request=info.context.request,
-                **kwargs,
-            )
+            qs = data.then(lambda data: data['results'])
+            count = data.then(lambda data: data['count'])
+            next_cursor = None
         else:
             accessor = self.accessor or self.related_name
             if accessor:
@@ -304,21 +293,31 @@ class DjangoPaginatedListObjectField(DjangoFilterPaginateListField):
                     # NOTE: multiple field filters are returned when
                     # root and child are related in multiple ways
                     qs = qs.filter(**extra_filters)
-            try:
-                # XXX: Experimental: Try to use 'id' to minimize joins in SQL Query
-                count = qs.values('id').count()
-            except DjFieldError:
-                # Fallback to normal count
-                count = qs.count()
-
-            qs = self.pagination.paginate_queryset(
-                qs,
-                **kwargs
-            )
+            next_cursor = None
+            if (
+                isinstance(self.pagination, CursorPageGraphqlPagination) and
+                self.pagination.get_cursor(**kwargs) is not None
+            ):
+                # NOTE: Count is skipped for keyset pagination
+                count = None
+                qs, next_cursor = self.pagination.cursor_paginate_queryset(qs, **kwargs)
+            else:
+                try:
+                    # XXX: Experimental: Try to use 'id' to minimize joins in SQL Query
+                    count = qs.values('id').count()
+                except DjFieldError:
+                    # Fallback to normal count
+                    count = qs.count()
+
+                qs = self.pagination.paginate_queryset(
+                    qs,
+                    **kwargs
+                )
 
         return CustomDjangoListObjectBase(
             results=qs,
             count=count,
+            next_cursor=next_cursor,
             results_field_name=self.type._meta.results_field_name,
             page=kwargs.get('page', 1) if hasattr(self.pagination, 'page_query_param') else None,
             pageSize=kwargs.get(
@@ -8,8 +8,10 @@ from graphene_django_extras.paginations.utils import (
 )
 from graphene_django_extras.settings import graphql_api_settings
 
+from utils.keyset_pagination import keyset_paginate_queryset
 
-def nulls_last_order_queryset(qs, ordering_param, **kwargs):
+
+def get_nulls_last_ordering(ordering_param, **kwargs):
     '''
     https://docs.djangoproject.com/en/3.1/ref/models/expressions/#django.db.models.Expression.desc
     https://docs.djangoproject.com/en/3.1/ref/models/expressions/#using-f-to-sort-null-values
@@ -18,9 +20,6 @@ def nulls_last_order_queryset(qs, ordering_param, **kwargs):
     if order:
         order = order.strip(",").replace(" ", "").split(",")
 
-    if not order:
-        return qs
-
     mod_ordering = []
     for o in order:
         if not o:
@@ -29,7 +28,13 @@ def nulls_last_order_queryset(qs, ordering_param, **kwargs):
             mod_ordering.append(F(o[1:]).desc(nulls_last=True))
         else:
             mod_ordering.append(F(o).asc(nulls_last=True))
+    return mod_ordering
+
 
+def nulls_last_order_queryset(qs, ordering_param, **kwargs):
+    mod_ordering = get_nulls_last_ordering(ordering_param, **kwargs)
+    if not mod_ordering:
+        return qs
     return qs.distinct().order_by(*mod_ordering)
 
 
@@ -113,7 +118,7 @@ class PageGraphqlPaginationWithoutCount(PageGraphqlPagination):
     which is not possible with dataloading
     https://github.com/eamigo86/graphene-django-extras/blob/master/graphene_django_extras/paginations/pagination.py
     '''
-    def paginate_queryset(self, qs, **kwargs):
+    def get_offset_and_limit(self, **kwargs):
         page = kwargs.pop(self.page_query_param, 1) or 1
         assert page > 0, ValueError(
             "Page value for PageGraphqlPagination must be a positive integer"
@@ -138,7 +143,48 @@ class PageGraphqlPaginationWithoutCount(PageGraphqlPagination):
             return None
 
         offset = page_size * (page - 1)
+        return offset, page_size
+
+    def paginate_queryset(self, qs, **kwargs):
+        offset_and_limit = self.get_offset_and_limit(**kwargs)
+        if offset_and_limit is None:
+            return None
+        offset, page_size = offset_and_limit
 
         ordering_param = self.ordering_param
         qs = nulls_last_order_queryset(qs, ordering_param, **kwargs)
         return qs[offset: offset + page_size]
+
+
+class CursorPageGraphqlPagination(PageGraphqlPaginationWithoutCount):
+    '''
+    PageGraphqlPaginationWithoutCount with opt-in keyset pagination using the cursor argument
+    Use empty cursor for the first page. The page and ordering arguments are ignored and count is not calculated.
+    '''
+    def __init__(self, *args, cursor_ordering=('created_at', 'id'), cursor_query_param='cursor', **kwargs):
+        super().__init__(*args, **kwargs)
+        self.cursor_ordering = cursor_ordering
+        self.cursor_query_param = cursor_query_param
+
+    def to_graphql_fields(self):
+        fields = super().to_graphql_fields()
+        fields[self.cursor_query_param] = String(
+            description="Keyset pagination cursor, use empty value for the first page and nextCursor after."
+            " totalCount is not calculated."
+        )
+        return fields
+
+    def get_cursor(self, **kwargs) -> typing.Optional[str]:
+        return kwargs.get(self.cursor_query_param)
+
+    def cursor_paginate_queryset(self, qs, **kwargs):
+        """
+        Returns the page results and the next cursor
+        """
+        _, page_size = self.get_offset_and_limit(**kwargs)
+        return keyset_paginate_queryset(
+            qs,
+            self.cursor_ordering,
+            self.get_cursor(**kwargs),
+            page_size,
+        )
@@ -1,7 +1,7 @@
 from collections import OrderedDict
 
 from django.db.models import QuerySet
-from graphene import ObjectType, Field, Int
+from graphene import ObjectType, Field, Int, String
 # we will use graphene_django registry over the one from graphene_django_extras
 # since it adds information regarding nullability in the schema definition
 from graphene_django.registry import get_global_registry
@@ -112,6 +112,7 @@ class CustomDjangoListObjectType(DjangoListObjectType):
         filter_fields=None,
         queryset=None,
         filterset_class=None,
+        cursor_pagination=False,
         **options,
     ):
 
@@ -192,6 +193,13 @@ class CustomDjangoListObjectType(DjangoListObjectType):
                 )
             ]
         )
+        if cursor_pagination:
+            # NOTE: Used with CursorPageGraphqlPagination
+            _meta.fields["next_cursor"] = Field(
+                String,
+                name="nextCursor",
+                description="Cursor for the next page (keyset pagination)",
+            )
 
         super(DjangoListObjectType, cls).__init_subclass_with_meta__(
             _meta=_meta, **options
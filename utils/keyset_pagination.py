@@ -0,0 +1,169 @@
+import base64
+import binascii
+import json
+from collections import OrderedDict
+
+from django.core.exceptions import ValidationError
+from django.db.models import BooleanField, Expression, F, Q, Value
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import LimitOffsetPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param, remove_query_param
+
+
+def encode_cursor(values):
+    # NOTE: Using str to keep the microseconds of the datetime values
+    return base64.urlsafe_b64encode(
+        json.dumps(values, default=str).encode()
+    ).decode()
+
+
+def decode_cursor(model, ordering, cursor):
+    """
+    Returns the ordering field values of the last row of the previous page
+    Raises ValueError for an invalid cursor
+    """
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()).decode())
+        if not isinstance(values, list) or len(values) != len(ordering):
+            raise ValueError('Invalid cursor')
+        return [
+            model._meta.get_field(field.lstrip('-')).to_python(value)
+            for field, value in zip(ordering, values)
+        ]
+    except (binascii.Error, UnicodeDecodeError, json.JSONDecodeError, ValidationError):
+        raise ValueError('Invalid cursor')
+
+
+class RowComparison(Expression):
+    """
+    Row value comparison. e.g: (year, iso3, id) > (v1, v2, v3)
+    Unlike the OR expansion, this can use a composite index on the fields as a single range scan
+    """
+    output_field = BooleanField()
+
+    def __init__(self, fields, values, operator):
+        super().__init__()
+        self.lhs = [F(field) for field in fields]
+        self.rhs = [Value(value) for value in values]
+        self.operator = operator
+
+    def get_source_expressions(self):
+        return [*self.lhs, *self.rhs]
+
+    def set_source_expressions(self, exprs):
+        self.lhs, self.rhs = exprs[:len(self.lhs)], exprs[len(self.lhs):]
+
+    def as_sql(self, compiler, connection):
+        lhs_sql, rhs_sql, params = [], [], []
+        for expressions, sqls in [(self.lhs, lhs_sql), (self.rhs, rhs_sql)]:
+            for expression in expressions:
+                sql, _params = compiler.compile(expression)
+                sqls.append(sql)
+                params.extend(_params)
+        return f"({', '.join(lhs_sql)}) {self.operator} ({', '.join(rhs_sql)})", params
+
+
+def get_keyset_filter(ordering, values):
+    """
+    Rows after the values for the ordering
+    Same direction ordering uses a row comparison
+    e.g: ('year', 'iso3', 'id') => (year, iso3, id) > (v1, v2, v3)
+    Mixed direction ordering uses an OR expansion
+    e.g: ('-year', 'iso3', 'id') => year < v1 OR (year = v1 AND iso3 > v2) OR (year = v1 AND iso3 = v2 AND id > v3)
+    NOTE: Ordering fields should be non-nullable
+    """
+    descending = {field.startswith('-') for field in ordering}
+    if len(descending) == 1:
+        return RowComparison(
+            [field.lstrip('-') for field in ordering],
+            values,
+            '<' if descending.pop() else '>',
+        )
+
+    keyset_filter = Q()
+    for index, field in enumerate(ordering):
+        lookup = 'lt' if field.startswith('-') else 'gt'
+        keyset_filter |= Q(
+            **{
+                _field.lstrip('-'): value
+                for _field, value in zip(ordering[:index], values[:index])
+            },
+            **{f"{field.lstrip('-')}__{lookup}": values[index]},
+        )
+    return keyset_filter
+
+
+def keyset_paginate_queryset(qs, ordering, cursor, page_size):
+    """
+    Returns the page after the cursor (first page for empty cursor) and the cursor for the next page
+    NOTE: Total count is not calculated
+    ordering: Stable ordering with a unique last field. e.g: ('year', 'iso3', 'id')
+    """
+    qs = qs.order_by(*ordering)
+    if cursor:
+        qs = qs.filter(get_keyset_filter(ordering, decode_cursor(qs.model, ordering, cursor)))
+    results = list(qs[:page_size + 1])
+    next_cursor = None
+    if len(results) > page_size:
+        results = results[:page_size]
+        next_cursor = encode_cursor([
+            getattr(results[-1], field.lstrip('-'))
+            for field in ordering
+        ])
+    return results, next_cursor
+
+
+class LimitOffsetOrCursorPagination(LimitOffsetPagination):
+    """
+    LimitOffsetPagination with opt-in keyset pagination using the cursor query param
+    Use empty cursor for the first page. The view should define cursor_ordering.
+    """
+    cursor_query_param = 'cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.cursor = request.query_params.get(self.cursor_query_param)
+        if self.cursor is None:
+            return super().paginate_queryset(queryset, request, view=view)
+
+        self.request = request
+        self.limit = self.get_limit(request)
+        try:
+            results, self.next_cursor = keyset_paginate_queryset(
+                queryset,
+                view.cursor_ordering,
+                self.cursor,
+                self.limit,
+            )
+        except ValueError:
+            raise NotFound('Invalid cursor')
+        return results
+
+    def get_next_cursor_link(self):
+        if self.next_cursor is None:
+            return None
+        url = remove_query_param(self.request.build_absolute_uri(), self.offset_query_param)
+        return replace_query_param(url, self.cursor_query_param, self.next_cursor)
+
+    def get_paginated_response(self, data):
+        if self.cursor is None:
+            return super().get_paginated_response(data)
+        return Response(OrderedDict([
+            ('next', self.get_next_cursor_link()),
+            ('previous', None),
+            ('results', data),
+        ]))
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            *super().get_schema_operation_parameters(view),
+            {
+                'name': self.cursor_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'Keyset pagination cursor, use empty value for the first page (count is not included)',
+                'schema': {
+                    'type': 'string',
+                },
+            },
+        ]
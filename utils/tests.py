@@ -18,6 +18,7 @@ from apps.users.models import Portfolio
 from helix.settings import BASE_DIR
 from utils.factories import UserFactory, MonitoringSubRegionFactory, CountryFactory
 from utils.common import convert_date_object_to_string_in_dict
+from apps.contrib.redis_client_track import clear_client_registry_local_cache
 
 User = get_user_model()
 TEST_MEDIA_ROOT = 'media-temp'
@@ -206,6 +207,7 @@ class HelixAPITestCase(APITestCase):
         super().setUp()
         for key in TEST_CACHES.keys():
             caches[key].clear()
+        clear_client_registry_local_cache()
         self.user = User.objects.create_user(
             username='jon@dave.com',
             first_name='Jon',